@@ -0,0 +1,256 @@
+# asr_client.py
+#
+# Pipelined client for the whisper.cpp server (POST /inference), so the audio
+# loop never waits on a transcription.
+#
+#   - submit() encodes the PCM16 segment as an in-memory WAV and hands it to a
+#     thread pool; several requests are in flight at once.
+#   - Each worker thread keeps one persistent HTTP/1.1 keep-alive connection
+#     (http.client), so requests after the first skip the TCP handshake. A
+#     connection the server closed while idle is reopened and the request
+#     retried once.
+#   - Results are reassembled in submission order: a reply is delivered only
+#     once every earlier segment has been delivered, through on_result (called
+#     from a worker thread, outside the client's lock, one call at a time) or
+#     poll() / get(). An exception from on_result is counted in
+#     callback_errors and does not stop later deliveries.
+#   - Latency budget: a segment that is still waiting for a worker when its
+#     audio is older than latency_budget_s is not sent; it is delivered in
+#     order with dropped=True. A backlog of old speech is worth less than the
+#     next command.
+
+import http.client
+import json
+import queue
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+
+_WAV_HDR_FMT = "<4sI4s4sIHHIIHH4sI"
+_RETRY_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionError, BrokenPipeError)
+
+
+def wav_bytes(pcm: np.ndarray, sample_rate: int, channels: int = 1) -> bytes:
+    """PCM16 samples -> WAV file bytes (44-byte header + raw little-endian data)."""
+    data = np.asarray(pcm, dtype="<i2").tobytes()
+    header = struct.pack(_WAV_HDR_FMT, b"RIFF", 36 + len(data), b"WAVE", b"fmt ", 16, 1, channels,
+                         sample_rate, sample_rate * channels * 2, channels * 2, 16, b"data", len(data))
+    return header + data
+
+
+@dataclass
+class AsrResult:
+    seq: int
+    submitted_at: float                      # time.monotonic()
+    captured_at: float                       # time.monotonic() the audio ended
+    duration_s: float                        # seconds of audio
+    finished_at: float = 0.0
+    text: str = ""
+    response: Optional[dict] = None
+    dropped: bool = False
+    error: Optional[str] = None
+
+    @property
+    def latency_s(self) -> float:
+        """End of the audio -> reply."""
+        return self.finished_at - self.captured_at
+
+
+class AsrClient:
+    def __init__(self, url: str = "http://127.0.0.1:8080/inference", workers: int = 2, timeout: float = 30.0,
+                 latency_budget_s: Optional[float] = 3.0,
+                 on_result: Optional[Callable[[AsrResult], None]] = None,
+                 fields: Optional[Dict[str, str]] = None):
+        """
+        workers: requests in flight (and persistent connections).
+        latency_budget_s: skip segments whose audio is older than this when a
+        worker picks them up (None: never drop).
+        fields: extra multipart form fields, e.g. {"temperature": "0.0"}.
+        """
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.path = parts.path or "/"
+        self.timeout = timeout
+        self.latency_budget_s = latency_budget_s
+        self.on_result = on_result
+        self.fields = {"response_format": "json"}
+        self.fields.update(fields or {})
+
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="asr")
+        self._local = threading.local()
+        self._conns: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._next_out = 0
+        self._finished: Dict[int, AsrResult] = {}
+        self._ready: "deque[AsrResult]" = deque()
+        self._delivering = False
+        self._out: "queue.Queue[AsrResult]" = queue.Queue()
+
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.connections = 0
+        self.callback_errors = 0
+        self.last_callback_error: Optional[str] = None
+
+    # ---------------- Submission ----------------
+
+    def submit(self, pcm: np.ndarray, sample_rate: int = 16000, captured_at: Optional[float] = None) -> int:
+        """Queue one PCM16 segment; returns its sequence number."""
+        now = time.monotonic()
+        pcm = np.asarray(pcm, dtype=np.int16).reshape(-1)
+        with self._lock:
+            seq = self._seq
+            self._seq += 1
+            self.submitted += 1
+        result = AsrResult(seq, now, now if captured_at is None else captured_at, len(pcm) / sample_rate)
+        self._pool.submit(self._run, result, pcm, sample_rate)
+        return seq
+
+    @property
+    def in_flight(self) -> int:
+        """Submitted segments not yet delivered."""
+        with self._lock:
+            return self._seq - self._next_out
+
+    # ---------------- Workers ----------------
+
+    def _close_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _connection(self, fresh: bool = False) -> http.client.HTTPConnection:
+        if fresh:
+            self._close_connection()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+                self.connections += 1
+        return conn
+
+    def _encode(self, pcm: np.ndarray, sample_rate: int):
+        boundary = uuid.uuid4().hex
+        head = b"".join(
+            '--{}\r\nContent-Disposition: form-data; name="{}"\r\n\r\n{}\r\n'.format(boundary, k, v).encode()
+            for k, v in self.fields.items())
+        head += ('--{}\r\nContent-Disposition: form-data; name="file"; filename="audio.wav"\r\n'
+                 'Content-Type: audio/wav\r\n\r\n'.format(boundary)).encode()
+        body = head + wav_bytes(pcm, sample_rate) + "\r\n--{}--\r\n".format(boundary).encode()
+        return body, "multipart/form-data; boundary=" + boundary
+
+    def _post(self, body: bytes, content_type: str) -> dict:
+        headers = {"Content-Type": content_type, "Connection": "keep-alive"}
+        for attempt in range(2):
+            conn = self._connection(fresh=attempt > 0)
+            try:
+                conn.request("POST", self.path, body, headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except _RETRY_ERRORS:
+                self._close_connection()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self._close_connection()
+                raise
+            if resp.status != 200:
+                raise RuntimeError("ASR server returned {} {}".format(resp.status, resp.reason))
+            if resp.will_close:
+                self._close_connection()
+            return json.loads(data)
+
+    def _run(self, result: AsrResult, pcm: np.ndarray, sample_rate: int) -> None:
+        if self.latency_budget_s is not None and time.monotonic() - result.captured_at > self.latency_budget_s:
+            result.dropped = True
+        else:
+            try:
+                body, content_type = self._encode(pcm, sample_rate)
+                result.response = self._post(body, content_type)
+                result.text = (result.response.get("text") or "").strip()
+            except Exception as e:
+                result.error = "{}: {}".format(type(e).__name__, e)
+        result.finished_at = time.monotonic()
+        self._finish(result)
+
+    def _finish(self, result: AsrResult) -> None:
+        with self._lock:
+            if result.dropped:
+                self.dropped += 1
+            elif result.error is not None:
+                self.errors += 1
+            else:
+                self.completed += 1
+            self._finished[result.seq] = result
+            while self._next_out in self._finished:
+                self._ready.append(self._finished.pop(self._next_out))
+                self._next_out += 1
+            # One worker at a time drains the completed prefix, in order; the
+            # others just queue theirs behind it.
+            if self._delivering:
+                return
+            self._delivering = True
+        while True:
+            with self._lock:
+                if not self._ready:
+                    self._delivering = False
+                    return
+                ready = self._ready.popleft()
+            self._deliver(ready)
+
+    def _deliver(self, result: AsrResult) -> None:
+        if self.on_result is None:
+            self._out.put(result)
+            return
+        try:
+            self.on_result(result)
+        except Exception as e:
+            with self._lock:
+                self.callback_errors += 1
+                self.last_callback_error = "{}: {}".format(type(e).__name__, e)
+
+    # ---------------- Results ----------------
+
+    def poll(self) -> List[AsrResult]:
+        """Results delivered so far, in submission order (without on_result)."""
+        out = []
+        while True:
+            try:
+                out.append(self._out.get_nowait())
+            except queue.Empty:
+                return out
+
+    def get(self, timeout: Optional[float] = None) -> Optional[AsrResult]:
+        """Next result in submission order, or None on timeout."""
+        try:
+            return self._out.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+        with self._lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,149 @@
+# audio_frontend.py
+#
+# Capture-side audio path for live transcription: microphone blocks at the
+# native rate in, 16 kHz PCM16 blocks out, with no per-block allocation on
+# the audio callback and no artifacts at block boundaries.
+#
+#   - AudioRing: preallocated int16 ring buffer. The sounddevice callback
+#     copies each block in (at most two slice assignments); the consumer
+#     reads fixed-size blocks out into a reused buffer. When the consumer
+#     falls behind by more than the capacity, the oldest audio is
+#     overwritten and counted in `overruns`.
+#   - StreamingResampler: polyphase FIR resampler (up/down, same Kaiser
+#     design as scipy.signal.resample_poly) that keeps the last taps of input
+#     between calls. Feeding a signal block by block gives the same samples
+#     as resampling it in one piece; only the filter's look-ahead (half_len
+#     upsampled samples, ~0.6 ms for 44.1 -> 16 kHz) waits for the next
+#     block. Per-block resample_poly instead restarts the filter with zeros
+#     at every block edge.
+#   - AudioFrontEnd ties the two together and hands out int16 blocks ready
+#     for the VAD and ASR client (which packs the WAV header itself).
+
+import threading
+from math import gcd
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import firwin
+
+
+class AudioRing:
+    def __init__(self, capacity: int, channels: int = 1):
+        self.capacity = capacity
+        self.channels = channels
+        self._buf = np.zeros((capacity, channels), dtype=np.int16)
+        self._cond = threading.Condition()
+        self._write = 0                      # total frames written
+        self._read = 0                       # total frames read
+        self.overruns = 0                    # frames overwritten before being read
+
+    @property
+    def available(self) -> int:
+        with self._cond:
+            return self._write - self._read
+
+    def write(self, block: np.ndarray) -> None:
+        """Copy (frames, channels) int16 in; safe to call from the audio callback."""
+        n = len(block)
+        if n > self.capacity:
+            block = block[n - self.capacity:]
+            n = self.capacity
+        with self._cond:
+            pos = self._write % self.capacity
+            first = min(n, self.capacity - pos)
+            self._buf[pos:pos + first] = block[:first]
+            self._buf[:n - first] = block[first:]
+            self._write += n
+            lag = self._write - self._read - self.capacity
+            if lag > 0:
+                self.overruns += lag
+                self._read += lag
+            self._cond.notify()
+
+    def read_into(self, out: np.ndarray, timeout: Optional[float] = None) -> bool:
+        """Fill out (frames, channels) with the oldest unread audio; False on timeout."""
+        n = len(out)
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._write - self._read >= n, timeout):
+                return False
+            pos = self._read % self.capacity
+            first = min(n, self.capacity - pos)
+            out[:first] = self._buf[pos:pos + first]
+            out[first:] = self._buf[:n - first]
+            self._read += n
+            return True
+
+
+class StreamingResampler:
+    def __init__(self, rate_in: int, rate_out: int, half_len: Optional[int] = None, beta: float = 5.0):
+        """
+        Resamples by rate_out / rate_in, reduced to up / down. The filter
+        matches resample_poly's default (Kaiser, beta 5.0, half length
+        10 * max(up, down) upsampled taps).
+        """
+        g = gcd(rate_in, rate_out)
+        self.up, self.down = rate_out // g, rate_in // g
+        if half_len is None:
+            half_len = 10 * max(self.up, self.down)
+        h = firwin(2 * half_len + 1, 1.0 / max(self.up, self.down), window=("kaiser", beta)) * self.up
+        self.taps = -(-len(h) // self.up)            # input samples per output
+        padded = np.zeros(self.taps * self.up)
+        padded[:len(h)] = h
+        # _phases[p, i] multiplies window sample i (oldest first) for phase p.
+        self._phases = padded.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32).copy()
+        self.delay = half_len                        # group delay in upsampled samples
+
+        self._hist = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0                           # input samples seen
+        self._produced = 0                           # output samples emitted
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Mono samples in (any numeric dtype) -> float32 output samples available so far."""
+        x = np.concatenate([self._hist, np.asarray(block, dtype=np.float32).reshape(-1)])
+        start = self._consumed - (self.taps - 1)    # input index of x[0]
+        self._consumed += len(x) - len(self._hist)
+        self._hist = x[len(x) - (self.taps - 1):].copy()
+
+        # Output m reads inputs up to t // up, t = m * down + delay.
+        last = (self._consumed * self.up - 1 - self.delay) // self.down
+        m = np.arange(self._produced, last + 1)
+        self._produced = last + 1
+        if len(m) == 0:
+            return np.zeros(0, dtype=np.float32)
+        t = m * self.down + self.delay
+        base = t // self.up - start                  # newest input index within x
+        windows = sliding_window_view(x, self.taps)[base - (self.taps - 1)]
+        return np.einsum("ij,ij->i", windows, self._phases[t % self.up])
+
+    def process_pcm16(self, block: np.ndarray) -> np.ndarray:
+        y = self.process(block)
+        return np.clip(np.rint(y), -32768, 32767).astype(np.int16)
+
+
+class AudioFrontEnd:
+    def __init__(self, capture_rate: int = 44100, output_rate: int = 16000, channels: int = 1,
+                 block_s: float = 0.1, buffer_s: float = 5.0):
+        """
+        Capture rate block_s blocks come out of read() as output_rate PCM16
+        (mono; multi-channel input is averaged).
+        """
+        self.capture_rate = capture_rate
+        self.output_rate = output_rate
+        self.ring = AudioRing(int(capture_rate * buffer_s), channels)
+        self.resampler = StreamingResampler(capture_rate, output_rate)
+        self._block = np.zeros((int(round(capture_rate * block_s)), channels), dtype=np.int16)
+        self.status_errors = 0
+
+    def callback(self, indata, frames, time, status):
+        """sounddevice.InputStream callback (dtype="int16")."""
+        if status:
+            self.status_errors += 1
+        self.ring.write(indata)
+
+    def read(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Next block as int16 at output_rate, or None on timeout."""
+        if not self.ring.read_into(self._block, timeout):
+            return None
+        mono = self._block[:, 0] if self._block.shape[1] == 1 else self._block.mean(axis=1)
+        return self.resampler.process_pcm16(mono)
@@ -4,6 +4,7 @@ import numpy as np
 import threading
 from io_libraries.camera.JetsonCamera import Camera
 from io_libraries.camera.Focuser import Focuser
+from io_libraries.camera.LensActuator import LensActuator
 
 try:
     from  Queue import  Queue
@@ -19,7 +20,6 @@ def laplacian(img):
 class FocusState(object):
     def __init__(self):
         self.FOCUS_SETP = 50
-        self.MOVE_TIME = 0.016
 
         self.lock = threading.Lock()
         self.verbose = False
@@ -53,17 +53,26 @@ def getROIFrame(roi, frame):
     roi_frame = frame[y_start:y_end, x_start:x_end]
     return roi_frame
 
-def statsThread(camera, focuser, focusState):
-    maxPosition = focuser.opts[focuser.OPT_FOCUS]["MAX_VALUE"]
-    lastPosition = 0
-    focuser.set(Focuser.OPT_FOCUS, lastPosition) # init position
-    lastTime = time.time()
+def statsThread(camera, actuator, focusState):
+    maxPosition = actuator.opts[Focuser.OPT_FOCUS]["MAX_VALUE"]
+    position = 0
 
     sharpnessList = []
 
-    while not focusState.isFinish():
-        frame = camera.getFrame(1000)
-    
+    while position <= maxPosition and not focusState.isFinish():
+        actuator.set(Focuser.OPT_FOCUS, position)
+        if actuator.waitSettled(1.0) is None:
+            continue
+
+        # Score the first frame captured after the lens settled at 'position';
+        # anything older was (at least partly) exposed while it was moving.
+        frame = None
+        while not focusState.isFinish():
+            frame, timestamp = camera.getFrameWithTimestamp(1000)
+            if frame is not None and actuator.positionAt(timestamp) == position:
+                break
+            frame = None
+
         if frame is None:
             continue
 
@@ -71,22 +80,14 @@ def statsThread(camera, focuser, focusState):
 
         if focusState.verbose:
             cv2.imshow("ROI", roi_frame)
-        
-        if time.time() - lastTime >= focusState.MOVE_TIME and not focusState.isFinish():
-            if lastPosition != maxPosition:
-                focuser.set(Focuser.OPT_FOCUS, lastPosition + focusState.FOCUS_SETP)
-                lastTime = time.time()
-
-            sharpness = laplacian(roi_frame)
-            # print("position: {}, sharpness: {}".format(lastPosition, sharpness))
-            item = (lastPosition, sharpness)
-            sharpnessList.append(item)
-            focusState.sharpnessList.put(item)
 
-            lastPosition += focusState.FOCUS_SETP
+        sharpness = laplacian(roi_frame)
+        # print("position: {}, sharpness: {}".format(position, sharpness))
+        item = (position, sharpness)
+        sharpnessList.append(item)
+        focusState.sharpnessList.put(item)
 
-            if lastPosition > maxPosition:
-                break
+        position += focusState.FOCUS_SETP
 
     # End of stats.
     focusState.sharpnessList.put((-1, -1))
@@ -118,7 +119,7 @@ def focusThread(focuser, focusState):
 '''
 
 # Try to make it fast.
-def focusThread(focuser, focusState):
+def focusThread(actuator, focusState):
     sharpnessList = []
 
     continuousDecline = 0
@@ -154,16 +155,26 @@ def focusThread(focuser, focusState):
         print("max: {}".format(maxItem))
     
     if continuousDecline < 3:
-        focuser.set(Focuser.OPT_FOCUS, maxItem[0])
+        actuator.set(Focuser.OPT_FOCUS, maxItem[0])
     else:
-        focuser.set(Focuser.OPT_FOCUS, maxPosition)
+        actuator.set(Focuser.OPT_FOCUS, maxPosition)
+
+    # Flushes the final position before the worker exits.
+    actuator.stop()
 
 
 def doFocus(camera, focuser, focusState):
-    statsThread_ = threading.Thread(target=statsThread, args=(camera, focuser, focusState))
+    """
+    camera must provide getFrameWithTimestamp(); lens moves go through a
+    LensActuator so frames are only scored once the lens has settled.
+    """
+    actuator = LensActuator(focuser)
+    actuator.start()
+
+    statsThread_ = threading.Thread(target=statsThread, args=(camera, actuator, focusState))
     statsThread_.daemon = True
     statsThread_.start()
 
-    focusThread_ = threading.Thread(target=focusThread, args=(focuser, focusState))
+    focusThread_ = threading.Thread(target=focusThread, args=(actuator, focusState))
     focusThread_.daemon = True
     focusThread_.start()
\ No newline at end of file
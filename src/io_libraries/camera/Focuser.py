@@ -24,25 +24,33 @@
 
 import sys
 import time
-import os
+from io_libraries.camera.I2CBus import LinuxI2CBus
 
-def init(bus, address):
-    os.system("i2cset -y {} 0x{:02x} 0x02 0x00".format(bus, address))
+REG_FOCUS_MSB = 0x00
+REG_CONTROL = 0x02
 
-def write(bus, address, value):
+def init(i2c, address):
+    i2c.write_reg(address, REG_CONTROL, 0x00)
+
+def write(i2c, address, value):
+    # MSB and LSB go out back to back in a single transaction.
     value <<= 4
-    os.system("i2cset -y {} 0x{:02x} 0x00 0x{:02x}".format(bus, address, value >> 8))
-    os.system("i2cset -y {} 0x{:02x} 0x01 0x{:02x}".format(bus, address, value & 0xFF))
+    i2c.write_block(address, REG_FOCUS_MSB, [value >> 8, value & 0xFF])
 
 class Focuser:
     bus = None
     CHIP_I2C_ADDR = 0x0C
 
-    def __init__(self, bus):
+    def __init__(self, bus, i2c=None):
+        """
+        bus: i2c bus number. i2c: optional I2CBus backend; by default
+        /dev/i2c-<bus> is opened once and kept open.
+        """
         self.focus_value = 0
         self.bus = bus
         self.verbose = False
-        init(self.bus, self.CHIP_I2C_ADDR)
+        self.i2c = i2c if i2c is not None else LinuxI2CBus(bus)
+        init(self.i2c, self.CHIP_I2C_ADDR)
         
     def read(self):
         return self.focus_value
@@ -54,7 +62,10 @@ class Focuser:
 
         value = int(value / 1000.0 * 4095)
 
-        write(self.bus, chip_addr, value)
+        write(self.i2c, chip_addr, value)
+
+    def close(self):
+        self.i2c.close()
 
     OPT_BASE    = 0x1000
     OPT_FOCUS   = OPT_BASE | 0x01
@@ -0,0 +1,91 @@
+'''
+    Register-level I2C access for the lens and PWM drivers.
+
+    LinuxI2CBus keeps /dev/i2c-N open for the lifetime of the driver and sends
+    a register address plus its data bytes as a single I2C write message, so a
+    16-bit focus value goes out in one transaction instead of two i2cset
+    process spawns.
+
+    ShellI2CBus is the original i2cset path, kept for comparison and for boards
+    where the character device is not accessible.
+
+    FakeI2CBus is an in-memory register file for running the drivers off-device.
+'''
+
+import fcntl
+import os
+import threading
+
+# <linux/i2c-dev.h>
+I2C_SLAVE = 0x0703
+I2C_SLAVE_FORCE = 0x0706
+
+
+class I2CBus(object):
+    def write_block(self, addr, reg, data):
+        """
+        Write data[0], data[1], ... to reg, reg + 1, ... of the device at addr
+        in one transaction (relies on the device auto-incrementing its
+        register pointer).
+        """
+        raise NotImplementedError
+
+    def write_reg(self, addr, reg, value):
+        self.write_block(addr, reg, [value])
+
+    def close(self):
+        pass
+
+
+class LinuxI2CBus(I2CBus):
+    def __init__(self, bus, force=False):
+        self.bus = bus
+        self.force = force
+        self._addr = None
+        self._lock = threading.Lock()
+        self.fd = os.open("/dev/i2c-{}".format(bus), os.O_RDWR)
+
+    def _select(self, addr):
+        # The slave address is sticky on the fd, only re-issue it on change.
+        if addr != self._addr:
+            fcntl.ioctl(self.fd, I2C_SLAVE_FORCE if self.force else I2C_SLAVE, addr)
+            self._addr = addr
+
+    def write_block(self, addr, reg, data):
+        msg = bytes([reg & 0xFF] + [b & 0xFF for b in data])
+        with self._lock:
+            self._select(addr)
+            os.write(self.fd, msg)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ShellI2CBus(I2CBus):
+    def __init__(self, bus):
+        self.bus = bus
+
+    def write_block(self, addr, reg, data):
+        for i, value in enumerate(data):
+            os.system("i2cset -y {} 0x{:02x} 0x{:02x} 0x{:02x}".format(
+                self.bus, addr, reg + i, value & 0xFF))
+
+
+class FakeI2CBus(I2CBus):
+    def __init__(self):
+        self.registers = {}     # addr -> {reg: value}
+        self.transactions = 0
+        self._lock = threading.Lock()
+
+    def write_block(self, addr, reg, data):
+        with self._lock:
+            regs = self.registers.setdefault(addr, {})
+            for i, value in enumerate(data):
+                regs[reg + i] = value & 0xFF
+            self.transactions += 1
+
+    def read_reg(self, addr, reg):
+        with self._lock:
+            return self.registers.get(addr, {}).get(reg, 0)
@@ -8,9 +8,9 @@
 import cv2
 import time
 try:
-    from  Queue import  Queue
+    from  Queue import  Queue, Empty
 except ModuleNotFoundError:
-    from  queue import  Queue
+    from  queue import  Queue, Empty
 
 import  threading
 import signal
@@ -53,26 +53,37 @@ def gstreamer_pipeline(
     )
 
 
+# Time from the start of exposure until appsink hands the frame to read():
+# roughly one frame at 30 fps. Subtracted from frame timestamps so they
+# describe when the image was captured rather than when it was delivered.
+CAPTURE_LATENCY = 0.033
+
+
 class FrameReader(threading.Thread):
     queues = []
     _running = True
     camera = None
-    def __init__(self, camera, name):
+    def __init__(self, camera, name, latency = CAPTURE_LATENCY):
         threading.Thread.__init__(self)
         self.name = name
         self.camera = camera
+        self.latency = latency
  
     def run(self):
         while self._running:
             _, frame = self.camera.read()
+            timestamp = time.time() - self.latency
             while self.queues:
                 queue = self.queues.pop()
-                queue.put(frame)
+                queue.put((frame, timestamp))
     
     def addQueue(self, queue):
         self.queues.append(queue)
 
     def getFrame(self, timeout = None):
+        return self.getFrameWithTimestamp(timeout)[0]
+
+    def getFrameWithTimestamp(self, timeout = None):
         queue = Queue(1)
         self.addQueue(queue)
         return queue.get(timeout = timeout)
@@ -101,10 +112,33 @@ class Previewer(threading.Thread):
     def stop_preview(self):
         self._running = False
 
+class Streamer(threading.Thread):
+    """Feeds every new camera frame to an H264Sender."""
+    _running = True
+    def __init__(self, frame_reader, sender):
+        threading.Thread.__init__(self)
+        self.name = "h264-streamer"
+        self.frame_reader = frame_reader
+        self.sender = sender
+
+    def run(self):
+        while self._running:
+            try:
+                frame = self.frame_reader.getFrame(2)
+            except Empty:
+                continue
+            self.sender.write(frame)
+        self.sender.close()
+
+    def stop(self):
+        self._running = False
+        self.join()
+
 class Camera(object):
     frame_reader = None
     cap = None
     previewer = None
+    streamer = None
 
     def __init__(self, width=640, height=360):
         self.open_camera(width, height)
@@ -131,6 +165,10 @@ class Camera(object):
     def getFrame(self, timeout = None):
         return self.frame_reader.getFrame(timeout)
 
+    def getFrameWithTimestamp(self, timeout = None):
+        """Returns (frame, capture time in time.time() seconds)."""
+        return self.frame_reader.getFrameWithTimestamp(timeout)
+
     def start_preview(self):
         self.previewer.daemon = True
         self.previewer.start_preview()
@@ -139,7 +177,27 @@ class Camera(object):
         self.previewer.stop_preview()
         self.previewer.join()
     
+    def start_stream(self, host, port=5000, bitrate=4000000, hardware=None):
+        """
+        Send the camera as H.264 over RTP/UDP to host:port, alongside normal
+        frame reads. hardware=None tries the Jetson encoder first, then
+        x264enc tune=zerolatency; see RtpStream.RtpReceiver for the receiver.
+        """
+        from io_libraries.camera.RtpStream import H264Sender
+        frame = self.getFrame(2)
+        sender = H264Sender(host, port, (frame.shape[1], frame.shape[0]), bitrate=bitrate, hardware=hardware)
+        print("streaming to {}:{} ({} encoder)".format(host, port, "hardware" if sender.hardware else "x264"))
+        self.streamer = Streamer(self.frame_reader, sender)
+        self.streamer.daemon = True
+        self.streamer.start()
+
+    def stop_stream(self):
+        if self.streamer is not None:
+            self.streamer.stop()
+            self.streamer = None
+
     def close(self):
+        self.stop_stream()
         self.frame_reader.stop()
         self.cap.release()
 
@@ -0,0 +1,140 @@
+import time
+import threading
+from collections import deque
+from io_libraries.camera.Focuser import Focuser
+
+# Settle-time model for the VCM: a fixed ringing time plus a term that grows
+# with the size of the move, capped at the full-range value.
+MIN_SETTLE_TIME = 0.004
+SETTLE_TIME_PER_UNIT = 0.00003
+MAX_SETTLE_TIME = 0.040
+
+
+def settleTime(step, min_settle=MIN_SETTLE_TIME, per_unit=SETTLE_TIME_PER_UNIT,
+               max_settle=MAX_SETTLE_TIME):
+    if step == 0:
+        return 0.0
+    return min(min_settle + per_unit * abs(step), max_settle)
+
+
+class LensActuator(threading.Thread):
+    """
+    Moves the lens from a worker thread so callers never block on I2C.
+
+    set() only records the latest target; if several arrive before the worker
+    gets to them, only the last one is written, and targets equal to the
+    current position are not written at all. Every write is logged with the
+    time the lens is expected to have settled, so positionAt() can tell which
+    position was in effect for a frame timestamp (or None while moving).
+
+    The register value read at startup need not be where the lens actually
+    is, so the position starts out unknown: the first target is always
+    written, with the full-range settle time, and positionAt() returns None
+    until that write has settled.
+    """
+    _running = True
+
+    def __init__(self, focuser, name="", history=64, settle_time=settleTime):
+        threading.Thread.__init__(self)
+        self.name = name
+        self.daemon = True
+        self.focuser = focuser
+        self.settle_time = settle_time
+        self.opts = focuser.opts
+
+        self.writes = 0
+        self.coalesced = 0
+        self.skipped = 0
+
+        self._cond = threading.Condition()
+        self._target = None
+        self._busy = False
+        self._initial = focuser.read()
+        # (position, write_time, settled_time), newest last; None = unknown
+        self._history = deque([(None, 0.0, 0.0)], maxlen=history)
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._running and self._target is None:
+                    self._cond.wait()
+                if self._target is None:
+                    break
+                target, self._target = self._target, None
+                self._busy = True
+
+            current = self._history[-1][0]
+            if target != current:
+                write_time = time.time()
+                self.focuser.set(Focuser.OPT_FOCUS, target)
+                info = self.opts[Focuser.OPT_FOCUS]
+                step = target - current if current is not None else info["MAX_VALUE"] - info["MIN_VALUE"]
+                settled = write_time + self.settle_time(step)
+                self.writes += 1
+            else:
+                self.skipped += 1
+
+            with self._cond:
+                if target != current:
+                    self._history.append((target, write_time, settled))
+                self._busy = False
+                self._cond.notify_all()
+
+    def _clamp(self, value):
+        info = self.opts[Focuser.OPT_FOCUS]
+        return int(max(info["MIN_VALUE"], min(info["MAX_VALUE"], value)))
+
+    def set(self, opt, value, flag=1):
+        with self._cond:
+            if self._target is not None:
+                self.coalesced += 1
+            self._target = self._clamp(value)
+            self._cond.notify_all()
+
+    def get(self, opt, flag=0):
+        return self.read()
+
+    def read(self):
+        with self._cond:
+            if self._target is not None:
+                return self._target
+            position = self._history[-1][0]
+            return position if position is not None else self._initial
+
+    def positionAt(self, timestamp):
+        """
+        Lens position in effect at 'timestamp', or None if the lens was still
+        moving, had not been written yet, or the timestamp is older than the
+        kept history.
+        """
+        with self._cond:
+            for position, write_time, settled in reversed(self._history):
+                if write_time <= timestamp:
+                    return position if timestamp >= settled else None
+        return None
+
+    def waitSettled(self, timeout=None):
+        """
+        Block until every requested move has been written and has settled.
+        Returns the time the lens settled, or None on timeout.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._target is not None or self._busy:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            settled = self._history[-1][2]
+        delay = settled - time.time()
+        if delay > 0:
+            if deadline is not None and settled > deadline:
+                return None
+            time.sleep(delay)
+        return settled
+
+    def stop(self):
+        """Stop after writing whatever target is still pending."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
@@ -0,0 +1,149 @@
+# RtpStream.py
+#
+# H.264 over RTP/UDP for camera frames, through OpenCV's GStreamer backend.
+#
+# H264Sender pushes BGR frames into an appsrc pipeline:
+#   - hardware: nvvidconv -> nvv4l2h264enc (Jetson), tried first;
+#   - software fallback: x264enc tune=zerolatency speed-preset=ultrafast
+#     (no B-frames, no lookahead, frame split into slices across threads).
+# Both send SPS/PPS with every IDR (config-interval=1) so a receiver can join
+# at any time, and udpsink never waits on the clock (sync=false).
+#
+# RtpReceiver is the low-latency counterpart:
+#   - rtpjitterbuffer with a small fixed latency that drops late packets
+#     instead of waiting for them;
+#   - appsink drop=true max-buffers=1 sync=false, so the newest decoded frame
+#     replaces any unread one and nothing is paced to the stream clock;
+#   - a reader thread keeps the newest frame, stamped with its arrival time
+#     and RTP-derived presentation time.
+
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+RTP_CAPS = "application/x-rtp,media=video,clock-rate=90000,encoding-name=H264,payload=96"
+
+_HW_ENCODE = (
+    "videoconvert ! video/x-raw,format=BGRx ! nvvidconv ! video/x-raw(memory:NVMM),format=NV12 ! "
+    "nvv4l2h264enc bitrate={bitrate} control-rate=1 iframeinterval={gop} idrinterval={gop} "
+    "insert-sps-pps=true maxperf-enable=1 preset-level=1 ! h264parse"
+)
+_SW_ENCODE = (
+    "videoconvert ! video/x-raw,format=I420 ! "
+    "x264enc tune=zerolatency speed-preset=ultrafast bitrate={kbitrate} key-int-max={gop} "
+    "sliced-threads=true ! video/x-h264,profile=baseline"
+)
+_HW_DECODE = "nvv4l2decoder ! nvvidconv ! video/x-raw,format=BGRx ! videoconvert"
+_SW_DECODE = "avdec_h264 ! videoconvert"
+
+
+def sender_pipeline(host: str, port: int, hardware: bool, bitrate: int = 4000000, gop: int = 30) -> str:
+    encode = (_HW_ENCODE if hardware else _SW_ENCODE).format(bitrate=bitrate, kbitrate=bitrate // 1000, gop=gop)
+    return (
+        "appsrc is-live=true do-timestamp=true format=time ! " + encode + " ! "
+        "rtph264pay config-interval=1 pt=96 mtu=1400 ! "
+        "udpsink host={} port={} sync=false async=false".format(host, port)
+    )
+
+
+def receiver_pipeline(port: int, latency_ms: int = 20, hardware: bool = False,
+                      buffer_size: int = 1 << 21) -> str:
+    return (
+        "udpsrc port={} buffer-size={} caps=\"{}\" ! "
+        "rtpjitterbuffer latency={} drop-on-latency=true ! "
+        "rtph264depay ! h264parse ! {} ! video/x-raw,format=BGR ! "
+        "appsink drop=true max-buffers=1 sync=false".format(
+            port, buffer_size, RTP_CAPS, latency_ms, _HW_DECODE if hardware else _SW_DECODE)
+    )
+
+
+class H264Sender:
+    def __init__(self, host: str, port: int = 5000, size: Tuple[int, int] = (1280, 720), fps: float = 30.0,
+                 bitrate: int = 4000000, gop: int = 30, hardware: Optional[bool] = None):
+        """
+        size: (width, height) of the frames that will be written.
+        hardware: True / False to force an encoder, None to try the Jetson
+        encoder and fall back to x264enc.
+        """
+        self.writer = None
+        for hw in ((True, False) if hardware is None else (hardware,)):
+            pipe = sender_pipeline(host, port, hw, bitrate, gop)
+            writer = cv2.VideoWriter(pipe, cv2.CAP_GSTREAMER, 0, fps, size, True)
+            if writer.isOpened():
+                self.writer, self.hardware, self.pipeline = writer, hw, pipe
+                break
+        if self.writer is None:
+            raise RuntimeError("Failed to open an H.264 RTP sender pipeline (GStreamer/encoder missing?)")
+        self.size = size
+        self.frames = 0
+
+    def write(self, frame: np.ndarray) -> None:
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        self.writer.write(frame)
+        self.frames += 1
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+
+class RtpReceiver(threading.Thread):
+    def __init__(self, port: int = 5000, latency_ms: int = 20, hardware: bool = False):
+        threading.Thread.__init__(self)
+        self.name = "rtp-receiver"
+        self.daemon = True
+        self.pipeline = receiver_pipeline(port, latency_ms, hardware)
+        self.cap = cv2.VideoCapture(self.pipeline, cv2.CAP_GSTREAMER)
+        if not self.cap.isOpened():
+            raise RuntimeError("Failed to open RTP receive pipeline: " + self.pipeline)
+
+        self._cond = threading.Condition()
+        self._latest = None                  # (frame, received_at, pts_ms, seq)
+        self._running = True
+        self._read_seq = 0
+        self.frames = 0
+
+    def run(self):
+        while self._running:
+            ok, frame = self.cap.read()
+            if not ok or frame is None:
+                time.sleep(0.001)
+                continue
+            received_at = time.time()
+            pts_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+            with self._cond:
+                self.frames += 1
+                self._latest = (frame, received_at, pts_ms, self.frames)
+                self._cond.notify_all()
+
+    def getFrameWithTimestamp(self, timeout=None, after: int = 0):
+        """
+        Newest frame with sequence number > after:
+        (frame, arrival time in time.time() seconds, stream PTS in ms, seq).
+        Raises TimeoutError if none arrives within timeout.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._latest is not None and self._latest[3] > after, timeout):
+                raise TimeoutError("no RTP frame within {} s".format(timeout))
+            return self._latest
+
+    def getFrame(self, timeout=None):
+        return self.getFrameWithTimestamp(timeout)[0]
+
+    def read(self):
+        """cv2.VideoCapture-style: (ok, newest frame not returned by read() before)."""
+        try:
+            frame, _, _, self._read_seq = self.getFrameWithTimestamp(1.0, self._read_seq)
+            return True, frame
+        except TimeoutError:
+            return False, None
+
+    def stop(self):
+        self._running = False
+        self.join(timeout=1.0)
+        self.cap.release()
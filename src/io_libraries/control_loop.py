@@ -0,0 +1,223 @@
+# control_loop.py
+#
+# Fixed-rate control loop for Actuation.
+#
+# Command sources (network, joystick, gesture, ...) post into a CommandMailbox
+# whenever they like. ControlLoop wakes on a fixed schedule locked to the
+# servo PWM period, takes the freshest command that is still within its
+# deadline and applies it; if every source has gone quiet it falls back to
+# neutral throttle.
+#
+# Timing notes:
+#   - Ticks are scheduled on absolute monotonic deadlines (no drift).
+#   - Each wait sleeps until shortly before the deadline and spins the rest,
+#     so wake-up jitter is not at the mercy of the sleep granularity.
+#   - If a tick overruns by whole periods, the missed ticks are skipped
+#     (counted as misses) rather than run back to back.
+#   - Optionally requests SCHED_FIFO so a busy neighbour process does not
+#     delay wake-ups (needs CAP_SYS_NICE; silently ignored otherwise).
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from io_libraries.motor_servo_control import PWM_FREQUENCY
+
+NEUTRAL_SPEED = 0
+CENTER_STEERING = 0
+
+# Histogram bucket upper edges in microseconds (last bucket is open-ended).
+HIST_EDGES_US = (50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+@dataclass
+class ControlLoopConfig:
+    rate_hz: float = PWM_FREQUENCY
+    pwm_frequency: float = PWM_FREQUENCY
+
+    # Commands older than this are ignored; with none left we go neutral.
+    command_deadline_s: float = 0.25
+    neutral_speed: float = NEUTRAL_SPEED
+    neutral_steering: float = CENTER_STEERING
+
+    # Sleep until this long before a deadline, then busy-wait.
+    spin_s: float = 0.001
+
+    # SCHED_FIFO priority for the loop thread, or None to leave as is.
+    realtime_priority: Optional[int] = None
+
+
+@dataclass
+class Command:
+    speed: float
+    steering: float
+    timestamp: float
+    source: str
+
+
+class CommandMailbox:
+    """
+    Latest-value slot per source. submit() never blocks on the control loop;
+    freshest() returns the newest command that is not older than the deadline.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latest: Dict[str, Command] = {}
+
+    def submit(self, source: str, speed: float, steering: float = CENTER_STEERING,
+               timestamp: Optional[float] = None) -> None:
+        cmd = Command(speed, steering, self._clock() if timestamp is None else timestamp, source)
+        with self._lock:
+            prev = self._latest.get(source)
+            if prev is None or cmd.timestamp >= prev.timestamp:
+                self._latest[source] = cmd
+
+    def freshest(self, now: float, deadline_s: float) -> Optional[Command]:
+        with self._lock:
+            best = None
+            for cmd in self._latest.values():
+                if now - cmd.timestamp > deadline_s:
+                    continue
+                if best is None or cmd.timestamp > best.timestamp:
+                    best = cmd
+            return best
+
+
+class Histogram:
+    def __init__(self, edges_us=HIST_EDGES_US):
+        self.edges_us = edges_us
+        self.counts = [0] * (len(edges_us) + 1)
+        self.max_us = 0.0
+
+    def add(self, seconds: float) -> None:
+        us = seconds * 1e6
+        self.counts[bisect_left(self.edges_us, us)] += 1
+        self.max_us = max(self.max_us, us)
+
+    def format(self) -> str:
+        labels = ["<={}us".format(e) for e in self.edges_us] + [">{}us".format(self.edges_us[-1])]
+        parts = ["{}:{}".format(l, c) for l, c in zip(labels, self.counts) if c]
+        return " ".join(parts) + "  (max {:.0f}us)".format(self.max_us)
+
+
+@dataclass
+class LoopStats:
+    ticks: int = 0
+    deadline_misses: int = 0
+    skipped_ticks: int = 0
+    stale_fallbacks: int = 0
+    jitter: Histogram = field(default_factory=Histogram)
+    exec_time: Histogram = field(default_factory=Histogram)
+
+    def summary(self) -> str:
+        return (
+            "ticks={} misses={} skipped={} neutral_fallbacks={}\n"
+            "  jitter: {}\n"
+            "  exec:   {}".format(
+                self.ticks, self.deadline_misses, self.skipped_ticks, self.stale_fallbacks,
+                self.jitter.format(), self.exec_time.format())
+        )
+
+
+class ControlLoop:
+    """
+    Applies the freshest command to 'actuation' (anything with
+    set_drive(speed, steering), e.g. Actuation) at cfg.rate_hz.
+
+    rate_hz must divide the PWM frequency: the ESC only samples a new duty
+    cycle once per PWM period, so updates between periods would be wasted and
+    updates off the period grid would alias.
+    """
+
+    def __init__(self, actuation, cfg: Optional[ControlLoopConfig] = None,
+                 mailbox: Optional[CommandMailbox] = None):
+        self.cfg = cfg or ControlLoopConfig()
+        periods = self.cfg.pwm_frequency / self.cfg.rate_hz
+        if periods < 1 or abs(periods - round(periods)) > 1e-9:
+            raise ValueError("rate_hz must be the PWM frequency divided by a whole number.")
+
+        self.actuation = actuation
+        self.mailbox = mailbox or CommandMailbox()
+        self.period_s = round(periods) / self.cfg.pwm_frequency
+        self.stats = LoopStats()
+
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------- Command input ----------------
+
+    def submit(self, source: str, speed: float, steering: float = CENTER_STEERING,
+               timestamp: Optional[float] = None) -> None:
+        self.mailbox.submit(source, speed, steering, timestamp)
+
+    # ---------------- Loop ----------------
+
+    def tick(self, now: float) -> Tuple[float, float]:
+        """Run one control step at time 'now'; returns the (speed, steering) applied."""
+        cmd = self.mailbox.freshest(now, self.cfg.command_deadline_s)
+        if cmd is None:
+            self.stats.stale_fallbacks += 1
+            speed, steering = self.cfg.neutral_speed, self.cfg.neutral_steering
+        else:
+            speed, steering = cmd.speed, cmd.steering
+        self.actuation.set_drive(speed, steering)
+        return speed, steering
+
+    def _wait_until(self, deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining > self.cfg.spin_s:
+            time.sleep(remaining - self.cfg.spin_s)
+        now = time.monotonic()
+        while now < deadline:
+            now = time.monotonic()
+        return now
+
+    def _set_realtime(self) -> None:
+        if self.cfg.realtime_priority is None or not hasattr(os, "sched_setscheduler"):
+            return
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.cfg.realtime_priority))
+        except (PermissionError, OSError):
+            pass
+
+    def run(self, max_ticks: Optional[int] = None) -> LoopStats:
+        """Run the loop in the calling thread until stop() or max_ticks."""
+        self._running = True
+        self._set_realtime()
+        period = self.period_s
+        scheduled = time.monotonic() + period
+
+        while self._running and (max_ticks is None or self.stats.ticks < max_ticks):
+            woke = self._wait_until(scheduled)
+            self.stats.jitter.add(woke - scheduled)
+
+            self.tick(woke)
+            done = time.monotonic()
+            self.stats.exec_time.add(done - woke)
+            self.stats.ticks += 1
+
+            scheduled += period
+            if done > scheduled:
+                self.stats.deadline_misses += 1
+                # Skip ticks we are already late for instead of bursting.
+                behind = int((done - scheduled) // period) + 1
+                self.stats.skipped_ticks += behind
+                scheduled += behind * period
+
+        return self.stats
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="control-loop", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.actuation.set_drive(self.cfg.neutral_speed, self.cfg.neutral_steering)
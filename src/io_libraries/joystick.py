@@ -1,23 +1,196 @@
-from gpiozero import PWMLED, MCP3008
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
 
 LEFT_STICK_X_CHANNEL = 0
 LEFT_STICK_Y_CHANNEL = 1
 RIGHT_STICK_X_CHANNEL = 2
 RIGHT_STICK_Y_CHANNEL = 3
 
+# MCP3008.value is 0..1; a centred stick reads about half scale.
+STICK_CENTER = 0.5
+
+
+@dataclass
+class SamplerConfig:
+    rate_hz: float = 500.0
+    oversample: int = 4              # ADC reads averaged per channel per sample
+
+    # One-Euro filter (cutoffs in Hz, beta in 1/(units/s))
+    min_cutoff: float = 2.0
+    beta: float = 5.0
+    d_cutoff: float = 1.0
+
+    # Filtered values within this of STICK_CENTER snap to the centre.
+    deadband: float = 0.02
+
+
+@dataclass(frozen=True)
+class JoystickSnapshot:
+    seq: int
+    timestamp: float                 # time.monotonic() of the sample
+    left_x: float
+    left_y: float
+    right_x: float
+    right_y: float
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter (Casiez et al. 2012): a low-pass whose cutoff rises with
+    the signal's speed, so the stick is smooth at rest and still responsive
+    when moved quickly.
+    """
+
+    def __init__(self, min_cutoff: float, beta: float, d_cutoff: float):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._x: Optional[float] = None
+        self._dx = 0.0
+        self._t = 0.0
+
+    @staticmethod
+    def _alpha(dt: float, cutoff: float) -> float:
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x: float, t: float) -> float:
+        if self._x is None:
+            self._x, self._t = x, t
+            return x
+        dt = t - self._t
+        if dt <= 0:
+            return self._x
+        a_d = self._alpha(dt, self.d_cutoff)
+        self._dx = a_d * (x - self._x) / dt + (1.0 - a_d) * self._dx
+        a = self._alpha(dt, self.min_cutoff + self.beta * abs(self._dx))
+        self._x = a * x + (1.0 - a) * self._x
+        self._t = t
+        return self._x
+
+
+class JoystickSampler(threading.Thread):
+    """
+    Reads all four channels at a fixed rate, oversamples and filters them, and
+    publishes an immutable JoystickSnapshot. Readers just fetch the current
+    snapshot reference, which is atomic and never touches SPI.
+    """
+
+    def __init__(self, channels: Sequence, cfg: Optional[SamplerConfig] = None):
+        threading.Thread.__init__(self, name="joystick-sampler", daemon=True)
+        self.cfg = cfg or SamplerConfig()
+        self.channels = list(channels)
+        self.filters = [OneEuroFilter(self.cfg.min_cutoff, self.cfg.beta, self.cfg.d_cutoff)
+                        for _ in self.channels]
+        self.snapshot = JoystickSnapshot(0, time.monotonic(), *([STICK_CENTER] * 4))
+        self.samples = 0
+        self.overruns = 0
+        self._running = True
+
+    def sample_once(self, now: float) -> JoystickSnapshot:
+        n = self.cfg.oversample
+        values = []
+        for channel, filt in zip(self.channels, self.filters):
+            raw = sum(channel.value for _ in range(n)) / n
+            v = filt(raw, now)
+            if abs(v - STICK_CENTER) < self.cfg.deadband:
+                v = STICK_CENTER
+            values.append(v)
+        self.samples += 1
+        self.snapshot = JoystickSnapshot(self.samples, now, *values)
+        return self.snapshot
+
+    def run(self):
+        period = 1.0 / self.cfg.rate_hz
+        next_t = time.monotonic()
+        while self._running:
+            self.sample_once(time.monotonic())
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind: resync instead of sampling back to back.
+                self.overruns += 1
+                next_t = time.monotonic()
+
+    def stop(self):
+        self._running = False
+
+
+class FakeADC:
+    """
+    Stand-in for gpiozero.MCP3008: .value follows signal(t) (0..1) plus
+    Gaussian noise, and each read costs read_time seconds like an SPI transfer.
+    """
+
+    def __init__(self, signal=lambda t: STICK_CENTER, noise=0.01, read_time=0.0, seed=None):
+        self.signal = signal
+        self.noise = noise
+        self.read_time = read_time
+        self.reads = 0
+        self._rng = random.Random(seed)
+
+    @property
+    def value(self) -> float:
+        self.reads += 1
+        if self.read_time:
+            end = time.perf_counter() + self.read_time
+            while time.perf_counter() < end:
+                pass
+        v = self.signal(time.monotonic()) + self._rng.gauss(0.0, self.noise)
+        return min(max(v, 0.0), 1.0)
+
+
 class JoySticks():
-    def __init__(self):
-        # ADC output stuff
+    def __init__(self, channels: Optional[Sequence] = None):
+        """
+        channels: optional [left_x, left_y, right_x, right_y] objects with a
+        .value in 0..1 (e.g. FakeADC); defaults to MCP3008 channels 0-3.
+        """
+        if channels is None:
+            # ADC output stuff
+            from gpiozero import MCP3008
+
+            channels = [
+                MCP3008(LEFT_STICK_X_CHANNEL),
+                MCP3008(LEFT_STICK_Y_CHANNEL),
+                MCP3008(RIGHT_STICK_X_CHANNEL),
+                MCP3008(RIGHT_STICK_Y_CHANNEL),
+            ]
+        self.left_x, self.left_y, self.right_x, self.right_y = channels
+        self.sampler: Optional[JoystickSampler] = None
+
+    def start_sampler(self, cfg: Optional[SamplerConfig] = None) -> JoystickSampler:
+        """After this, the getters return filtered values from the sampler thread."""
+        self.sampler = JoystickSampler([self.left_x, self.left_y, self.right_x, self.right_y], cfg)
+        self.sampler.start()
+        return self.sampler
 
-        self.left_x = MCP3008(LEFT_STICK_X_CHANNEL)
-        self.left_y = MCP3008(LEFT_STICK_Y_CHANNEL)
-        self.right_x = MCP3008(RIGHT_STICK_X_CHANNEL)
-        self.right_y = MCP3008(RIGHT_STICK_Y_CHANNEL)
+    def stop_sampler(self):
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler.join()
+            self.sampler = None
+
+    def get_snapshot(self) -> JoystickSnapshot:
+        if self.sampler is not None:
+            return self.sampler.snapshot
+        return JoystickSnapshot(0, time.monotonic(), self.left_x.value, self.left_y.value,
+                                self.right_x.value, self.right_y.value)
 
     def get_left_joystick(self):
+        if self.sampler is not None:
+            s = self.sampler.snapshot
+            return [s.left_x, s.left_y]
         return [self.left_x.value, self.left_y.value]
 
     def get_right_joystick(self):
-        return [self.right_x.value, self.right_y.value] 
-
-
+        if self.sampler is not None:
+            s = self.sampler.snapshot
+            return [s.right_x, s.right_y]
+        return [self.right_x.value, self.right_y.value]
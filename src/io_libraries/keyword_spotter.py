@@ -0,0 +1,339 @@
+# keyword_spotter.py
+#
+# On-device spotting of a few safety commands ("stop", "go", "left",
+# "right") on the streaming 16 kHz audio, so they act within tens of
+# milliseconds of the word ending instead of after VAD hang-over, an HTTP
+# round trip and a Whisper decode. Free-form speech still goes to the ASR
+# server.
+#
+# Features: MFCCs (25 ms window, 10 ms hop, 26 mel bands, c1..c12), computed
+# incrementally by MfccStream as blocks arrive, each coefficient scaled by
+# its spread over the templates; plus per-frame log energy against an
+# adaptive noise floor (as in vad.py, including the noise_window_s minimum
+# that lets it follow a noise step). No cepstral mean normalization:
+# templates are meant to be enrolled with the same microphone.
+#
+# Matching: streaming subsequence DTW of every enrolled template against
+# the feature stream. The DTW state is one column per template, advanced
+# once per 10 ms frame for all templates at once (templates are stacked and
+# padded). The step pattern only looks at the previous column (the template
+# advances by 0, 1 or 2 frames per input frame), so each update is a few
+# vectorized NumPy operations; a path may start at any input frame, and
+# each cell keeps the predecessor with the lowest cost per step. A
+# template matches when its accumulated cost, divided by the path length, is
+# below its keyword's threshold. Silent input frames add silence_penalty so
+# noise cannot complete a match, and a path may span at most max_stretch
+# times its template's length, so a long stretch of noise or speech cannot
+# accumulate into a low average cost.
+#
+# Commands are isolated words, so a match must also follow a short pause;
+# this keeps "go" from firing inside "hello". A hit fires once the best
+# score has not improved for confirm_frames, then matching pauses for
+# refractory_s. Thresholds come from calibrate(): a multiple of the largest
+# cost between a keyword's own templates.
+
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import dct
+
+
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int, fmin: float, fmax: float) -> np.ndarray:
+    mel = lambda f: 2595.0 * np.log10(1.0 + f / 700.0)
+    hz = lambda m: 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+    edges = hz(np.linspace(mel(fmin), mel(fmax), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    lo, mid, hi = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    up = (bins - lo) / (mid - lo)
+    down = (hi - bins) / (hi - mid)
+    return np.maximum(0.0, np.minimum(up, down)).astype(np.float32)
+
+
+class MfccStream:
+    def __init__(self, sample_rate: int = 16000, win_ms: float = 25.0, hop_ms: float = 10.0, n_mels: int = 26,
+                 n_ceps: int = 12, n_fft: int = 512, preemphasis: float = 0.97):
+        self.sample_rate = sample_rate
+        self.win = int(sample_rate * win_ms / 1000.0)
+        self.hop = int(sample_rate * hop_ms / 1000.0)
+        self.n_fft = n_fft
+        self.n_ceps = n_ceps
+        self.preemphasis = preemphasis
+        self._window = np.hamming(self.win).astype(np.float32)
+        self._mel = mel_filterbank(sample_rate, n_fft, n_mels, 60.0, min(7600.0, sample_rate / 2.0))
+        # Energy is measured without the pre-emphasis (undone per bin), above 100 Hz.
+        freqs = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+        emph = np.abs(1.0 - preemphasis * np.exp(-2j * np.pi * freqs / sample_rate)) ** 2
+        self._energy = np.where(freqs >= 100.0, 1.0 / emph, 0.0).astype(np.float32)
+        self._energy *= 2.0 / (self.win * np.sum(self._window.astype(np.float64) ** 2))
+        self._last = 0.0
+        self._rest = np.zeros(0, dtype=np.float32)
+
+    def reset(self) -> None:
+        self._last = 0.0
+        self._rest = np.zeros(0, dtype=np.float32)
+
+    def feed(self, samples: np.ndarray):
+        """int16 samples -> (mfcc (n, n_ceps), log energy in dBFS (n,)) for the frames completed."""
+        x = np.asarray(samples, dtype=np.float32).reshape(-1) / 32768.0
+        if len(x) == 0:
+            return np.zeros((0, self.n_ceps), np.float32), np.zeros(0, np.float32)
+        emph = np.empty_like(x)
+        emph[0] = x[0] - self.preemphasis * self._last
+        emph[1:] = x[1:] - self.preemphasis * x[:-1]
+        self._last = x[-1]
+        buf = np.concatenate([self._rest, emph])
+        n = (len(buf) - self.win) // self.hop + 1 if len(buf) >= self.win else 0
+        self._rest = buf[n * self.hop:]
+        if n == 0:
+            return np.zeros((0, self.n_ceps), np.float32), np.zeros(0, np.float32)
+        frames = sliding_window_view(buf, self.win)[::self.hop][:n] * self._window
+        power = np.abs(np.fft.rfft(frames, self.n_fft, axis=1)) ** 2
+        energy_db = 10.0 * np.log10(power @ self._energy + 1e-12)
+        logmel = np.log(power @ self._mel.T + 1e-10)
+        ceps = dct(logmel, type=2, axis=1, norm="ortho")[:, 1:self.n_ceps + 1]
+        return ceps.astype(np.float32), energy_db.astype(np.float32)
+
+
+def mfcc(audio: np.ndarray, sample_rate: int = 16000):
+    """Whole-clip MFCCs and log energies."""
+    return MfccStream(sample_rate).feed(audio)
+
+
+def trim_silence(feats: np.ndarray, energy_db: np.ndarray, range_db: float = 30.0,
+                 over_noise_db: float = 8.0) -> np.ndarray:
+    """
+    Drop leading/trailing frames more than range_db below the clip's loudest
+    frame or less than over_noise_db above its quietest tenth.
+    """
+    floor = max(energy_db.max() - range_db, np.percentile(energy_db, 10) + over_noise_db)
+    keep = np.nonzero(energy_db > floor)[0]
+    return feats[keep[0]:keep[-1] + 1] if len(keep) else feats
+
+
+def dtw_cost(a: np.ndarray, b: np.ndarray) -> float:
+    """Path-length-normalized DTW cost of aligning all of a with all of b."""
+    d = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(-1))
+    acc = np.full((len(a) + 1, len(b) + 1), np.inf)
+    steps = np.zeros_like(acc)
+    acc[0, 0] = 0.0
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            prev = ((acc[i - 1, j - 1], steps[i - 1, j - 1]), (acc[i - 1, j], steps[i - 1, j]),
+                    (acc[i, j - 1], steps[i, j - 1]))
+            c, s = min(prev)
+            acc[i, j] = c + d[i - 1, j - 1]
+            steps[i, j] = s + 1
+    return float(acc[-1, -1] / steps[-1, -1])
+
+
+@dataclass
+class KeywordHit:
+    keyword: str
+    score: float                             # normalized DTW cost (lower is better)
+    threshold: float
+    time: float                              # stream time of the hit, seconds
+    start: float                             # stream time the match started
+
+
+@dataclass
+class KwsConfig:
+    sample_rate: int = 16000
+    threshold_scale: float = 1.1             # threshold = scale x within-keyword template cost
+    default_threshold: float = 4.0           # used for keywords with a single template
+    speech_db: float = 10.0                  # frame is speech this far above the noise floor
+    noise_window_s: float = 3.0              # floor >= minimum frame energy over this long
+    silence_penalty: float = 3.0
+    max_stretch: float = 2.0                 # match length <= this x template length
+    confirm_frames: int = 2
+    refractory_s: float = 0.6
+    # Commands are spoken on their own: a match must follow pause_ms without
+    # speech (ending up to pause_slack_ms before the match start). 0: off.
+    pause_ms: float = 100.0
+    pause_slack_ms: float = 30.0
+
+
+class KeywordSpotter:
+    def __init__(self, config: KwsConfig = KwsConfig()):
+        self.config = config
+        self.features = MfccStream(config.sample_rate)
+        self.frame_s = self.features.hop / config.sample_rate
+        self.templates: List[np.ndarray] = []
+        self.keywords: List[str] = []
+        self.thresholds: Dict[str, float] = {}
+        self._stack: Optional[np.ndarray] = None
+        self.reset()
+
+    # ---------------- Enrollment ----------------
+
+    def add_template(self, keyword: str, audio: np.ndarray) -> None:
+        """One spoken example of keyword, int16 at sample_rate (silence around it is trimmed)."""
+        feats, energy = mfcc(audio, self.config.sample_rate)
+        self.templates.append(trim_silence(feats, energy))
+        self.keywords.append(keyword)
+        self._stack = None
+
+    def add_template_dir(self, path: str) -> None:
+        """Enroll <path>/<keyword>/*.wav (16-bit mono at sample_rate)."""
+        from scipy.io import wavfile
+
+        for keyword in sorted(os.listdir(path)):
+            kdir = os.path.join(path, keyword)
+            if not os.path.isdir(kdir):
+                continue
+            for name in sorted(os.listdir(kdir)):
+                if name.lower().endswith(".wav"):
+                    rate, audio = wavfile.read(os.path.join(kdir, name))
+                    if rate != self.config.sample_rate:
+                        raise ValueError("{}: {} Hz, expected {}".format(name, rate, self.config.sample_rate))
+                    self.add_template(keyword, audio if audio.ndim == 1 else audio[:, 0])
+
+    def calibrate(self) -> Dict[str, float]:
+        """Per-keyword thresholds from the DTW costs between each keyword's templates."""
+        c = self.config
+        self._update_weights()
+        for keyword in sorted(set(self.keywords)):
+            own = [t * self._weights for t, k in zip(self.templates, self.keywords) if k == keyword]
+            costs = [dtw_cost(a, b) for i, a in enumerate(own) for b in own[i + 1:]]
+            self.thresholds[keyword] = c.threshold_scale * max(costs) if costs else c.default_threshold
+        return dict(self.thresholds)
+
+    def _update_weights(self) -> None:
+        # Weight every coefficient equally: scale by its spread over all templates.
+        self._weights = 1.0 / (np.concatenate(self.templates).std(axis=0) + 1e-6)
+
+    def _build(self) -> None:
+        # thresholds may have been filled in by the caller (saved values).
+        if not self.thresholds or set(self.thresholds) != set(self.keywords):
+            self.calibrate()
+        else:
+            self._update_weights()
+        lengths = np.array([len(t) for t in self.templates])
+        stack = np.zeros((len(self.templates), lengths.max(), self.features.n_ceps), dtype=np.float32)
+        for i, t in enumerate(self.templates):
+            stack[i, :len(t)] = t * self._weights
+        self._stack = stack
+        self._lengths = lengths
+        self._pad = np.arange(lengths.max())[None, :] >= lengths[:, None]
+        self._last = lengths - 1
+        self._max_steps = np.ceil(self.config.max_stretch * lengths)[:, None].astype(np.float32)
+        self._limits = np.array([self.thresholds[k] for k in self.keywords], dtype=np.float32)
+        self.reset()
+
+    # ---------------- Streaming ----------------
+
+    def reset(self) -> None:
+        self.features.reset()
+        self._frame = 0
+        self._noise_db: Optional[float] = None
+        self._minima: deque = deque()               # (frame, energy), increasing energy
+        self._blocked_until = 0
+        self._pending: Optional[KeywordHit] = None
+        self._pending_frame = 0
+        self._speech = np.zeros(1024, dtype=bool)   # per-frame speech flags, ring
+        if self._stack is not None:
+            shape = self._stack.shape[:2]
+            self._cost = np.full(shape, np.inf, dtype=np.float32)
+            self._steps = np.ones(shape, dtype=np.float32)
+            self._start = np.zeros(shape, dtype=np.int64)
+
+    def _clear_paths(self) -> None:
+        self._cost.fill(np.inf)
+
+    def feed(self, samples: np.ndarray) -> List[KeywordHit]:
+        """Add int16 samples; returns keyword hits confirmed by them."""
+        if not self.templates:
+            return []
+        if self._stack is None:
+            self._build()
+        ceps, energy = self.features.feed(samples)
+        hits = []
+        for f, e in zip(ceps * self._weights, energy):
+            hit = self._step(f, e)
+            if hit is not None:
+                hits.append(hit)
+        return hits
+
+    def _step(self, f: np.ndarray, energy_db: float) -> Optional[KeywordHit]:
+        c = self.config
+        t = self._frame
+        self._frame += 1
+        minima = self._minima
+        while minima and minima[-1][1] >= energy_db:
+            minima.pop()
+        minima.append((t, energy_db))
+        if minima[0][0] <= t - int(round(c.noise_window_s / self.frame_s)):
+            minima.popleft()
+        noise = energy_db if self._noise_db is None else max(self._noise_db, minima[0][1])
+        speech = energy_db > noise + c.speech_db
+        if not speech:
+            noise += (0.3 if energy_db < noise else 0.02) * (energy_db - noise)
+        self._noise_db = noise
+        self._speech[t % len(self._speech)] = speech
+
+        d = np.sqrt(((self._stack - f) ** 2).sum(-1))
+        if not speech:
+            d += c.silence_penalty
+        d[self._pad] = np.inf
+
+        # Predecessors in the previous column: same row, one and two rows back,
+        # or (row 0 only) a fresh start. The one with the lowest cost per step
+        # after this frame wins, so a path keeps its start while row 0 fits.
+        prev, steps, start = self._cost, self._steps, self._start
+        shift = lambda a, n, fill: np.pad(a[:, :-n], ((0, 0), (n, 0)), constant_values=fill)
+        cand = np.stack([prev, shift(prev, 1, np.inf), shift(prev, 2, np.inf)])
+        cand_steps = np.stack([steps, shift(steps, 1, 1.0), shift(steps, 2, 1.0)])
+        cand[cand_steps >= self._max_steps] = np.inf
+        which = np.argmin((cand + d) / (cand_steps + 1), axis=0)
+        rows = np.maximum(np.arange(prev.shape[1])[None, :] - which, 0)
+        k = np.arange(prev.shape[0])[:, None]
+        best = np.take_along_axis(cand, which[None], 0)[0]
+        new_steps = steps[k, rows] + 1
+        new_start = start[k, rows]
+        fresh = ~np.isfinite(best[:, 0]) | (d[:, 0] < (best[:, 0] + d[:, 0]) / new_steps[:, 0])
+        best[fresh, 0] = 0.0
+        new_steps[fresh, 0] = 1
+        new_start[fresh, 0] = t
+        self._cost = best + d
+        self._steps = new_steps
+        self._start = new_start
+
+        if t < self._blocked_until:
+            return None
+        ends = np.arange(len(self._last))
+        scores = self._cost[ends, self._last] / self._steps[ends, self._last]
+        ratio = scores / self._limits
+        if c.pause_ms > 0:
+            ratio[~self._paused_before(self._start[ends, self._last], t)] = np.inf
+        i = int(np.argmin(ratio))
+        if ratio[i] < 1.0 and (self._pending is None or scores[i] / self._limits[i] <
+                               self._pending.score / self._pending.threshold):
+            self._pending = KeywordHit(self.keywords[i], float(scores[i]), float(self._limits[i]),
+                                       (t + 1) * self.frame_s + self._window_s(),
+                                       self._start[i, self._last[i]] * self.frame_s)
+            self._pending_frame = t
+        if self._pending is not None and t - self._pending_frame >= c.confirm_frames:
+            hit, self._pending = self._pending, None
+            hit.time = (t + 1) * self.frame_s + self._window_s()
+            self._blocked_until = t + int(round(c.refractory_s / self.frame_s))
+            self._clear_paths()
+            return hit
+        return None
+
+    def _paused_before(self, starts: np.ndarray, t: int) -> np.ndarray:
+        c = self.config
+        slack = int(round(c.pause_slack_ms / 1000.0 / self.frame_s))
+        n = int(round(c.pause_ms / 1000.0 / self.frame_s))
+        frames = starts[:, None] - slack - np.arange(1, n + 1)[None, :]
+        # Frames before the stream are silence; frames already overwritten in
+        # the ring are unknown, so such a match is not taken as isolated.
+        expired = np.any((frames >= 0) & (frames <= t - len(self._speech)), axis=1)
+        known = (frames >= 0) & ~expired[:, None]
+        return ~expired & ~np.any(self._speech[frames % len(self._speech)] & known, axis=1)
+
+    def _window_s(self) -> float:
+        # Frame t covers samples up to t * hop + win.
+        return (self.features.win - self.features.hop) / self.config.sample_rate
@@ -1,10 +1,13 @@
-import io
-import queue
-import requests
+import os
+from collections import deque
+
 import numpy as np
 import sounddevice as sd
-import soundfile as sf
-from scipy.signal import resample_poly
+
+from io_libraries.asr_client import AsrClient
+from io_libraries.audio_frontend import AudioFrontEnd
+from io_libraries.keyword_spotter import KeywordSpotter
+from io_libraries.vad import StreamingVAD, VadConfig
 
 SERVER_URL = "http://127.0.0.1:8080/inference"
 
@@ -13,50 +16,71 @@ ASR_SR = 16000       # whisper requirement
 CHANNELS = 1
 CHUNK_SEC = 1.0
 
-q = queue.Queue()
+# "vad": send only speech segments; "fixed": every CHUNK_SEC chunk, silence included.
+MODE = "vad"
+BLOCK_SEC = 0.1      # front-end block: 4410 samples at 44.1 kHz -> 1600 at 16 kHz
+
+ASR_WORKERS = 2      # requests in flight
+LATENCY_BUDGET = 3.0 # skip segments that waited longer than this for a worker
+
+# Local keyword spotting for safety commands: KWS_TEMPLATES/<keyword>/*.wav
+# (16 kHz mono, a few takes each, recorded with this microphone).
+KWS_TEMPLATES = "kws_templates"
+MIN_REST_SEC = 0.3   # a segment minus its spotted keywords still goes to ASR if this long
 
-def cb(indata, frames, time, status):
-    if status:
-        print(status)
-    q.put(indata.copy())
+def show(result):
+    # Called in submission order from the client's worker threads.
+    if result.error:
+        print("ASR error:", result.error)
+    elif result.dropped:
+        print("ASR: (skipped {:.1f} s of stale audio)".format(result.duration_s))
+    elif result.text:
+        print("ASR: {}  ({:.0f} ms)".format(result.text, result.latency_s * 1e3))
 
-def to_16k(audio_44k):
-    return resample_poly(audio_44k, ASR_SR, CAPTURE_SR).astype(np.int16)
+def on_keyword(hit):
+    # Acts without waiting for the ASR server.
+    print("KWS: {}  (score {:.2f} / {:.2f})".format(hit.keyword, hit.score, hit.threshold))
 
-def send_chunk(audio_16k):
-    buf = io.BytesIO()
-    sf.write(buf, audio_16k, ASR_SR, format="WAV", subtype="PCM_16")
-    buf.seek(0)
-    r = requests.post(SERVER_URL, files={"file": buf}, timeout=30)
-    r.raise_for_status()
-    return r.json()
+def without_keywords(segment, spans):
+    # Segment audio with the (start, end) sample spans of spotted keywords cut out.
+    keep = np.ones(len(segment.audio), dtype=bool)
+    for start, end in spans:
+        keep[max(start - segment.start, 0):max(end - segment.start, 0)] = False
+    return segment.audio[keep]
 
 print("Starting live ASR. Speak a short command, then pause.")
 print("Ctrl+C to stop.\n")
 
-frames_per_chunk = int(CAPTURE_SR * CHUNK_SEC)
+frontend = AudioFrontEnd(CAPTURE_SR, ASR_SR, CHANNELS, block_s=CHUNK_SEC if MODE == "fixed" else BLOCK_SEC)
+vad = StreamingVAD(VadConfig(sample_rate=ASR_SR))
+spotter = KeywordSpotter()
+if os.path.isdir(KWS_TEMPLATES):
+    spotter.add_template_dir(KWS_TEMPLATES)
+    print("Keywords:", ", ".join(sorted(set(spotter.keywords))))
+keyword_spans = deque(maxlen=32)   # stream samples (match start, hit) of recent keyword hits
+client = AsrClient(SERVER_URL, workers=ASR_WORKERS, latency_budget_s=LATENCY_BUDGET, on_result=show)
 
-with sd.InputStream(
+with client, sd.InputStream(
     samplerate=CAPTURE_SR,
     channels=CHANNELS,
     dtype="int16",
-    callback=cb
+    callback=frontend.callback
 ):
-    carry = np.zeros((0, CHANNELS), dtype=np.int16)
-
     while True:
-        block = q.get()
-        audio = np.concatenate([carry, block], axis=0)
-
-        while audio.shape[0] >= frames_per_chunk:
-            chunk_44k = audio[:frames_per_chunk]
-            audio = audio[frames_per_chunk:]
-
-            chunk_16k = to_16k(chunk_44k)
+        block_16k = frontend.read(timeout=1.0)
+        if block_16k is None:
+            continue
 
-            out = send_chunk(chunk_16k)
-            text = (out.get("text") or "").strip()
-            if text:
-                print("ASR:", text)
+        for hit in spotter.feed(block_16k):
+            on_keyword(hit)
+            keyword_spans.append((int(hit.start * ASR_SR), int(hit.time * ASR_SR)))
 
-        carry = audio
\ No newline at end of file
+        if MODE == "fixed":
+            client.submit(block_16k, ASR_SR)
+        else:
+            for segment in vad.feed(block_16k):
+                # Spotted commands have been handled already; the rest of the
+                # utterance ("stop, then back up to the cone") still goes to ASR.
+                rest = without_keywords(segment, keyword_spans)
+                if len(rest) >= MIN_REST_SEC * ASR_SR:
+                    client.submit(rest, ASR_SR)
@@ -1,7 +1,12 @@
-import board
 from time import sleep
 
-from adafruit_pca9685 import PCA9685
+from io_libraries.pwm_output import (
+    BusDeviceI2C,
+    PCA9685Output,
+    build_lookup_table,
+    duty_cycle_to_count,
+    lookup,
+)
 
 MOTOR_CHANNEL = 0
 SERVO_CHANNEL = 1
@@ -24,20 +29,36 @@ MAX_PWM_MODULE_INPUT = int(DUTY_CYCLE_MAX_VALUE/PERIOD_OF_FREQ_MICRO_SEC * MAX_T
 MID_PWM_MODULE_INPUT = int((MAX_PWM_MODULE_INPUT+MIN_PWM_MODULE_INPUT)/2)
 
 class Actuation():
-    def __init__(self):
+    def __init__(self, output=None):
+        """
+        output: optional PCA9685Output (e.g. over a FakePCA9685). By default
+        the board's PCA9685 is set up with the Adafruit driver and channel
+        updates are written through its I2C device directly.
+        """
+        if output is None:
+            import board
+            from adafruit_pca9685 import PCA9685
 
-        # Setup connection to pwm board 
-        self.i2c = board.I2C()
-        self.pca = PCA9685(self.i2c)
-        self.pca.frequency = PWM_FREQUENCY
+            # Setup connection to pwm board
+            self.i2c = board.I2C()
+            self.pca = PCA9685(self.i2c)
+            self.pca.frequency = PWM_FREQUENCY
+            output = PCA9685Output(BusDeviceI2C(self.pca.i2c_device))
+        self.output = output
 
         self.motor_speed = 0
         self.servo_angle = 0
 
-        self.pca.channels[MOTOR_CHANNEL].duty_cycle = MIN_THROTTLE_PULSE_LEN
-        # self.pca.channels[SERVO_CHANNEL].duty_cycle = self.servo_channel_duty
+        # Speed/steering in [-100, 100] -> 12-bit PCA9685 count.
+        self.motor_table = build_lookup_table(lambda v: duty_cycle_to_count(self.calc_pwm_value(v)))
+        self.servo_table = self.motor_table
+
+        self.output.set_counts({
+            MOTOR_CHANNEL: duty_cycle_to_count(MIN_THROTTLE_PULSE_LEN),
+            SERVO_CHANNEL: lookup(self.servo_table, self.servo_angle),
+        })
     
-    # Function to set the duty cycle of the motor. Takes a speed value from -1 to 1
+    # Function to set the duty cycle of the motor. Takes a speed value from -100 to 100
     def calc_pwm_value(self, speed):
         PWM_VAL = (MAX_PWM_MODULE_INPUT-MIN_PWM_MODULE_INPUT)/2*(speed/100) + MID_PWM_MODULE_INPUT
         PWM_VAL = min(PWM_VAL, MAX_PWM_MODULE_INPUT)
@@ -45,7 +66,22 @@ class Actuation():
         return int(PWM_VAL)
 
     def set_motor_speed(self, speed):
-        self.pca.channels[MOTOR_CHANNEL].duty_cycle = self.calc_pwm_value(speed)
+        self.motor_speed = speed
+        self.output.set_counts({MOTOR_CHANNEL: lookup(self.motor_table, speed)})
+
+    # Steering from -100 (full left) to 100 (full right); same 1-2 ms pulse range as the ESC.
+    def set_steering(self, angle):
+        self.servo_angle = angle
+        self.output.set_counts({SERVO_CHANNEL: lookup(self.servo_table, angle)})
+
+    def set_drive(self, speed, angle):
+        """Motor and steering in a single I2C burst (nothing is sent if neither changed)."""
+        self.motor_speed = speed
+        self.servo_angle = angle
+        self.output.set_counts({
+            MOTOR_CHANNEL: lookup(self.motor_table, speed),
+            SERVO_CHANNEL: lookup(self.servo_table, angle),
+        })
 
 if __name__ == "__main__":
     motor_control = Actuation()
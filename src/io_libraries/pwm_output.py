@@ -0,0 +1,127 @@
+# pwm_output.py
+#
+# Register-level PWM output for the PCA9685.
+#
+# The Adafruit driver does one I2C transaction per duty_cycle assignment.
+# PCA9685Output keeps a shadow copy of every channel's OFF count and writes
+# only channels whose register value actually changes; adjacent channels that
+# change together (motor + steering) go out as one auto-increment burst
+# starting at the lowest channel's LEDn_ON_L register.
+#
+# Notes:
+#   - Auto-increment (MODE1.AI) must be enabled; the Adafruit driver sets it
+#     when the frequency is assigned, FakePCA9685 assumes it.
+#   - All channels use ON = 0, so a channel's pulse width is its OFF count.
+
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from io_libraries.camera.I2CBus import I2CBus
+
+PCA9685_ADDRESS = 0x40
+PCA9685_CHANNELS = 16
+
+REG_LED0_ON_L = 0x06
+REGS_PER_CHANNEL = 4
+
+COUNT_MAX = 0x0FFF
+
+
+def duty_cycle_to_count(duty_cycle: int) -> int:
+    """Same 16-bit -> 12-bit mapping as adafruit_pca9685.PWMChannel.duty_cycle."""
+    return min((duty_cycle + 1) >> 4, COUNT_MAX)
+
+
+def build_lookup_table(fn, lo: int = -100, hi: int = 100) -> List[int]:
+    """Precompute fn(v) for every integer v in [lo, hi]."""
+    return [fn(v) for v in range(lo, hi + 1)]
+
+
+def lookup(table: Sequence[int], value: float, lo: int = -100) -> int:
+    i = int(round(value)) - lo
+    return table[min(max(i, 0), len(table) - 1)]
+
+
+class BusDeviceI2C(I2CBus):
+    """
+    I2CBus over an adafruit_bus_device I2CDevice (e.g. PCA9685.i2c_device),
+    so the Adafruit driver can still do setup while bursts go through here.
+    The device address is fixed by the I2CDevice; 'addr' is ignored.
+    """
+
+    def __init__(self, i2c_device):
+        self.i2c_device = i2c_device
+
+    def write_block(self, addr, reg, data):
+        with self.i2c_device as dev:
+            dev.write(bytes([reg & 0xFF] + [b & 0xFF for b in data]))
+
+
+class PCA9685Output:
+    def __init__(self, bus: I2CBus, address: int = PCA9685_ADDRESS):
+        self.bus = bus
+        self.address = address
+        self.transactions = 0
+        self.suppressed = 0
+        self._counts: List[Optional[int]] = [None] * PCA9685_CHANNELS
+        self._lock = threading.Lock()
+
+    def get_count(self, channel: int) -> Optional[int]:
+        return self._counts[channel]
+
+    def set_counts(self, counts: Dict[int, int]) -> int:
+        """
+        Set OFF counts for several channels. Unchanged channels are dropped;
+        the remaining ones are written as one burst spanning the lowest to
+        the highest changed channel (unchanged channels inside the span are
+        rewritten with their current value). Returns transactions issued.
+        """
+        with self._lock:
+            changed = {}
+            for ch, count in counts.items():
+                count = min(max(int(count), 0), COUNT_MAX)
+                if self._counts[ch] == count:
+                    self.suppressed += 1
+                else:
+                    changed[ch] = count
+            if not changed:
+                return 0
+
+            first, last = min(changed), max(changed)
+            data = []
+            for ch in range(first, last + 1):
+                count = changed.get(ch, self._counts[ch])
+                if count is None:
+                    count = 0
+                data += [0x00, 0x00, count & 0xFF, count >> 8]
+
+            self.bus.write_block(self.address, REG_LED0_ON_L + REGS_PER_CHANNEL * first, data)
+            self.transactions += 1
+            for ch in range(first, last + 1):
+                self._counts[ch] = changed.get(ch, self._counts[ch] or 0)
+            return 1
+
+
+class FakePCA9685(I2CBus):
+    """
+    In-memory PCA9685: decodes register bursts (auto-increment assumed) into
+    per-channel ON/OFF counts and counts I2C transactions.
+    """
+
+    def __init__(self, address: int = PCA9685_ADDRESS):
+        self.address = address
+        self.registers = bytearray(256)
+        self.transactions = 0
+        self._lock = threading.Lock()
+
+    def write_block(self, addr, reg, data):
+        if addr != self.address:
+            raise OSError("No PCA9685 at 0x{:02x}".format(addr))
+        with self._lock:
+            for i, value in enumerate(data):
+                self.registers[(reg + i) & 0xFF] = value & 0xFF
+            self.transactions += 1
+
+    def off_count(self, channel: int) -> int:
+        base = REG_LED0_ON_L + REGS_PER_CHANNEL * channel
+        return self.registers[base + 2] | ((self.registers[base + 3] & 0x0F) << 8)
@@ -0,0 +1,477 @@
+# recorder.py
+#
+# Session recording and replay: camera frames and telemetry (joystick and
+# network commands, lens positions, gesture outputs, ...) captured during a
+# real run, played back offline for profiling.
+#
+# On disk a session is a directory:
+#   streams.json       stream name -> id and kind ("frame", "json", "bytes")
+#   chunk_00000.dat    append-only records, a new chunk every chunk_bytes:
+#                        stream u16, t f64, length u32, payload   (network order)
+#   index.bin          one fixed-size entry per record, in write order:
+#                        t f64, stream u16, chunk u16, offset u64, length u32
+# The reader memory-maps the index and the chunks; seeking to a timestamp is
+# a binary search over the index's t column, and payloads are zero-copy
+# views into the mapped chunk. Index entries pointing past the end of a
+# chunk (crash mid-write) are ignored, and so is a partial entry at the end
+# of the index; appending to the session truncates that partial entry first,
+# so later entries stay aligned.
+#
+# Writing is off the hot path: record() only puts (stream, t, object) on a
+# bounded queue and never blocks; when the queue is full the record is
+# dropped and counted. Serialization (raw or JPEG frames, JSON) and file I/O
+# happen on the writer thread.
+#
+# Replay feeds a session back through Camera-compatible (ReplayCamera) and
+# NetLink-compatible (ReplayNetLink) objects, either at recorded speed
+# (speed=1.0, or any multiple) or as fast as possible (speed=None).
+
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+_REC_FMT = "!HdI"
+_REC_SIZE = struct.calcsize(_REC_FMT)
+_RAW_FMT = "!HHB"                            # height, width, channels
+_RAW_SIZE = struct.calcsize(_RAW_FMT)
+
+INDEX_DTYPE = np.dtype([("t", "<f8"), ("stream", "<u2"), ("chunk", "<u2"), ("offset", "<u8"), ("length", "<u4")])
+
+FRAME, JSON, BYTES = "frame", "json", "bytes"
+
+
+def _chunk_name(i: int) -> str:
+    return "chunk_{:05d}.dat".format(i)
+
+
+def _index_entries(index_path: str) -> int:
+    """Whole entries in index.bin; a partial one left by a crash is not counted."""
+    return os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+
+
+def encode_frame(frame: np.ndarray, codec: str = "raw", quality: int = 90) -> bytes:
+    if codec == "jpeg":
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return b"J" + jpeg.tobytes()
+    h, w = frame.shape[:2]
+    c = frame.shape[2] if frame.ndim == 3 else 1
+    return b"R" + struct.pack(_RAW_FMT, h, w, c) + np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+
+
+def decode_frame(payload) -> np.ndarray:
+    """Raw frames come back as read-only views of the mapped chunk (no copy)."""
+    kind = bytes(payload[:1])
+    if kind == b"J":
+        return cv2.imdecode(np.frombuffer(payload, np.uint8, offset=1), cv2.IMREAD_COLOR)
+    h, w, c = struct.unpack_from(_RAW_FMT, payload, 1)
+    arr = np.frombuffer(payload, np.uint8, h * w * c, 1 + _RAW_SIZE)
+    return arr.reshape((h, w, c) if c > 1 else (h, w))
+
+
+# ---------------- Writing ----------------
+
+class SessionRecorder:
+    def __init__(self, path: str, chunk_bytes: int = 256 << 20, queue_size: int = 256,
+                 frame_codec: str = "raw", jpeg_quality: int = 90, flush_every: int = 64):
+        self.path = path
+        self.chunk_bytes = chunk_bytes
+        self.frame_codec = frame_codec
+        self.jpeg_quality = jpeg_quality
+        self.flush_every = flush_every
+        os.makedirs(path, exist_ok=True)
+
+        self.streams: Dict[str, Dict[str, Any]] = {}
+        self._streams_lock = threading.Lock()
+        self._q: "queue.Queue" = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+        self._chunk = -1
+        self._data = None
+        self._offset = 0
+        self._index = None
+
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.bytes_written = 0
+
+    # ---------------- Hot path ----------------
+
+    def _stream_id(self, name: str, kind: str) -> int:
+        s = self.streams.get(name)
+        if s is None:
+            with self._streams_lock:
+                s = self.streams.get(name)
+                if s is None:
+                    s = {"id": len(self.streams), "kind": kind}
+                    self.streams = dict(self.streams, **{name: s})
+        return s["id"]
+
+    def _put(self, name: str, kind: str, obj: Any, t: Optional[float]) -> bool:
+        item = (self._stream_id(name, kind), kind, time.time() if t is None else t, obj)
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.recorded += 1
+        return True
+
+    def record(self, stream: str, payload: bytes, t: Optional[float] = None) -> bool:
+        """Queue raw bytes; returns False if the queue was full and the record dropped."""
+        return self._put(stream, BYTES, payload, t)
+
+    def record_frame(self, stream: str, frame: np.ndarray, t: Optional[float] = None) -> bool:
+        """The frame is encoded later on the writer thread: do not modify it afterwards."""
+        return self._put(stream, FRAME, frame, t)
+
+    def record_json(self, stream: str, obj: Any, t: Optional[float] = None) -> bool:
+        return self._put(stream, JSON, obj, t)
+
+    # ---------------- Writer thread ----------------
+
+    def _open_chunk(self) -> None:
+        if self._data is not None:
+            self._data.close()
+        self._chunk += 1
+        self._data = open(os.path.join(self.path, _chunk_name(self._chunk)), "ab")
+        self._offset = self._data.tell()
+
+    def _write_streams(self) -> None:
+        tmp = os.path.join(self.path, "streams.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.streams, f)
+        os.replace(tmp, os.path.join(self.path, "streams.json"))
+
+    def _serialize(self, kind: str, obj: Any) -> bytes:
+        if kind == FRAME:
+            return encode_frame(obj, self.frame_codec, self.jpeg_quality)
+        if kind == JSON:
+            return json.dumps(obj, separators=(",", ":")).encode()
+        return bytes(obj)
+
+    def _run(self) -> None:
+        known = 0
+        entry = np.zeros(1, dtype=INDEX_DTYPE)
+        pending = 0
+        while True:
+            item = self._q.get()
+            if item is None:
+                break
+            sid, kind, t, obj = item
+            if len(self.streams) != known:
+                # Before the record, so every indexed stream id has a name on disk.
+                known = len(self.streams)
+                self._write_streams()
+            payload = self._serialize(kind, obj)
+            if self._offset + _REC_SIZE + len(payload) > self.chunk_bytes and self._offset > 0:
+                self._open_chunk()
+            self._data.write(struct.pack(_REC_FMT, sid, t, len(payload)))
+            self._data.write(payload)
+            entry[0] = (t, sid, self._chunk, self._offset + _REC_SIZE, len(payload))
+            self._index.write(entry.tobytes())
+            self._offset += _REC_SIZE + len(payload)
+            self.written += 1
+            self.bytes_written += _REC_SIZE + len(payload)
+
+            pending += 1
+            if pending >= self.flush_every or self._q.empty():
+                self._data.flush()
+                self._index.flush()
+                pending = 0
+        self._write_streams()
+        self._data.close()
+        self._index.close()
+
+    def start(self) -> "SessionRecorder":
+        # Appending to an existing session continues its stream ids and last chunk.
+        streams_path = os.path.join(self.path, "streams.json")
+        if os.path.exists(streams_path):
+            with open(streams_path) as f:
+                self.streams = json.load(f)
+        while os.path.exists(os.path.join(self.path, _chunk_name(self._chunk + 1))):
+            self._chunk += 1
+        self._chunk = max(self._chunk, 0) - 1
+        self._open_chunk()
+        index_path = os.path.join(self.path, "index.bin")
+        if os.path.exists(index_path):
+            os.truncate(index_path, _index_entries(index_path) * INDEX_DTYPE.itemsize)
+        self._index = open(index_path, "ab")
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Write everything still queued, then close the files."""
+        if self._thread is not None:
+            self._q.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def report(self) -> str:
+        return "recorded {}  written {} ({:.1f} MB)  dropped {}".format(
+            self.recorded, self.written, self.bytes_written / 1e6, self.dropped)
+
+
+class RecordingCamera:
+    """Camera wrapper recording every frame it hands out."""
+
+    def __init__(self, camera, recorder: SessionRecorder, stream: str = "camera"):
+        self.camera = camera
+        self.recorder = recorder
+        self.stream = stream
+
+    def getFrameWithTimestamp(self, timeout=None):
+        frame, ts = self.camera.getFrameWithTimestamp(timeout)
+        self.recorder.record_frame(self.stream, frame, ts)
+        return frame, ts
+
+    def getFrame(self, timeout=None):
+        return self.getFrameWithTimestamp(timeout)[0]
+
+    def __getattr__(self, name):
+        return getattr(self.camera, name)
+
+
+class RecordingNetLink:
+    """NetLink wrapper recording received (and optionally sent) payloads."""
+
+    def __init__(self, link, recorder: SessionRecorder, stream: str = "udp", record_sent: bool = False):
+        self.link = link
+        self.recorder = recorder
+        self.stream = stream
+        self.record_sent = record_sent
+
+    def recv_udp(self, max_bytes: int = 2048):
+        pkt = self.link.recv_udp(max_bytes)
+        if pkt is not None:
+            self.recorder.record(self.stream, pkt[0])
+        return pkt
+
+    def send_udp(self, payload: bytes, peer=None) -> None:
+        if self.record_sent:
+            self.recorder.record(self.stream + ".sent", payload)
+        self.link.send_udp(payload, peer)
+
+    def recv_tcp(self):
+        payload = self.link.recv_tcp()
+        if payload is not None:
+            self.recorder.record(self.stream + ".tcp", payload)
+        return payload
+
+    def __getattr__(self, name):
+        return getattr(self.link, name)
+
+
+# ---------------- Reading ----------------
+
+@dataclass
+class Record:
+    stream: str
+    t: float
+    payload: memoryview
+
+
+class SessionReader:
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "streams.json")) as f:
+            self.streams: Dict[str, Dict[str, Any]] = json.load(f)
+        self._names = {s["id"]: name for name, s in self.streams.items()}
+
+        self._chunks: List[Optional[mmap.mmap]] = []
+        self._files = []
+        i = 0
+        while os.path.exists(os.path.join(path, _chunk_name(i))):
+            f = open(os.path.join(path, _chunk_name(i)), "rb")
+            size = os.fstat(f.fileno()).st_size
+            self._files.append(f)
+            self._chunks.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None)
+            i += 1
+
+        index_path = os.path.join(path, "index.bin")
+        n = _index_entries(index_path)      # read-only: a recorder may still be appending
+        index = np.memmap(index_path, INDEX_DTYPE, "r", shape=(n,)) if n else np.zeros(0, INDEX_DTYPE)
+        sizes = np.array([len(c) if c is not None else 0 for c in self._chunks] + [0], dtype=np.uint64)
+        chunk = np.minimum(index["chunk"], len(self._chunks)).astype(np.int64)
+        complete = index["offset"] + index["length"] <= sizes[chunk]
+        if not complete.all():
+            index = index[complete]
+        t = index["t"]
+        if len(t) > 1 and not (np.diff(t) >= 0).all():
+            index = index[np.argsort(t, kind="stable")]
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def time_range(self) -> Tuple[float, float]:
+        if not len(self.index):
+            return 0.0, 0.0
+        return float(self.index["t"][0]), float(self.index["t"][-1])
+
+    def seek(self, t: float) -> int:
+        """Position of the first record at or after t (binary search)."""
+        return int(np.searchsorted(self.index["t"], t, side="left"))
+
+    def _record(self, i: int) -> Record:
+        e = self.index[i]
+        chunk = self._chunks[int(e["chunk"])]
+        off = int(e["offset"])
+        return Record(self._names[int(e["stream"])], float(e["t"]), memoryview(chunk)[off:off + int(e["length"])])
+
+    def records(self, streams=None, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Record]:
+        """Records in time order, optionally only some streams and a time window."""
+        i = self.seek(start) if start is not None else 0
+        j = self.seek(end) if end is not None else len(self.index)
+        if streams is None:
+            positions = range(i, j)
+        else:
+            ids = [self.streams[s]["id"] for s in ([streams] if isinstance(streams, str) else streams)
+                   if s in self.streams]
+            positions = i + np.flatnonzero(np.isin(self.index["stream"][i:j], ids))
+        for p in positions:
+            yield self._record(int(p))
+
+    def decode(self, record: Record) -> Any:
+        kind = self.streams[record.stream]["kind"]
+        if kind == FRAME:
+            return decode_frame(record.payload)
+        if kind == JSON:
+            return json.loads(bytes(record.payload))
+        return bytes(record.payload)
+
+    def close(self) -> None:
+        self.index = np.zeros(0, INDEX_DTYPE)
+        for c in self._chunks:
+            if c is not None:
+                try:
+                    c.close()
+                except BufferError:
+                    pass                     # records / raw frames still reference it
+        for f in self._files:
+            f.close()
+
+
+# ---------------- Replay ----------------
+
+class ReplayClock:
+    """Maps recorded timestamps to wall time: speed=1.0 real time, None as fast as possible."""
+
+    def __init__(self, speed: Optional[float] = 1.0):
+        self.speed = speed
+        self._origin: Optional[Tuple[float, float]] = None
+
+    def wait_until(self, t: float) -> None:
+        if not self.speed:
+            return
+        now = time.monotonic()
+        if self._origin is None:
+            self._origin = (t, now)
+            return
+        delay = self._origin[1] + (t - self._origin[0]) / self.speed - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ReplayCamera:
+    """
+    Camera-compatible playback of a recorded frame stream: getFrame,
+    getFrameWithTimestamp, and get_cv2_handle() returning an object with
+    cv2.VideoCapture's read / isOpened / release.
+    """
+
+    def __init__(self, session: SessionReader, stream: str = "camera", speed: Optional[float] = 1.0,
+                 start: Optional[float] = None, clock: Optional[ReplayClock] = None):
+        self.session = session
+        self.clock = clock or ReplayClock(speed)
+        self._records = session.records(stream, start=start)
+        self._lock = threading.Lock()
+        self._open = True
+
+    def getFrameWithTimestamp(self, timeout=None):
+        """Next recorded (frame, timestamp); raises queue.Empty at the end of the recording."""
+        with self._lock:
+            rec = next(self._records, None)
+        if rec is None:
+            self._open = False
+            raise queue.Empty
+        self.clock.wait_until(rec.t)
+        return self.session.decode(rec), rec.t
+
+    def getFrame(self, timeout=None):
+        return self.getFrameWithTimestamp(timeout)[0]
+
+    # cv2.VideoCapture-style handle
+    def get_cv2_handle(self):
+        return self
+
+    def read(self):
+        try:
+            return True, self.getFrame()
+        except queue.Empty:
+            return False, None
+
+    def isOpened(self) -> bool:
+        return self._open
+
+    def release(self) -> None:
+        self._open = False
+
+    def close(self) -> None:
+        self.release()
+
+
+class ReplayNetLink:
+    """
+    NetLink-compatible playback of recorded UDP / TCP payloads. recv_udp and
+    recv_tcp return the next recorded payload when it is due, or None at the
+    end of the recording; sends are collected in self.sent.
+    """
+
+    def __init__(self, session: SessionReader, stream: str = "udp", speed: Optional[float] = 1.0,
+                 start: Optional[float] = None, clock: Optional[ReplayClock] = None,
+                 peer: Tuple[str, int] = ("replay", 0)):
+        self.clock = clock or ReplayClock(speed)
+        self.peer = peer
+        self._udp = session.records(stream, start=start)
+        self._tcp = session.records(stream + ".tcp", start=start)
+        self.sent: List[bytes] = []
+
+    def _next(self, records) -> Optional[bytes]:
+        rec = next(records, None)
+        if rec is None:
+            return None
+        self.clock.wait_until(rec.t)
+        return bytes(rec.payload)
+
+    def recv_udp(self, max_bytes: int = 2048):
+        payload = self._next(self._udp)
+        return None if payload is None else (payload[:max_bytes], self.peer)
+
+    def recv_tcp(self):
+        return self._next(self._tcp)
+
+    def send_udp(self, payload: bytes, peer=None) -> None:
+        self.sent.append(payload)
+
+    def send_tcp(self, payload: bytes) -> None:
+        self.sent.append(payload)
+
+    def tcp_connected(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,224 @@
+# teleop.py
+#
+# Joystick teleoperation over NetLink UDP.
+#
+# Pi side:    TeleopSender samples JoySticks at a fixed rate and sends a packet
+#             only when the command changed (plus a periodic keepalive).
+# Jetson side: TeleopReceiver decodes packets and hands each new command, in
+#             order, to a callback / control-loop mailbox.
+#
+# Every packet carries the last K commands, so a command lost with one packet
+# is recovered from the next one without any retransmission.
+#
+# Packet layout (network byte order, CRC32 appended by NetLink):
+#   header:  packet_seq u32, sent_at f64 (time.time()), count u8
+#   count x: cmd_seq u32, sampled_at f64 (time.time()), speed f32, steering f32
+# Commands are ordered oldest -> newest.
+
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from io_libraries.joystick import STICK_CENTER, JoystickSnapshot
+from io_libraries.netlink import NetLink
+
+_HDR_FMT = "!IdB"
+_HDR_SIZE = struct.calcsize(_HDR_FMT)
+_CMD_FMT = "!Idff"
+_CMD_SIZE = struct.calcsize(_CMD_FMT)
+
+NETWORK_SOURCE = "network"
+RESTART_GAP = 1000                   # packet_seq jump back treated as a sender restart
+
+
+@dataclass
+class TeleopConfig:
+    rate_hz: float = 100.0
+    redundancy: int = 4              # commands carried per packet (K)
+    keepalive_s: float = 0.1         # resend even if unchanged after this long
+    change_threshold: float = 0.5    # in command units (-100..100)
+
+
+@dataclass(frozen=True)
+class TeleopCommand:
+    seq: int
+    sampled_at: float
+    speed: float
+    steering: float
+
+
+def sticks_to_command(snap: JoystickSnapshot) -> Tuple[float, float]:
+    """Left stick Y -> speed, right stick X -> steering, both -100..100."""
+    speed = (snap.left_y - STICK_CENTER) * 200.0
+    steering = (snap.right_x - STICK_CENTER) * 200.0
+    return speed, steering
+
+
+def encode_packet(packet_seq: int, commands: List[TeleopCommand], sent_at: Optional[float] = None) -> bytes:
+    parts = [struct.pack(_HDR_FMT, packet_seq, time.time() if sent_at is None else sent_at, len(commands))]
+    for c in commands:
+        parts.append(struct.pack(_CMD_FMT, c.seq, c.sampled_at, c.speed, c.steering))
+    return b"".join(parts)
+
+
+def decode_packet(payload: bytes) -> Optional[Tuple[int, float, List[TeleopCommand]]]:
+    if len(payload) < _HDR_SIZE:
+        return None
+    packet_seq, sent_at, count = struct.unpack_from(_HDR_FMT, payload)
+    if len(payload) != _HDR_SIZE + count * _CMD_SIZE:
+        return None
+    commands = [TeleopCommand(*struct.unpack_from(_CMD_FMT, payload, _HDR_SIZE + i * _CMD_SIZE))
+                for i in range(count)]
+    return packet_seq, sent_at, commands
+
+
+class TeleopSender:
+    def __init__(self, link: NetLink, sticks, cfg: Optional[TeleopConfig] = None,
+                 mapping: Callable[[JoystickSnapshot], Tuple[float, float]] = sticks_to_command):
+        """
+        link: NetLink with udp_peer set. sticks: JoySticks (ideally with its
+        sampler running, so each step is a snapshot read rather than SPI).
+        """
+        self.link = link
+        self.sticks = sticks
+        self.cfg = cfg or TeleopConfig()
+        self.mapping = mapping
+
+        self.history: deque = deque(maxlen=self.cfg.redundancy)
+        self.packet_seq = 0
+        self.cmd_seq = 0
+        self.packets_sent = 0
+        self.keepalives = 0
+        self._last_send = float("-inf")
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _changed(self, speed: float, steering: float) -> bool:
+        if not self.history:
+            return True
+        last = self.history[-1]
+        thr = self.cfg.change_threshold
+        return abs(speed - last.speed) >= thr or abs(steering - last.steering) >= thr
+
+    def step(self, now: Optional[float] = None) -> bool:
+        """Sample once; returns True if a packet was sent."""
+        now = time.monotonic() if now is None else now
+        speed, steering = self.mapping(self.sticks.get_snapshot())
+
+        if self._changed(speed, steering):
+            self.cmd_seq += 1
+            self.history.append(TeleopCommand(self.cmd_seq, time.time(), speed, steering))
+        elif now - self._last_send >= self.cfg.keepalive_s:
+            self.keepalives += 1
+        else:
+            return False
+
+        self.packet_seq += 1
+        self.link.send_udp(encode_packet(self.packet_seq, list(self.history)))
+        self.packets_sent += 1
+        self._last_send = now
+        return True
+
+    def run(self) -> None:
+        self._running = True
+        period = 1.0 / self.cfg.rate_hz
+        next_t = time.monotonic()
+        while self._running:
+            self.step()
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_t = time.monotonic()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="teleop-sender", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class TeleopReceiver:
+    """
+    Decodes teleop packets and delivers every command newer than the last one
+    delivered, oldest first. Commands that only arrive through a later
+    packet's redundancy are counted as recovered; sequence gaps that no packet
+    covered are counted as lost.
+
+    A restarted sender counts from 1 again. A packet whose packet_seq is
+    RESTART_GAP or more behind the newest one, or behind it but sent later,
+    starts a new session: the sequence state is reset and its commands are
+    delivered as usual (a late, reordered packet is older on both counts).
+
+    A held stick only produces keepalives repeating the last command. Those
+    call on_command again with that command (counted in refreshed, not
+    returned), so a latest-value consumer such as the control loop's mailbox
+    stays within its command deadline.
+
+    on_command defaults to nothing; to drive the truck pass e.g.
+        lambda c: loop.submit(NETWORK_SOURCE, c.speed, c.steering)
+    """
+
+    def __init__(self, link: NetLink, on_command: Optional[Callable[[TeleopCommand], None]] = None):
+        self.link = link
+        self.on_command = on_command
+        self.last_seq = 0
+        self.last_packet_seq = 0
+        self.last_sent_at = float("-inf")
+        self.packets = 0
+        self.restarts = 0
+        self.delivered = 0
+        self.refreshed = 0
+        self.recovered = 0
+        self.lost = 0
+
+    def handle(self, payload: bytes) -> List[TeleopCommand]:
+        decoded = decode_packet(payload)
+        if decoded is None:
+            return []
+        packet_seq, sent_at, commands = decoded
+        self.packets += 1
+        back = self.last_packet_seq - packet_seq
+        if back >= RESTART_GAP or (back > 0 and sent_at > self.last_sent_at):
+            self.restarts += 1
+            self.last_seq = 0
+            back = 0
+        if back <= 0:
+            self.last_packet_seq = packet_seq
+            self.last_sent_at = sent_at
+
+        new = [c for c in commands if c.seq > self.last_seq]
+        if not new:
+            # Keepalive: the newest packet so far, repeating the last command.
+            if back <= 0 and commands and commands[-1].seq == self.last_seq:
+                self.refreshed += 1
+                if self.on_command is not None:
+                    self.on_command(commands[-1])
+            return []
+        if self.last_seq:
+            if new[0].seq > self.last_seq + 1:
+                self.lost += new[0].seq - self.last_seq - 1
+            # All but the newest command were first sent in packets we missed.
+            self.recovered += len(new) - 1
+        self.last_seq = new[-1].seq
+        self.delivered += len(new)
+
+        if self.on_command is not None:
+            for c in new:
+                self.on_command(c)
+        return new
+
+    def poll(self) -> List[TeleopCommand]:
+        """Receive at most one packet (waits up to the link's UDP timeout)."""
+        pkt = self.link.recv_udp()
+        if pkt is None:
+            return []
+        return self.handle(pkt[0])
@@ -0,0 +1,186 @@
+# vad.py
+#
+# Streaming voice-activity segmentation for live transcription: audio goes in
+# as it is captured, whole speech segments come out, and silence never
+# reaches the ASR server.
+#
+# Detection is spectral and vectorized per fed block: the block is cut into
+# frame_ms analysis frames, and each frame's energy in the speech band
+# (band_hz) is compared against an adaptive noise floor. The floor follows
+# non-speech frames (falls fast, rises slowly), so steady fan or motor noise
+# is absorbed while speech stands threshold_db above it. It never sits below
+# the quietest frame of the last noise_window_s, speech or not: noise that
+# steps up (a fan switching on) is above threshold and so never adapted to by
+# the smoothing alone, but it lifts that minimum within one window.
+#
+# Segmentation is a small per-frame state machine:
+#   - a segment opens after start_ms of consecutive speech frames, and
+#     includes pre_roll_ms of audio from before the onset, so soft word
+#     starts are kept;
+#   - it stays open through pauses shorter than hangover_ms, which also pads
+#     its end;
+#   - it is cut at max_segment_s (forced=True); if speech continues, the next
+#     segment starts right after the cut.
+# Segments shorter than min_segment_ms are discarded as clicks.
+
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+
+@dataclass
+class VadConfig:
+    sample_rate: int = 16000
+    frame_ms: float = 20.0
+    band_hz: tuple = (250.0, 3800.0)
+
+    # Speech: band energy this far above the noise floor, and above abs_floor_db (dBFS).
+    threshold_db: float = 10.0
+    abs_floor_db: float = -60.0
+    noise_rise: float = 0.02                 # per-frame smoothing when the level rises
+    noise_fall: float = 0.3                  # ... and when it falls
+    noise_window_s: float = 3.0              # floor >= minimum frame level over this long
+
+    start_ms: float = 60.0
+    pre_roll_ms: float = 300.0
+    hangover_ms: float = 400.0
+    max_segment_s: float = 8.0
+    min_segment_ms: float = 200.0
+
+
+@dataclass
+class SpeechSegment:
+    audio: np.ndarray                        # int16 samples at sample_rate
+    start: int                               # stream sample index of audio[0]
+    forced: bool = False                     # cut at max_segment_s
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.audio)
+
+
+class StreamingVAD:
+    def __init__(self, config: VadConfig = VadConfig()):
+        c = config
+        self.config = c
+        self.frame_len = int(round(c.sample_rate * c.frame_ms / 1000.0))
+        freqs = np.fft.rfftfreq(self.frame_len, 1.0 / c.sample_rate)
+        self._band = (freqs >= c.band_hz[0]) & (freqs <= c.band_hz[1])
+        self._window = np.hanning(self.frame_len).astype(np.float32)
+        # Parseval: in-band mean square of the windowed frame (full-scale sine: -3 dB).
+        self._scale = 2.0 / (self.frame_len * np.sum(self._window.astype(np.float64) ** 2))
+
+        frames = lambda ms: max(int(round(ms / c.frame_ms)), 1)
+        self._start_frames = frames(c.start_ms)
+        self._hangover_frames = frames(c.hangover_ms)
+        self._max_frames = frames(c.max_segment_s * 1000.0)
+        self._min_frames = frames(c.min_segment_ms)
+        self._window_frames = frames(c.noise_window_s * 1000.0)
+        # (frame number, level) with increasing levels; the front is the window minimum.
+        self._minima: deque = deque()
+        # Frames held back while not in a segment: pre-roll plus the onset run.
+        self._pre = deque(maxlen=frames(c.pre_roll_ms) + self._start_frames)
+
+        self._rest = np.zeros(0, dtype=np.int16)
+        self._pos = 0                        # stream sample index of the next frame
+        self._noise_db: Optional[float] = None
+        self._run = 0                        # consecutive speech frames
+        self._silent = 0                     # non-speech frames since the last speech in a segment
+        self._segment: Optional[List[np.ndarray]] = None
+        self._segment_start = 0
+        self._speech_frames = 0
+        self.frames = 0
+        self.speech_frames = 0
+
+    def levels_db(self, frames: np.ndarray) -> np.ndarray:
+        """Speech-band energy in dBFS of (n, frame_len) int16 frames."""
+        x = frames.astype(np.float32) * (self._window / 32768.0)
+        power = np.abs(np.fft.rfft(x, axis=1)[:, self._band]) ** 2
+        return 10.0 * np.log10(power.sum(axis=1) * self._scale + 1e-12)
+
+    @property
+    def noise_db(self) -> Optional[float]:
+        return self._noise_db
+
+    @property
+    def in_speech(self) -> bool:
+        return self._segment is not None
+
+    def feed(self, samples: np.ndarray) -> List[SpeechSegment]:
+        """Add mono int16 samples; returns the segments completed by them."""
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        if len(self._rest):
+            samples = np.concatenate([self._rest, samples])
+        n = len(samples) // self.frame_len
+        self._rest = samples[n * self.frame_len:].copy()
+        if n == 0:
+            return []
+        frames = samples[:n * self.frame_len].reshape(n, self.frame_len)
+        levels = self.levels_db(frames)
+
+        c = self.config
+        out = []
+        minima = self._minima
+        for frame, level in zip(frames, levels):
+            while minima and minima[-1][1] >= level:
+                minima.pop()
+            minima.append((self.frames, level))
+            if minima[0][0] <= self.frames - self._window_frames:
+                minima.popleft()
+            noise = level if self._noise_db is None else max(self._noise_db, minima[0][1])
+            speech = level > max(noise + c.threshold_db, c.abs_floor_db)
+            if not speech:
+                k = c.noise_fall if level < noise else c.noise_rise
+                noise += k * (level - noise)
+            self._noise_db = noise
+            self.frames += 1
+            self.speech_frames += bool(speech)
+            seg = self._step(frame, speech)
+            if seg is not None:
+                out.append(seg)
+            self._pos += self.frame_len
+        return out
+
+    def _step(self, frame: np.ndarray, speech: bool) -> Optional[SpeechSegment]:
+        self._run = self._run + 1 if speech else 0
+        if self._segment is None:
+            self._pre.append(frame)
+            if self._run >= self._start_frames:
+                self._segment = list(self._pre)
+                self._segment_start = self._pos + self.frame_len - len(self._pre) * self.frame_len
+                self._speech_frames = self._run
+                self._silent = 0
+                self._pre.clear()
+            return None
+
+        self._segment.append(frame)
+        if speech:
+            self._silent = 0
+            self._speech_frames += 1
+        else:
+            self._silent += 1
+        if self._silent >= self._hangover_frames:
+            return self._close(False)
+        if len(self._segment) >= self._max_frames:
+            seg = self._close(True)
+            if speech:
+                # Still talking: carry on in a fresh segment without re-triggering.
+                self._segment, self._segment_start, self._speech_frames = [], self._pos + self.frame_len, 0
+            return seg
+        return None
+
+    def _close(self, forced: bool) -> Optional[SpeechSegment]:
+        frames, start, speech = self._segment, self._segment_start, self._speech_frames
+        self._segment = None
+        self._run = 0
+        if not frames or (speech < self._min_frames and not forced):
+            return None
+        return SpeechSegment(np.concatenate(frames), start, forced)
+
+    def flush(self) -> Optional[SpeechSegment]:
+        """End of stream: close the open segment, if any."""
+        if self._segment is None:
+            return None
+        return self._close(False)
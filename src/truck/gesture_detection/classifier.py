@@ -0,0 +1,93 @@
+# classifier.py
+#
+# Gesture classification on top of features.hand_features().
+#
+# NearestCentroidClassifier: one standardized centroid per gesture; a hand is
+# assigned to the closest centroid, or rejected (-1) when even that one is
+# further than the reject distance. Fitting and prediction are plain NumPy,
+# prediction for a frame is a single (n_hands x n_gestures) distance matrix.
+#
+# GestureEngine: keypoints in, (label ids, distances) out. Without an explicit
+# classifier it fits one on synthetic template hands (landmarks.GESTURE_POSES);
+# for real use fit/save one from recorded landmarks and load it.
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from truck.gesture_detection.features import hand_features
+from truck.gesture_detection.landmarks import GESTURE_POSES, synthetic_hands
+
+NO_GESTURE = -1
+
+
+class NearestCentroidClassifier:
+    def __init__(self, labels: Sequence[str], centroids: np.ndarray, scale: np.ndarray,
+                 reject_distance: float = np.inf):
+        self.labels = list(labels)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.reject_distance = float(reject_distance)
+        self._c = self.centroids / self.scale
+        self._c_sq = np.einsum("kf,kf->k", self._c, self._c)
+
+    @classmethod
+    def fit(cls, features: np.ndarray, labels: Sequence[str], reject_quantile: float = 0.995):
+        """
+        features: (n, F); labels: n names. The reject distance is the given
+        quantile of the training samples' distances to their own centroid.
+        """
+        labels = np.asarray(labels)
+        names = sorted(set(labels.tolist()))
+        scale = features.std(axis=0) + 1e-3
+        centroids = np.stack([features[labels == name].mean(axis=0) for name in names])
+        model = cls(names, centroids, scale)
+        ids, dist = model.predict(features)
+        own = dist[ids == np.searchsorted(names, labels)]
+        model.reject_distance = float(np.quantile(own, reject_quantile)) if len(own) else np.inf
+        return model
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(n, F) -> (label ids (n,) with NO_GESTURE for rejects, distances (n,))."""
+        x = features / self.scale
+        # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, one matmul for all hands and gestures
+        d2 = np.einsum("nf,nf->n", x, x)[:, None] - 2.0 * x @ self._c.T + self._c_sq[None, :]
+        ids = np.argmin(d2, axis=1)
+        dist = np.sqrt(np.maximum(d2[np.arange(len(ids)), ids], 0.0))
+        ids[dist > self.reject_distance] = NO_GESTURE
+        return ids, dist
+
+    def save(self, path: str) -> None:
+        np.savez(path, labels=np.array(self.labels), centroids=self.centroids,
+                 scale=self.scale, reject_distance=self.reject_distance)
+
+    @classmethod
+    def load(cls, path: str) -> "NearestCentroidClassifier":
+        data = np.load(path)
+        return cls(data["labels"].tolist(), data["centroids"], data["scale"],
+                   float(data["reject_distance"]))
+
+
+def fit_synthetic_classifier(samples_per_gesture: int = 300, dims: int = 3,
+                             seed: int = 0) -> NearestCentroidClassifier:
+    rng = np.random.default_rng(seed)
+    names = list(GESTURE_POSES)
+    poses = [GESTURE_POSES[name] for name in names for _ in range(samples_per_gesture)]
+    labels = [name for name in names for _ in range(samples_per_gesture)]
+    noise = rng.uniform(0.0, 0.08, len(poses))
+    return NearestCentroidClassifier.fit(hand_features(synthetic_hands(poses, rng, noise=noise), dims), labels)
+
+
+class GestureEngine:
+    def __init__(self, classifier: Optional[NearestCentroidClassifier] = None, dims: int = 3):
+        """dims=3 for MediaPipe (x, y, z); dims=2 for YOLO pose (x, y, conf)."""
+        self.dims = dims
+        self.classifier = classifier or fit_synthetic_classifier(dims=dims)
+        self.labels = self.classifier.labels
+
+    def classify(self, keypoints: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(n_hands, 21, 3) -> (label ids, distances); ids index self.labels."""
+        return self.classifier.predict(hand_features(keypoints, self.dims))
+
+    def label_names(self, ids: np.ndarray) -> List[Optional[str]]:
+        return [self.labels[i] if i != NO_GESTURE else None for i in ids]
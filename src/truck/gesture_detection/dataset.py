@@ -0,0 +1,243 @@
+# dataset.py
+#
+# Offline landmark-dataset builder: runs the hand-pose detector over recorded
+# videos in a process pool and stores the results as a memory-mapped,
+# columnar .npy dataset for fitting gesture classifiers.
+#
+# Work is split into shards of at most shard_frames consecutive frames of one
+# video, so long videos spread over all workers. Each worker process builds
+# its own detector once (pool initializer) and streams its shard's frames
+# with cv2.VideoCapture from the shard's first frame, without pacing.
+#
+# The dataset directory holds one .npy column per field, one row per frame:
+#   landmarks (F, max_hands, 21, 3) f32   keypoints, best hands first
+#   scores    (F, max_hands)        f32   detection scores (0 for no hand)
+#   hands     (F,)                  u1    detected hands (capped at max_hands)
+#   valid     (F,)                  u1    frame was decoded and processed
+#   video     (F,)                  i32   index into manifest["videos"]
+#   frame     (F,)                  i32   frame number within the video
+#   label     (F,)                  i16   index into manifest["labels"], -1 unlabeled
+#   done      (n_shards,)           u1    shard finished
+# plus manifest.json (videos, labels, shards and their row ranges). Rows for
+# every frame are allocated up front from the videos' frame counts, so
+# workers write their shard's rows in place through np.lib.format.open_memmap
+# and nothing is gathered in the parent. Shards are marked done only after
+# their rows are flushed; rerunning build_dataset() on the same directory
+# skips finished shards and redoes interrupted ones.
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from truck.gesture_detection.landmarks import NUM_KEYPOINTS
+
+FRAME_COLUMNS = ("landmarks", "scores", "hands", "valid", "video", "frame", "label")
+
+_detector = None
+
+
+def _column_path(path: str, name: str) -> str:
+    return os.path.join(path, name + ".npy")
+
+
+def video_label(video: str) -> str:
+    """Default labelling: the video's parent directory name (e.g. clips/peace/001.mp4 -> "peace")."""
+    return os.path.basename(os.path.dirname(os.path.abspath(video)))
+
+
+def _frame_count(video: str) -> int:
+    cap = cv2.VideoCapture(video)
+    n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+    cap.release()
+    return max(n, 0)
+
+
+def _create(path: str, videos: Sequence[str], labels: Sequence[Optional[str]], max_hands: int,
+            shard_frames: int) -> Dict:
+    counts = [_frame_count(v) for v in videos]
+    names = sorted({l for l in labels if l is not None})
+    shards, row = [], 0
+    for vi, n in enumerate(counts):
+        for start in range(0, n, shard_frames):
+            stop = min(start + shard_frames, n)
+            shards.append({"video": vi, "start": start, "stop": stop, "row": row})
+            row += stop - start
+    total = row
+
+    os.makedirs(path, exist_ok=True)
+    open_memmap = np.lib.format.open_memmap
+    open_memmap(_column_path(path, "landmarks"), "w+", np.float32, (total, max_hands, NUM_KEYPOINTS, 3)).flush()
+    open_memmap(_column_path(path, "scores"), "w+", np.float32, (total, max_hands)).flush()
+    open_memmap(_column_path(path, "hands"), "w+", np.uint8, (total,)).flush()
+    open_memmap(_column_path(path, "valid"), "w+", np.uint8, (total,)).flush()
+    video = open_memmap(_column_path(path, "video"), "w+", np.int32, (total,))
+    frame = open_memmap(_column_path(path, "frame"), "w+", np.int32, (total,))
+    label = open_memmap(_column_path(path, "label"), "w+", np.int16, (total,))
+    for s in shards:
+        rows = slice(s["row"], s["row"] + s["stop"] - s["start"])
+        video[rows] = s["video"]
+        frame[rows] = np.arange(s["start"], s["stop"])
+        l = labels[s["video"]]
+        label[rows] = names.index(l) if l is not None else -1
+    for col in (video, frame, label):
+        col.flush()
+    open_memmap(_column_path(path, "done"), "w+", np.uint8, (len(shards),)).flush()
+
+    manifest = {
+        "videos": [os.path.abspath(v) for v in videos],
+        "labels": names,
+        "frame_counts": counts,
+        "max_hands": max_hands,
+        "shards": shards,
+        "rows": total,
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+# ---------------- Worker side ----------------
+
+def _init_worker(detector_factory: Callable[[], Callable]) -> None:
+    global _detector
+    # One process per core already; keep OpenCV from spawning its own threads.
+    cv2.setNumThreads(1)
+    _detector = detector_factory()
+
+
+def _run_shard(path: str, video: str, shard_id: int, start: int, stop: int, row: int, max_hands: int) -> tuple:
+    landmarks = np.load(_column_path(path, "landmarks"), mmap_mode="r+")
+    scores = np.load(_column_path(path, "scores"), mmap_mode="r+")
+    hands = np.load(_column_path(path, "hands"), mmap_mode="r+")
+    valid = np.load(_column_path(path, "valid"), mmap_mode="r+")
+
+    cap = cv2.VideoCapture(video)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    t0 = time.perf_counter()
+    processed = 0
+    for i in range(stop - start):
+        ok, image = cap.read()
+        if not ok:
+            break
+        dets = _detector(image)
+        r = row + i
+        n = min(len(dets), max_hands)
+        landmarks[r] = 0.0
+        scores[r] = 0.0
+        if n:
+            order = np.argsort(-dets.scores)[:n]
+            kp = dets.keypoints[order]
+            d = min(kp.shape[-1], 3)
+            landmarks[r, :n, :, :d] = kp[:, :NUM_KEYPOINTS, :d]
+            scores[r, :n] = dets.scores[order]
+        hands[r] = n
+        valid[r] = 1
+        processed += 1
+    cap.release()
+    for col in (landmarks, scores, hands, valid):
+        col.flush()
+    return shard_id, processed, time.perf_counter() - t0
+
+
+# ---------------- Parent side ----------------
+
+def build_dataset(path: str, videos: Sequence[str], detector_factory: Callable[[], Callable],
+                  workers: int = os.cpu_count() or 1, labels: Optional[Sequence[Optional[str]]] = None,
+                  max_hands: int = 2, shard_frames: int = 600, verbose: bool = True) -> Dict:
+    """
+    Extract landmarks from 'videos' into the dataset at 'path' (created, or
+    resumed if it exists). detector_factory runs once in every worker and
+    returns detector(image) -> roi.Detections, e.g.
+    functools.partial(load_backend, "best.onnx"). labels: one name (or
+    None) per video; defaults to video_label(). Returns a summary dict.
+    """
+    manifest_path = os.path.join(path, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest["videos"] != [os.path.abspath(v) for v in videos]:
+            raise ValueError("{} was built from different videos; use a new directory".format(path))
+    else:
+        labels = [video_label(v) for v in videos] if labels is None else list(labels)
+        manifest = _create(path, videos, labels, max_hands, shard_frames)
+
+    done = np.load(_column_path(path, "done"), mmap_mode="r+")
+    todo = [i for i, s in enumerate(manifest["shards"]) if not done[i]]
+    if verbose:
+        print("{} shards, {} already done, {} workers".format(len(done), len(done) - len(todo), workers))
+
+    start = time.perf_counter()
+    frames = 0
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(detector_factory,)) as pool:
+        futures = []
+        for i in todo:
+            s = manifest["shards"][i]
+            futures.append(pool.submit(_run_shard, path, manifest["videos"][s["video"]], i,
+                                       s["start"], s["stop"], s["row"], manifest["max_hands"]))
+        try:
+            for fut in as_completed(futures):
+                shard_id, processed, _ = fut.result()
+                done[shard_id] = 1
+                done.flush()
+                frames += processed
+        except BaseException:
+            # Finished shards stay marked; don't start the rest.
+            for fut in futures:
+                fut.cancel()
+            raise
+    elapsed = time.perf_counter() - start
+    if verbose and frames:
+        print("{} frames in {:.1f} s: {:.1f} fps".format(frames, elapsed, frames / elapsed))
+    return {"frames": frames, "seconds": elapsed, "fps": frames / elapsed if elapsed > 0 else 0.0,
+            "shards": len(todo), "complete": bool(np.all(done))}
+
+
+def load_dataset(path: str) -> Dict:
+    """Read-only memmaps of every column, plus "manifest"."""
+    with open(os.path.join(path, "manifest.json")) as f:
+        data = {"manifest": json.load(f)}
+    for name in FRAME_COLUMNS + ("done",):
+        data[name] = np.load(_column_path(path, name), mmap_mode="r")
+    return data
+
+
+def hand_samples(data: Dict, min_score: float = 0.5, best_only: bool = True):
+    """
+    Flatten a loaded dataset to per-hand samples for classifier fitting:
+    (keypoints (n, 21, 3), label names (n,)) of labelled frames.
+    """
+    valid = (data["valid"] == 1) & (data["label"] >= 0)
+    k = 1 if best_only else data["scores"].shape[1]
+    scores = np.asarray(data["scores"][:, :k])
+    keep = valid[:, None] & (scores >= min_score)
+    rows, slots = np.nonzero(keep)
+    names = np.asarray(data["manifest"]["labels"])
+    return np.asarray(data["landmarks"][rows, slots]), names[data["label"][rows]]
+
+
+def parse_cmdline():
+    import argparse
+    parser = argparse.ArgumentParser(description='Build a landmark dataset from recorded videos.')
+    parser.add_argument('out', help='Dataset directory (resumed if it exists).')
+    parser.add_argument('videos', nargs='+', help='Videos; labels default to their parent directory names.')
+    parser.add_argument('--weights', default='best.onnx', help='.onnx (ONNX Runtime) or .pt (torch) model.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-hands', type=int, default=2)
+    parser.add_argument('--shard-frames', type=int, default=600)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    import functools
+    from truck.vision.backends import load_backend
+
+    args = parse_cmdline()
+    kwargs = {"threads": 1} if args.weights.endswith(".onnx") else {"device": "cpu"}
+    build_dataset(args.out, args.videos, functools.partial(load_backend, args.weights, **kwargs),
+                  workers=args.workers, max_hands=args.max_hands, shard_frames=args.shard_frames)
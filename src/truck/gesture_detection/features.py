@@ -0,0 +1,58 @@
+# features.py
+#
+# Translation-, scale- and rotation-invariant hand features, computed for all
+# hands at once with NumPy (no Python loop over hands or joints).
+#
+# Per hand (30 values):
+#   15  joint bend angles (3 per finger), in units of pi
+#   10  pairwise fingertip distances / palm size
+#    5  fingertip-to-wrist distances / palm size
+
+import numpy as np
+
+from truck.gesture_detection.landmarks import (
+    FINGER_CHAINS,
+    FINGERTIPS,
+    INDEX_MCP,
+    MIDDLE_MCP,
+    PINKY_MCP,
+    WRIST,
+)
+
+NUM_FEATURES = 30
+
+_TIP_I, _TIP_J = np.triu_indices(len(FINGERTIPS), k=1)
+_EPS = 1e-9
+
+
+def palm_size(kp: np.ndarray) -> np.ndarray:
+    """(n, 21, d) -> (n,) mean of wrist-to-middle-MCP and index-to-pinky-MCP lengths."""
+    length = np.linalg.norm(kp[:, MIDDLE_MCP] - kp[:, WRIST], axis=-1)
+    width = np.linalg.norm(kp[:, PINKY_MCP] - kp[:, INDEX_MCP], axis=-1)
+    return 0.5 * (length + width) + _EPS
+
+
+def hand_features(keypoints: np.ndarray, dims: int = 3) -> np.ndarray:
+    """
+    keypoints: (n, 21, >=dims) array. dims=3 uses z (MediaPipe); use dims=2
+    when the third channel is a confidence (YOLO pose).
+    Returns (n, NUM_FEATURES) float32.
+    """
+    kp = np.asarray(keypoints, dtype=np.float64)[..., :dims]
+    n = kp.shape[0]
+    out = np.empty((n, NUM_FEATURES), dtype=np.float32)
+    if n == 0:
+        return out
+
+    # Bones along each finger: (n, 5, 4, d); bend angle between consecutive bones.
+    chain = kp[:, FINGER_CHAINS]
+    bones = chain[:, :, 1:] - chain[:, :, :-1]
+    bones /= np.linalg.norm(bones, axis=-1, keepdims=True) + _EPS
+    cos = np.einsum("nfkd,nfkd->nfk", bones[:, :, :-1], bones[:, :, 1:])
+    out[:, :15] = np.arccos(np.clip(cos, -1.0, 1.0)).reshape(n, 15) / np.pi
+
+    scale = palm_size(kp)[:, None]
+    tips = kp[:, FINGERTIPS]
+    out[:, 15:25] = np.linalg.norm(tips[:, _TIP_I] - tips[:, _TIP_J], axis=-1) / scale
+    out[:, 25:30] = np.linalg.norm(tips - kp[:, WRIST:WRIST + 1], axis=-1) / scale
+    return out
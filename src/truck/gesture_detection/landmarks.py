@@ -0,0 +1,112 @@
+# landmarks.py
+#
+# Hand-landmark conventions shared by the gesture modules, plus a synthetic
+# hand generator for tests, benchmarks and the default classifier templates.
+#
+# Keypoints follow the MediaPipe / YOLO hand-pose order (21 points):
+#   0 wrist, 1-4 thumb (CMC, MCP, IP, tip), 5-8 index, 9-12 middle,
+#   13-16 ring, 17-20 pinky (MCP, PIP, DIP, tip).
+# Arrays are (n_hands, 21, 3): x, y and z (or a per-keypoint confidence for
+# YOLO, in which case only x, y are used).
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+NUM_KEYPOINTS = 21
+WRIST = 0
+INDEX_MCP = 5
+MIDDLE_MCP = 9
+PINKY_MCP = 17
+FINGERTIPS = np.array([4, 8, 12, 16, 20])
+
+# wrist -> ... -> tip for each finger, thumb first
+FINGER_CHAINS = np.array([
+    [0, 1, 2, 3, 4],
+    [0, 5, 6, 7, 8],
+    [0, 9, 10, 11, 12],
+    [0, 13, 14, 15, 16],
+    [0, 17, 18, 19, 20],
+])
+
+# Skeleton edges for drawing: every consecutive pair in the chains plus the palm.
+HAND_EDGES = np.array(
+    [(c[i], c[i + 1]) for c in FINGER_CHAINS for i in range(4)]
+    + [(5, 9), (9, 13), (13, 17)]
+)
+
+# Which fingers are extended (thumb, index, middle, ring, pinky).
+GESTURE_POSES = {
+    "fist":  (0, 0, 0, 0, 0),
+    "open":  (1, 1, 1, 1, 1),
+    "point": (0, 1, 0, 0, 0),
+    "peace": (0, 1, 1, 0, 0),
+    "thumb": (1, 0, 0, 0, 0),
+}
+
+# Canonical right hand, wrist at the origin, fingers pointing +y.
+_BASES = np.array([[-0.35, 0.30], [-0.35, 0.95], [0.0, 1.0], [0.30, 0.92], [0.55, 0.80]])
+_DIRS = np.array([[-0.70, 0.70], [-0.10, 1.0], [0.0, 1.0], [0.10, 1.0], [0.25, 1.0]])
+_DIRS = _DIRS / np.linalg.norm(_DIRS, axis=1, keepdims=True)
+_LENGTHS = np.array([
+    [0.35, 0.30, 0.25],
+    [0.45, 0.27, 0.22],
+    [0.50, 0.30, 0.24],
+    [0.46, 0.28, 0.22],
+    [0.35, 0.22, 0.20],
+])
+# Cumulative bend per segment of a curled finger (radians).
+_CURL = np.radians([70.0, 160.0, 230.0])
+_THUMB_CURL = np.radians([35.0, 75.0, 110.0])
+
+
+def synthetic_hands(
+    poses: Sequence[Sequence[int]],
+    rng: Optional[np.random.Generator] = None,
+    rotation: float = np.pi,
+    scale: Sequence[float] = (40.0, 200.0),
+    noise=0.02,
+) -> np.ndarray:
+    """
+    Generate (len(poses), 21, 3) keypoints for the given finger-extension
+    tuples with random in-plane rotation (+/- 'rotation'), scale, position,
+    mirroring (left/right hand) and per-keypoint noise (in palm lengths;
+    a scalar or one value per hand).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    poses = np.asarray(poses, dtype=bool)
+    n = len(poses)
+    kp = np.zeros((n, NUM_KEYPOINTS, 3))
+
+    for f in range(5):
+        base = np.zeros((n, 3))
+        base[:, :2] = _BASES[f]
+        d = np.zeros(3)
+        d[:2] = _DIRS[f]
+        if f == 0:
+            # Thumb folds across the palm (+x) in the image plane.
+            bend = np.where(poses[:, 0:1], 0.0, -_THUMB_CURL)
+            c, s = np.cos(bend), np.sin(bend)
+            seg = np.stack([c * d[0] - s * d[1], s * d[0] + c * d[1], np.zeros_like(c)], axis=-1)
+        else:
+            # Fingers curl towards the camera (-z) and back to the palm.
+            bend = np.where(poses[:, f:f + 1], 0.0, _CURL)
+            seg = np.cos(bend)[..., None] * d + np.sin(bend)[..., None] * np.array([0.0, 0.0, -1.0])
+        chain = FINGER_CHAINS[f]
+        kp[:, chain[1], :] = base
+        kp[:, chain[2:], :] = base[:, None, :] + np.cumsum(seg * _LENGTHS[f][None, :, None], axis=1)
+
+    kp += rng.normal(0.0, 1.0, kp.shape) * np.reshape(noise, (-1, 1, 1))
+
+    mirror = rng.random(n) < 0.5
+    kp[mirror, :, 0] *= -1.0
+
+    theta = rng.uniform(-rotation, rotation, n)
+    c, s = np.cos(theta), np.sin(theta)
+    x, y = kp[..., 0].copy(), kp[..., 1].copy()
+    kp[..., 0] = c[:, None] * x - s[:, None] * y
+    kp[..., 1] = s[:, None] * x + c[:, None] * y
+
+    kp *= rng.uniform(scale[0], scale[1], n)[:, None, None]
+    kp[..., :2] += rng.uniform(100.0, 600.0, (n, 1, 2))
+    return kp
@@ -0,0 +1,212 @@
+# tracking.py
+#
+# Temporal hand tracking and gesture debouncing on top of GestureEngine.
+#
+# All state lives in fixed-size NumPy arrays indexed by track slot (at most
+# max_tracks hands), so every update costs the same regardless of how long
+# the tracker has been running:
+#   - association: (tracks x detections) mean keypoint distance in palm
+#     sizes, greedy assignment in order of increasing cost, gated
+#   - smoothing: vectorized One-Euro filter over every keypoint of every track
+#   - history: per-track ring buffer of the last 'history' smoothed poses
+#   - debouncing: per-track state machine; a new gesture (or "none") only
+#     becomes the stable gesture after it was seen on consecutive frames
+#     (onset_frames to start a gesture, release_frames to drop it)
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from truck.gesture_detection.classifier import NO_GESTURE
+from truck.gesture_detection.features import palm_size
+from truck.gesture_detection.landmarks import NUM_KEYPOINTS
+
+
+@dataclass
+class TrackerConfig:
+    max_tracks: int = 4
+    history: int = 32
+    max_distance: float = 1.0        # association gate, in palm sizes
+    max_missed: int = 5              # frames a track survives without a detection
+
+    onset_frames: int = 3
+    release_frames: int = 5
+
+    # One-Euro filter, in keypoint units (pixels) and seconds
+    min_cutoff: float = 1.5
+    beta: float = 0.01
+    d_cutoff: float = 1.0
+
+
+@dataclass
+class GestureEvent:
+    track_id: int
+    previous: int                    # gesture id or NO_GESTURE
+    current: int
+
+
+def _alpha(dt: np.ndarray, cutoff: np.ndarray) -> np.ndarray:
+    tau = 1.0 / (2.0 * np.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class HandTracker:
+    def __init__(self, cfg: Optional[TrackerConfig] = None, dims: int = 3):
+        self.cfg = cfg or TrackerConfig()
+        self.dims = dims
+        T, H = self.cfg.max_tracks, self.cfg.history
+
+        self.active = np.zeros(T, dtype=bool)
+        self.track_ids = np.full(T, -1, dtype=np.int64)
+        self.missed = np.zeros(T, dtype=np.int32)
+        self.last_t = np.zeros(T)
+
+        self.landmarks = np.zeros((T, NUM_KEYPOINTS, dims))
+        self._dx = np.zeros((T, NUM_KEYPOINTS, dims))
+
+        self.history = np.zeros((T, H, NUM_KEYPOINTS, dims), dtype=np.float32)
+        self.history_t = np.zeros((T, H))
+        self.history_len = np.zeros(T, dtype=np.int32)
+        self._head = np.zeros(T, dtype=np.int32)
+
+        self.stable = np.full(T, NO_GESTURE, dtype=np.int64)
+        self.candidate = np.full(T, NO_GESTURE, dtype=np.int64)
+        self.candidate_count = np.zeros(T, dtype=np.int32)
+
+        self._next_id = 0
+
+    # ---------------- Association ----------------
+
+    def _associate(self, kp: np.ndarray) -> np.ndarray:
+        """Returns the track slot for each detection, or -1 for new hands."""
+        n = len(kp)
+        assign = np.full(n, -1, dtype=np.int64)
+        slots = np.flatnonzero(self.active)
+        if n == 0 or len(slots) == 0:
+            return assign
+
+        tracks = self.landmarks[slots]
+        diff = tracks[:, None] - kp[None, :]
+        cost = np.linalg.norm(diff[..., :2], axis=-1).mean(axis=-1)
+        cost /= palm_size(tracks)[:, None]
+
+        used_t = np.zeros(len(slots), dtype=bool)
+        for flat in np.argsort(cost, axis=None):
+            ti, di = divmod(int(flat), n)
+            if cost[ti, di] > self.cfg.max_distance:
+                break
+            if used_t[ti] or assign[di] >= 0:
+                continue
+            used_t[ti] = True
+            assign[di] = slots[ti]
+        return assign
+
+    # ---------------- Update ----------------
+
+    def update(self, keypoints: np.ndarray, gestures: Optional[np.ndarray] = None,
+               t: float = 0.0) -> Tuple[np.ndarray, List[GestureEvent]]:
+        """
+        keypoints: (n, 21, >=dims) detections for this frame; gestures: (n,)
+        per-frame gesture ids (e.g. GestureEngine.classify) or None.
+        t: frame time in seconds.
+        Returns (track id per detection, stable-gesture changes this frame).
+        """
+        cfg = self.cfg
+        kp = np.asarray(keypoints, dtype=np.float64)[..., :self.dims]
+        gestures = np.full(len(kp), NO_GESTURE) if gestures is None else np.asarray(gestures)
+
+        assign = self._associate(kp)
+
+        # New tracks for unmatched detections, while free slots remain.
+        free = np.flatnonzero(~self.active)
+        new_det = np.flatnonzero(assign < 0)[:len(free)]
+        new_slots = free[:len(new_det)]
+        if len(new_det):
+            assign[new_det] = new_slots
+            self.active[new_slots] = True
+            self.track_ids[new_slots] = np.arange(self._next_id, self._next_id + len(new_slots))
+            self._next_id += len(new_slots)
+            self.landmarks[new_slots] = kp[new_det]
+            self._dx[new_slots] = 0.0
+            self.last_t[new_slots] = t
+            self.history_len[new_slots] = 0
+            self._head[new_slots] = 0
+            self.stable[new_slots] = NO_GESTURE
+            self.candidate[new_slots] = NO_GESTURE
+            self.candidate_count[new_slots] = 0
+
+        matched = assign >= 0
+        det = np.flatnonzero(matched)
+        slots = assign[det]
+
+        # Vectorized One-Euro over all matched tracks' keypoints.
+        old = np.setdiff1d(slots, new_slots, assume_unique=True)
+        if len(old):
+            sel = np.isin(slots, old)
+            s, x = slots[sel], kp[det[sel]]
+            dt = np.maximum(t - self.last_t[s], 1e-3)[:, None, None]
+            a_d = _alpha(dt, cfg.d_cutoff)
+            self._dx[s] = a_d * (x - self.landmarks[s]) / dt + (1.0 - a_d) * self._dx[s]
+            a = _alpha(dt, cfg.min_cutoff + cfg.beta * np.abs(self._dx[s]))
+            self.landmarks[s] = a * x + (1.0 - a) * self.landmarks[s]
+            self.last_t[s] = t
+        self.missed[slots] = 0
+
+        # Ring buffer append.
+        h = self._head[slots]
+        self.history[slots, h] = self.landmarks[slots]
+        self.history_t[slots, h] = t
+        self._head[slots] = (h + 1) % cfg.history
+        self.history_len[slots] = np.minimum(self.history_len[slots] + 1, cfg.history)
+
+        # Tracks without a detection: age, and retire after max_missed.
+        unmatched = self.active.copy()
+        unmatched[slots] = False
+        self.missed[unmatched] += 1
+
+        # Per-frame observation per slot: detection gesture, or NO_GESTURE if unseen.
+        observed = np.full(cfg.max_tracks, NO_GESTURE, dtype=np.int64)
+        observed[slots] = gestures[det]
+        events = self._debounce(observed, self.active)
+
+        retire = self.active & (self.missed > cfg.max_missed)
+        if retire.any():
+            for slot in np.flatnonzero(retire & (self.stable != NO_GESTURE)):
+                events.append(GestureEvent(int(self.track_ids[slot]), int(self.stable[slot]), NO_GESTURE))
+            self.active[retire] = False
+            self.stable[retire] = NO_GESTURE
+            self.track_ids[retire] = -1
+
+        out = np.full(len(kp), -1, dtype=np.int64)
+        out[det] = self.track_ids[slots]
+        return out, events
+
+    def _debounce(self, observed: np.ndarray, mask: np.ndarray) -> List[GestureEvent]:
+        same_as_candidate = observed == self.candidate
+        self.candidate_count = np.where(same_as_candidate, self.candidate_count + 1, 1)
+        self.candidate = observed
+
+        needed = np.where(observed == NO_GESTURE, self.cfg.release_frames, self.cfg.onset_frames)
+        flip = mask & (observed != self.stable) & (self.candidate_count >= needed)
+        events = [GestureEvent(int(self.track_ids[s]), int(self.stable[s]), int(observed[s]))
+                  for s in np.flatnonzero(flip)]
+        self.stable[flip] = observed[flip]
+        return events
+
+    # ---------------- Queries ----------------
+
+    def tracks(self) -> List[Tuple[int, int]]:
+        """(track id, stable gesture id) for every active track."""
+        slots = np.flatnonzero(self.active)
+        return list(zip(self.track_ids[slots].tolist(), self.stable[slots].tolist()))
+
+    def recent(self, track_id: int) -> np.ndarray:
+        """Smoothed landmark history of a track, oldest first: (k, 21, dims)."""
+        slot = np.flatnonzero(self.active & (self.track_ids == track_id))
+        if len(slot) == 0:
+            return np.zeros((0, NUM_KEYPOINTS, self.dims), dtype=np.float32)
+        slot = slot[0]
+        k = self.history_len[slot]
+        idx = (self._head[slot] - k + np.arange(k)) % self.cfg.history
+        return self.history[slot, idx]
@@ -0,0 +1,286 @@
+# backends.py
+#
+# Inference backends for the YOLO hand-pose model.
+#
+# Every backend is a detector(image, imgsz=None) -> Detections (the callable
+# RoiInference and the flow/batching wrappers take) plus batch(frames) for the
+# BatchScheduler:
+#   - TorchBackend: ultralytics + torch, CUDA when available (the original
+#     test_hand_mapping.py path);
+#   - OnnxBackend: ONNX Runtime on the CPU, for boxes without a usable GPU.
+#
+# CPU path:
+#   1. export_onnx("best.pt")                      -> best.onnx (fp32)
+#   2. quantize_int8("best.onnx", "best_int8.onnx", frames)
+#      static INT8 (QDQ, per-channel weights), activation ranges calibrated on
+#      recorded frames run through the same preprocessing as inference;
+#   3. OnnxBackend("best_int8.onnx")
+#
+# OnnxBackend binds its input and output buffers to the session once (I/O
+# binding) and preprocesses straight into the bound input, so a frame costs
+# one letterbox resize and one session run, with no per-call allocation in
+# ONNX Runtime. Models exported with dynamic=True get one set of buffers per
+# input size (RoiInference crops run at a smaller size); fixed-size models
+# letterbox every request to the exported size.
+
+import ast
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from truck.vision.roi import EMPTY, Detections, detections_from_ultralytics
+
+PAD_VALUE = 114                              # ultralytics letterbox fill
+STRIDES = (8, 16, 32)
+
+
+def letterbox_geometry(shape, size: int) -> Tuple[float, int, int, int, int]:
+    """(scale, new_w, new_h, left, top) fitting an image of 'shape' into size x size."""
+    h, w = shape[:2]
+    scale = min(size / h, size / w)
+    nw, nh = int(round(w * scale)), int(round(h * scale))
+    return scale, nw, nh, (size - nw) // 2, (size - nh) // 2
+
+
+def preprocess(image: np.ndarray, size: int, out: Optional[np.ndarray] = None,
+               canvas: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, int, int]:
+    """
+    BGR uint8 image -> (1, 3, size, size) float32 RGB in [0, 1], letterboxed.
+    Writes into 'out' / 'canvas' when given. Returns (blob, scale, left, top).
+    """
+    scale, nw, nh, left, top = letterbox_geometry(image.shape, size)
+    if canvas is None:
+        canvas = np.full((size, size, 3), PAD_VALUE, dtype=np.uint8)
+    else:
+        canvas[...] = PAD_VALUE
+    canvas[top:top + nh, left:left + nw] = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    if out is None:
+        out = np.empty((1, 3, size, size), dtype=np.float32)
+    np.multiply(canvas[..., ::-1].transpose(2, 0, 1), np.float32(1.0 / 255.0), out=out[0], casting="unsafe")
+    return out, scale, left, top
+
+
+def decode_pose(pred: np.ndarray, num_classes: int, kpt_shape: Tuple[int, int], conf: float,
+                iou: float, scale: float, left: int, top: int, max_det: int = 10) -> Detections:
+    """
+    Raw YOLO-pose output (4 + nc + k*d, anchors) -> Detections in the
+    original image's coordinates: confidence filter, NMS, undo letterbox.
+    """
+    scores = pred[4:4 + num_classes].max(axis=0)
+    keep = np.flatnonzero(scores > conf)
+    if len(keep) == 0:
+        return EMPTY
+    p = pred[:, keep]
+    scores = scores[keep]
+    cx, cy, w, h = p[0], p[1], p[2], p[3]
+    xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    idx = np.asarray(cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), conf, iou), dtype=np.int64).reshape(-1)
+    idx = idx[np.argsort(-scores[idx])][:max_det]
+
+    offset = np.array([left, top], dtype=np.float64)
+    boxes = np.empty((len(idx), 4))
+    boxes[:, :2] = (xywh[idx, :2] - offset) / scale
+    boxes[:, 2:] = boxes[:, :2] + xywh[idx, 2:] / scale
+
+    k, d = kpt_shape
+    kp = p[4 + num_classes:4 + num_classes + k * d, idx].T.reshape(len(idx), k, d).astype(np.float64)
+    kp[..., :2] = (kp[..., :2] - offset) / scale
+    return Detections(boxes, scores[idx].astype(np.float64), kp)
+
+
+class Backend:
+    name = "backend"
+
+    def detect(self, image: np.ndarray, imgsz: Optional[int] = None) -> Detections:
+        raise NotImplementedError
+
+    def __call__(self, image: np.ndarray, imgsz: Optional[int] = None) -> Detections:
+        return self.detect(image, imgsz)
+
+    def batch(self, frames: Sequence[np.ndarray]) -> List[Detections]:
+        return [self.detect(f) for f in frames]
+
+
+# ---------------- Torch ----------------
+
+class TorchBackend(Backend):
+    name = "torch"
+
+    def __init__(self, weights: str = "best.pt", device: Optional[str] = None, imgsz: int = 640,
+                 conf: float = 0.25, iou: float = 0.7):
+        import torch
+        from ultralytics import YOLO
+
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = YOLO(weights)
+        self.model.to(self.device)
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+
+    def _run(self, source, imgsz):
+        return self.model(source, imgsz=imgsz or self.imgsz, conf=self.conf, iou=self.iou,
+                          device=self.device, verbose=False)
+
+    def detect(self, image, imgsz=None):
+        return detections_from_ultralytics(self._run(image, imgsz)[0])
+
+    def batch(self, frames):
+        return [detections_from_ultralytics(r) for r in self._run(list(frames), None)]
+
+
+def export_onnx(weights: str = "best.pt", imgsz: int = 640, opset: int = 12, dynamic: bool = False,
+                simplify: bool = True) -> str:
+    """Export ultralytics weights to ONNX next to them; returns the .onnx path."""
+    from ultralytics import YOLO
+
+    return str(YOLO(weights).export(format="onnx", imgsz=imgsz, opset=opset, dynamic=dynamic,
+                                    simplify=simplify, device="cpu"))
+
+
+# ---------------- ONNX Runtime ----------------
+
+class _Binding:
+    """Input/output buffers for one input size, bound to the session once."""
+
+    def __init__(self, session, input_name: str, output_name: str, size: int):
+        import onnxruntime as ort
+
+        self.size = size
+        self.input = np.zeros((1, 3, size, size), dtype=np.float32)
+        self.canvas = np.full((size, size, 3), PAD_VALUE, dtype=np.uint8)
+        self.io = session.io_binding()
+        self.io.bind_cpu_input(input_name, self.input)
+
+        # One unbound run to learn the output shape, then bind a fixed buffer.
+        self.io.bind_output(output_name, "cpu")
+        session.run_with_iobinding(self.io)
+        shape = self.io.get_outputs()[0].shape()
+        self.output = np.empty(shape, dtype=np.float32)
+        self.io.clear_binding_outputs()
+        self.io.bind_ortvalue_output(output_name, ort.OrtValue.ortvalue_from_numpy(self.output))
+
+
+class OnnxBackend(Backend):
+    name = "onnx"
+
+    def __init__(self, path: str = "best.onnx", imgsz: int = 640, conf: float = 0.25, iou: float = 0.7,
+                 threads: Optional[int] = None, kpt_shape: Optional[Tuple[int, int]] = None,
+                 num_classes: Optional[int] = None):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if threads:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.path = path
+        self.conf = conf
+        self.iou = iou
+
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.output_name = self.session.get_outputs()[0].name
+        fixed = inp.shape[2] if isinstance(inp.shape[2], int) else None
+        self.dynamic = fixed is None
+        self.imgsz = fixed or imgsz
+
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.kpt_shape = tuple(kpt_shape or ast.literal_eval(meta.get("kpt_shape", "[21, 3]")))
+        names = ast.literal_eval(meta["names"]) if "names" in meta else None
+        self.num_classes = num_classes or (len(names) if names else 1)
+
+        self._bindings: Dict[int, _Binding] = {}
+
+    def _binding(self, imgsz: Optional[int]) -> _Binding:
+        size = imgsz if (self.dynamic and imgsz) else self.imgsz
+        b = self._bindings.get(size)
+        if b is None:
+            b = self._bindings[size] = _Binding(self.session, self.input_name, self.output_name, size)
+        return b
+
+    def detect(self, image, imgsz=None):
+        b = self._binding(imgsz)
+        _, scale, left, top = preprocess(image, b.size, out=b.input, canvas=b.canvas)
+        self.session.run_with_iobinding(b.io)
+        return decode_pose(b.output[0], self.num_classes, self.kpt_shape, self.conf, self.iou, scale, left, top)
+
+
+def load_backend(weights: str, **kwargs) -> Backend:
+    """TorchBackend for .pt weights, OnnxBackend for .onnx models."""
+    if weights.endswith(".onnx"):
+        return OnnxBackend(weights, **kwargs)
+    return TorchBackend(weights, **kwargs)
+
+
+# ---------------- INT8 quantization ----------------
+
+def frames_from_video(path: str, count: int = 200, stride: int = 5) -> Iterator[np.ndarray]:
+    """Every 'stride'-th frame of a recording (video file or directory of images), up to 'count'."""
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith((".jpg", ".jpeg", ".png")))
+        for name in names[::stride][:count]:
+            yield cv2.imread(os.path.join(path, name))
+        return
+    cap = cv2.VideoCapture(path)
+    i = taken = 0
+    while taken < count:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if i % stride == 0:
+            taken += 1
+            yield frame
+        i += 1
+    cap.release()
+
+
+def quantize_int8(fp32_path: str, out_path: str, frames: Iterable[np.ndarray], imgsz: Optional[int] = None,
+                  op_types: Sequence[str] = ("Conv",), per_channel: bool = True,
+                  method: str = "minmax") -> str:
+    """
+    Static INT8 quantization of an fp32 ONNX model, calibrated on 'frames'.
+
+    Only op_types (by default the convolutions) are quantized; the decode
+    head (sigmoid, grid offsets, concat) stays in float, which keeps box and
+    keypoint coordinates from being snapped to the activation scale.
+    method: "minmax", "entropy" or "percentile".
+    """
+    from onnxruntime.quantization import (CalibrationDataReader, CalibrationMethod, QuantFormat,
+                                          QuantType, quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    import onnxruntime as ort
+
+    inp = ort.InferenceSession(fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0]
+    size = inp.shape[2] if isinstance(inp.shape[2], int) else (imgsz or 640)
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self):
+            self._it = iter(frames)
+
+        def get_next(self):
+            frame = next(self._it, None)
+            if frame is None:
+                return None
+            return {inp.name: preprocess(frame, size)[0]}
+
+    prepared = out_path + ".prep.onnx"
+    quant_pre_process(fp32_path, prepared, skip_symbolic_shape=True)
+    try:
+        quantize_static(
+            prepared, out_path, _Reader(),
+            quant_format=QuantFormat.QDQ,
+            op_types_to_quantize=list(op_types),
+            per_channel=per_channel,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method={"minmax": CalibrationMethod.MinMax,
+                              "entropy": CalibrationMethod.Entropy,
+                              "percentile": CalibrationMethod.Percentile}[method],
+        )
+    finally:
+        os.remove(prepared)
+    return out_path
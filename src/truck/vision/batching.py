@@ -0,0 +1,119 @@
+# batching.py
+#
+# Micro-batching scheduler for pose/detection models.
+#
+# Frames from any number of sources are queued; a single worker thread takes
+# the oldest frame, then keeps collecting until it has max_batch frames or
+# max_wait_s has passed since that oldest frame arrived, and runs the model
+# once on the whole batch. Each submit() returns a Future resolved with that
+# frame's result; batches keep arrival order, so every source sees its own
+# results in the order it submitted them.
+#
+# The model callable takes a list of frames and returns a list of results of
+# the same length (ultralytics YOLO(...) and Backend.batch in backends.py both do).
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class _Request:
+    source: Any
+    frame: Any
+    submitted_at: float
+    future: Future
+
+
+class BatchScheduler:
+    def __init__(self, model: Callable[[List[Any]], Sequence[Any]], max_batch: int = 8,
+                 max_wait_s: float = 0.010, window: int = 1000):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+
+        self.batches = 0
+        self.batch_sizes: Counter = Counter()
+        self.queue_wait: Deque[float] = deque(maxlen=window)
+        self.model_time: Deque[float] = deque(maxlen=window)
+
+        self._q: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------- Client side ----------------
+
+    def submit(self, source: Any, frame: Any) -> Future:
+        fut: Future = Future()
+        self._q.put(_Request(source, frame, time.monotonic(), fut))
+        return fut
+
+    def infer(self, source: Any, frame: Any, timeout: Optional[float] = None) -> Any:
+        """Blocking submit, e.g. as the fn of a pipeline Stage per camera."""
+        return self.submit(source, frame).result(timeout)
+
+    # ---------------- Worker ----------------
+
+    def _collect(self) -> Optional[List[_Request]]:
+        first = self._q.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first.submitted_at + self.max_wait_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                req = self._q.get(timeout=remaining) if remaining > 0 else self._q.get_nowait()
+            except queue.Empty:
+                break
+            if req is None:
+                self._q.put(None)
+                break
+            batch.append(req)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            start = time.monotonic()
+            for req in batch:
+                self.queue_wait.append(start - req.submitted_at)
+            try:
+                results = self.model([req.frame for req in batch])
+                if len(results) != len(batch):
+                    raise ValueError("model returned {} results for a batch of {}".format(
+                        len(results), len(batch)))
+            except Exception as e:
+                for req in batch:
+                    req.future.set_exception(e)
+                continue
+            self.model_time.append(time.monotonic() - start)
+            self.batches += 1
+            self.batch_sizes[len(batch)] += 1
+            for req, result in zip(batch, results):
+                req.future.set_result(result)
+
+    def start(self) -> "BatchScheduler":
+        self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Finish queued requests, then stop the worker."""
+        self._q.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def report(self) -> str:
+        wait_ms = np.array(self.queue_wait) * 1e3 if self.queue_wait else np.zeros(1)
+        frames = sum(k * v for k, v in self.batch_sizes.items())
+        return "batches {} (mean size {:.2f}), queue wait mean {:.1f} ms p95 {:.1f} ms".format(
+            self.batches, frames / max(self.batches, 1), wait_ms.mean(), np.percentile(wait_ms, 95))
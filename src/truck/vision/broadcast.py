@@ -0,0 +1,268 @@
+# broadcast.py
+#
+# Single-producer broadcast hub for MJPEG (or any encoded) frame streams.
+#
+# One thread reads the source and runs the processing step once per frame,
+# publishing the result under an increasing sequence number. Every viewer
+# has its own cursor (the last sequence number it sent) and waits for
+# anything newer, so:
+#   - all viewers see the same frames instead of splitting the source;
+#   - processing cost does not grow with the number of viewers;
+#   - a slow viewer skips to the newest frame (latest wins) and never holds
+#     up the producer or the other viewers.
+# With no viewers connected the producer keeps draining the source but skips
+# processing.
+#
+# Encoding happens on a thread pool, off the producer thread, with per-viewer
+# StreamSettings (width, JPEG quality, frame-rate cap; ?w=&q=&fps= on the
+# HTTP endpoint). Encodings are cached by (seq, width, quality), so viewers
+# with the same settings share one encode of each frame.
+#
+# Published frames are encoded asynchronously, so the hub copies each one
+# once before publishing: 'source' and 'process' may hand out reused buffers
+# (socket buffers, OverlayRenderer outputs) without racing the encoders. A
+# 'process' that already made a private copy returns it wrapped in Owned,
+# and it is published as is.
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+import cv2
+import numpy as np
+
+BOUNDARY = b"frame"
+WIDTH_STEP = 32                              # requested widths are rounded to this, to share encodings
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = 80, width: Optional[int] = None) -> Optional[bytes]:
+    if width and width < frame.shape[1]:
+        h = max(1, int(round(frame.shape[0] * width / frame.shape[1])))
+        frame = cv2.resize(frame, (width, h), interpolation=cv2.INTER_AREA)
+    ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return jpeg.tobytes() if ok else None
+
+
+def mjpeg_part(jpeg: bytes) -> bytes:
+    return b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n"
+
+
+@dataclass(frozen=True)
+class StreamSettings:
+    width: Optional[int] = None              # None: source width
+    quality: int = 80
+    fps: Optional[float] = None              # per-viewer cap; None: every frame
+
+    @classmethod
+    def from_query(cls, args: Mapping[str, str]) -> "StreamSettings":
+        """?w=640&q=60&fps=10 -> clamped settings; missing or malformed values use defaults."""
+        def number(key, kind):
+            try:
+                return kind(args[key]) if key in args else None
+            except ValueError:
+                return None
+
+        width = number("w", int)
+        if width is not None:
+            width = max(WIDTH_STEP, int(round(width / WIDTH_STEP)) * WIDTH_STEP)
+        quality = number("q", int)
+        quality = cls.quality if quality is None else min(max(quality, 10), 95)
+        fps = number("fps", float)
+        fps = None if fps is None or fps <= 0 else min(fps, 60.0)
+        return cls(width, quality, fps)
+
+    @property
+    def key(self) -> Tuple[Optional[int], int]:
+        return self.width, self.quality
+
+    def label(self) -> str:
+        return "w={} q={}".format(self.width or "src", self.quality)
+
+
+@dataclass
+class Owned:
+    """Returned by 'process': a frame nobody else keeps or modifies, published without a copy."""
+    frame: Any
+
+
+@dataclass
+class Published:
+    seq: int
+    frame: Any                               # processed, not yet encoded
+    captured_at: float                       # time.monotonic()
+
+
+class _EncodeStats:
+    def __init__(self):
+        self.encodes = 0
+        self.encode_s = 0.0
+        self.sent_frames = 0
+        self.sent_bytes = 0
+
+
+class BroadcastHub:
+    def __init__(self, source: Callable[[], Optional[np.ndarray]],
+                 process: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 encode: Callable[..., Optional[bytes]] = encode_jpeg,
+                 encode_workers: int = 2, idle_when_unwatched: bool = True, keep: int = 2):
+        """
+        source: blocking read, returns a frame or None when the stream ends.
+        process: per-frame work before encoding (inference, overlay). Its
+        result is copied on publish, so it may be a reused buffer, unless
+        it is wrapped in Owned.
+        encode: encode(frame, quality, width) -> bytes or None.
+        keep: published sequence numbers whose encodings stay cached.
+        """
+        self.source = source
+        self.process = process
+        self.encode = encode
+        self.idle_when_unwatched = idle_when_unwatched
+        self.keep = keep
+
+        self._cond = threading.Condition()
+        self._latest: Optional[Published] = None
+        self._ended = False
+        self._viewers = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._pool = ThreadPoolExecutor(encode_workers, thread_name_prefix="encode")
+        self._cache: Dict[Tuple[int, Optional[int], int], Future] = {}
+        self._stats: Dict[Tuple[Optional[int], int], _EncodeStats] = defaultdict(_EncodeStats)
+        self._started_at = time.monotonic()
+
+        self.captured = 0
+        self.published = 0
+        self.sent = 0
+        self.skipped = 0                     # frames viewers jumped over
+
+    # ---------------- Producer ----------------
+
+    def _produce(self) -> None:
+        seq = 0
+        while self._running:
+            frame = self.source()
+            if frame is None:
+                break
+            captured_at = time.monotonic()
+            self.captured += 1
+            if self.idle_when_unwatched and self._viewers == 0:
+                continue
+            if self.process is not None:
+                frame = self.process(frame)
+            if isinstance(frame, Owned):
+                frame = frame.frame
+            elif isinstance(frame, np.ndarray):
+                frame = frame.copy()
+            seq += 1
+            self.published += 1
+            with self._cond:
+                self._latest = Published(seq, frame, captured_at)
+                for k in [k for k in self._cache if k[0] <= seq - self.keep]:
+                    del self._cache[k]
+                self._cond.notify_all()
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+
+    def start(self) -> "BroadcastHub":
+        self._running = True
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._produce, name="broadcast", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._pool.shutdown(wait=False)
+
+    # ---------------- Encoding ----------------
+
+    def _encode(self, frame: np.ndarray, settings: StreamSettings) -> Optional[bytes]:
+        start = time.perf_counter()
+        data = self.encode(frame, settings.quality, settings.width)
+        stats = self._stats[settings.key]
+        stats.encodes += 1
+        stats.encode_s += time.perf_counter() - start
+        return data
+
+    def encoded(self, item: Published, settings: StreamSettings) -> Future:
+        """Future of item's encoding with these settings, shared with other viewers."""
+        key = (item.seq,) + settings.key
+        with self._cond:
+            fut = self._cache.get(key)
+            if fut is None:
+                fut = self._cache[key] = self._pool.submit(self._encode, item.frame, settings)
+        return fut
+
+    # ---------------- Viewers ----------------
+
+    @property
+    def viewers(self) -> int:
+        return self._viewers
+
+    def wait(self, after_seq: int, timeout: Optional[float] = None) -> Optional[Published]:
+        """Newest published frame with seq > after_seq; None once the stream ended (or on timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._ended or (self._latest is not None and self._latest.seq > after_seq),
+                                timeout)
+            latest = self._latest
+            if latest is None or latest.seq <= after_seq:
+                return None
+            return latest
+
+    def frames(self, settings: Optional[StreamSettings] = None) -> Iterator[Tuple[Published, bytes]]:
+        """
+        Per-viewer cursor over the stream: (frame, encoded bytes), at most
+        settings.fps per second. Counts as a viewer while iterated.
+        """
+        settings = settings or StreamSettings()
+        period = 1.0 / settings.fps if settings.fps else 0.0
+        stats = self._stats[settings.key]
+        with self._cond:
+            self._viewers += 1
+        try:
+            cursor = 0
+            next_due = 0.0
+            while True:
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                item = self.wait(cursor)
+                if item is None:
+                    return
+                data = self.encoded(item, settings).result()
+                if cursor:
+                    self.skipped += item.seq - cursor - 1
+                cursor = item.seq
+                if data is None:
+                    continue
+                next_due = max(next_due + period, time.monotonic()) if period else 0.0
+                self.sent += 1
+                stats.sent_frames += 1
+                stats.sent_bytes += len(data)
+                yield item, data
+        finally:
+            with self._cond:
+                self._viewers -= 1
+
+    def mjpeg(self, settings: Optional[StreamSettings] = None) -> Iterator[bytes]:
+        """multipart/x-mixed-replace body for one HTTP client."""
+        for _, data in self.frames(settings):
+            yield mjpeg_part(data)
+
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        lines = ["captured {}  published {}  sent {}  skipped by viewers {}  viewers {}".format(
+            self.captured, self.published, self.sent, self.skipped, self._viewers)]
+        for key, s in sorted(self._stats.items(), key=lambda kv: (kv[0][0] or 1 << 30, kv[0][1])):
+            lines.append("  {:>14}: {:5d} encodes, {:5.1f} ms/encode, {:5d} sent, {:7.0f} kbit/s".format(
+                StreamSettings(*key).label(), s.encodes, 1e3 * s.encode_s / max(s.encodes, 1),
+                s.sent_frames, 8e-3 * s.sent_bytes / elapsed))
+        return "\n".join(lines)
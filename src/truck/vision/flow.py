@@ -0,0 +1,144 @@
+# flow.py
+#
+# Detector frame skipping with optical-flow landmark propagation.
+#
+# The pose model runs only on keyframes. In between, the last keypoints are
+# carried forward with sparse pyramidal Lucas-Kanade flow
+# (cv2.calcOpticalFlowPyrLK) from the previous frame to the current one,
+# which costs a small fraction of an inference. A keyframe is forced early
+# when the tracked points move faster than motion_threshold pixels/frame or
+# too many of them fail the forward-backward consistency check.
+#
+# The keyframe interval N adapts:
+#   - latency floor: the smallest N that keeps average model time per frame
+#     within budget * frame period (measured with an EMA of model time);
+#   - error term: at each keyframe, the flow prediction for that frame is
+#     compared with the fresh detection; N halves when the error exceeds
+#     max_error and grows by one while it stays under half of it.
+# N = clamp(max(floor, error term), min_interval, max_interval).
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+_LK_PARAMS = dict(
+    winSize=(21, 21),
+    maxLevel=3,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+)
+
+
+@dataclass
+class FlowConfig:
+    fps: float = 30.0
+    budget: float = 0.5                  # fraction of each frame period the model may use
+    min_interval: int = 1
+    max_interval: int = 8
+    max_error: float = 6.0               # px, flow prediction vs detection at keyframes
+    motion_threshold: float = 25.0       # px/frame median point motion forcing a keyframe
+    max_lost: float = 0.3                # fraction of points failing forward-backward check
+    fb_threshold: float = 1.5            # px, forward-backward error to count a point as lost
+    confidence_decay: float = 0.97       # per propagated frame
+
+
+class FlowPropagatedDetector:
+    def __init__(self, detector: Callable[[np.ndarray], np.ndarray], cfg: Optional[FlowConfig] = None):
+        """
+        detector: frame -> (n, k, 3) keypoints (x, y, confidence), e.g. YOLO
+        pose keypoints.data. Returns of __call__ have the same layout.
+        """
+        self.detector = detector
+        self.cfg = cfg or FlowConfig()
+        self.interval = self.cfg.min_interval
+        self._error_interval = self.cfg.min_interval
+        self._model_time: Optional[float] = None
+        self._since_key = 0
+        self._prev_gray: Optional[np.ndarray] = None
+        self.keypoints = np.zeros((0, 0, 3), dtype=np.float32)
+
+        self.keyframes = 0
+        self.propagated = 0
+        self.forced = 0
+        self.last_error = float("nan")
+
+    # ---------------- Flow ----------------
+
+    def _propagate(self, gray: np.ndarray) -> Tuple[np.ndarray, float, float]:
+        """Returns (keypoints moved to 'gray', lost fraction, median motion px)."""
+        kp = self.keypoints
+        if kp.size == 0:
+            return kp, 0.0, 0.0
+        p0 = kp[..., :2].reshape(-1, 1, 2).astype(np.float32)
+        p1, st, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, p0, None, **_LK_PARAMS)
+        back, st_b, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, p1, None, **_LK_PARAMS)
+        fb = np.linalg.norm((back - p0).reshape(-1, 2), axis=1)
+        ok = (st.ravel() == 1) & (st_b.ravel() == 1) & (fb < self.cfg.fb_threshold)
+
+        moved = kp.copy()
+        flat = moved.reshape(-1, 3)
+        flat[ok, :2] = p1.reshape(-1, 2)[ok]
+        flat[:, 2] *= self.cfg.confidence_decay
+        flat[~ok, 2] = 0.0
+        motion = float(np.median(np.linalg.norm((p1 - p0).reshape(-1, 2)[ok], axis=1))) if ok.any() else 0.0
+        return moved, 1.0 - ok.mean(), motion
+
+    # ---------------- Interval control ----------------
+
+    def _keyframe_error(self, predicted: np.ndarray, detected: np.ndarray) -> float:
+        if predicted.size == 0 or detected.size == 0 or predicted.shape[1:] != detected.shape[1:]:
+            return float("nan")
+        # Match each detected hand to the nearest predicted one by mean keypoint distance.
+        d = np.linalg.norm(predicted[None, :, :, :2] - detected[:, None, :, :2], axis=-1).mean(axis=-1)
+        return float(d.min(axis=1).mean())
+
+    def _update_interval(self, model_time: float, error: float) -> None:
+        cfg = self.cfg
+        a = 0.2
+        self._model_time = model_time if self._model_time is None else (1 - a) * self._model_time + a * model_time
+        floor = math.ceil(self._model_time / (cfg.budget / cfg.fps))
+
+        if not math.isnan(error):
+            if error > cfg.max_error:
+                self._error_interval = max(cfg.min_interval, self._error_interval // 2)
+            elif error < cfg.max_error / 2:
+                self._error_interval += 1
+        self._error_interval = min(max(self._error_interval, cfg.min_interval), cfg.max_interval)
+        self.interval = min(max(floor, self._error_interval, cfg.min_interval), cfg.max_interval)
+
+    # ---------------- Per frame ----------------
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        predicted = None
+        if self._prev_gray is not None and self.keypoints.size:
+            predicted, lost, motion = self._propagate(gray)
+        self._since_key += 1
+
+        keyframe = predicted is None or self._since_key >= self.interval
+        if not keyframe and (lost > self.cfg.max_lost or motion > self.cfg.motion_threshold):
+            keyframe = True
+            self.forced += 1
+
+        if keyframe:
+            start = time.perf_counter()
+            detected = np.asarray(self.detector(frame), dtype=np.float32)
+            model_time = time.perf_counter() - start
+            self.last_error = self._keyframe_error(predicted, detected) if predicted is not None else float("nan")
+            self._update_interval(model_time, self.last_error)
+            self.keypoints = detected
+            self._since_key = 0
+            self.keyframes += 1
+        else:
+            self.keypoints = predicted
+            self.propagated += 1
+
+        self._prev_gray = gray
+        return self.keypoints
+
+    def report(self) -> str:
+        return "keyframes {}  propagated {}  forced {}  interval {}".format(
+            self.keyframes, self.propagated, self.forced, self.interval)
@@ -0,0 +1,138 @@
+# overlay.py
+#
+# Keypoint / skeleton / box overlay drawn straight into reused buffers.
+#
+# results[0].plot() and mediapipe's draw_landmarks copy the frame and draw
+# every point and bone with its own OpenCV call. OverlayRenderer instead:
+#   - copies the frame once into one of a few preallocated output buffers
+#     (rotated, so the consumer can still be showing/encoding the previous
+#     output while the next one is drawn), or draws in place when allowed;
+#   - converts all keypoints to fixed-point int32 in one NumPy expression;
+#   - draws all bones of all hands with one cv2.polylines call, all joints
+#     with a second one (zero-length segments with round caps are dots), and
+#     all boxes with a third.
+#
+# Drawing only happens while somebody is watching: with no viewer attached
+# (and always=False) render() returns the input frame untouched, so a
+# headless run or an HTTP stream with no clients pays nothing for overlays.
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import cv2
+import numpy as np
+
+from truck.gesture_detection.landmarks import HAND_EDGES
+
+_SHIFT = 2                                   # fixed-point bits for sub-pixel drawing
+_ONE = 1 << _SHIFT
+
+
+class OverlayRenderer:
+    def __init__(self, edges: np.ndarray = HAND_EDGES, min_confidence: float = 0.5,
+                 bone_color=(0, 255, 0), joint_color=(0, 0, 255), box_color=(255, 128, 0),
+                 bone_thickness: int = 2, joint_radius: int = 3, buffers: int = 3, always: bool = True,
+                 antialias: bool = False):
+        """
+        edges: (m, 2) keypoint index pairs to join. min_confidence applies to
+        the third keypoint channel when it holds a confidence (YOLO); pass
+        None to draw every keypoint (MediaPipe x, y, z).
+        buffers: output buffers rotated between calls; must exceed the number
+        of outputs the consumer can hold at once (pipeline slot + display).
+        always: draw regardless of viewers.
+        """
+        self.edges = np.asarray(edges, dtype=np.int64)
+        self.min_confidence = min_confidence
+        self.bone_color = bone_color
+        self.joint_color = joint_color
+        self.box_color = box_color
+        self.bone_thickness = bone_thickness
+        self.joint_thickness = 2 * joint_radius
+        self.line_type = cv2.LINE_AA if antialias else cv2.LINE_8
+        self.always = always
+
+        self._buffers = [None] * buffers
+        self._next = 0
+        self._viewers = 0
+        self._lock = threading.Lock()
+
+        self.rendered = 0
+        self.skipped = 0
+
+    # ---------------- Viewers ----------------
+
+    @property
+    def watching(self) -> bool:
+        return self.always or self._viewers > 0
+
+    def add_viewer(self) -> None:
+        with self._lock:
+            self._viewers += 1
+
+    def remove_viewer(self) -> None:
+        with self._lock:
+            self._viewers = max(0, self._viewers - 1)
+
+    @contextmanager
+    def viewer(self) -> Iterator[None]:
+        self.add_viewer()
+        try:
+            yield
+        finally:
+            self.remove_viewer()
+
+    # ---------------- Drawing ----------------
+
+    def _output(self, frame: np.ndarray) -> np.ndarray:
+        i = self._next
+        self._next = (i + 1) % len(self._buffers)
+        buf = self._buffers[i]
+        if buf is None or buf.shape != frame.shape or buf.dtype != frame.dtype:
+            buf = self._buffers[i] = np.empty_like(frame)
+        np.copyto(buf, frame)
+        return buf
+
+    def draw(self, image: np.ndarray, keypoints: Optional[np.ndarray] = None,
+             boxes: Optional[np.ndarray] = None) -> np.ndarray:
+        """Draw onto 'image' in place: keypoints (n, k, 2|3), boxes (n, 4) x1, y1, x2, y2."""
+        if boxes is not None and len(boxes):
+            b = np.rint(np.asarray(boxes, dtype=np.float64) * _ONE).astype(np.int32)
+            rects = b[:, [[0, 1], [2, 1], [2, 3], [0, 3]]]
+            cv2.polylines(image, rects, True, self.box_color, self.bone_thickness, self.line_type, _SHIFT)
+
+        if keypoints is None or len(keypoints) == 0:
+            return image
+        kp = np.asarray(keypoints)
+        pts = np.rint(kp[..., :2] * _ONE).astype(np.int32)                    # (n, k, 2)
+        if self.min_confidence is not None and kp.shape[-1] > 2:
+            visible = kp[..., 2] >= self.min_confidence
+        else:
+            visible = np.ones(kp.shape[:2], dtype=bool)
+
+        if len(self.edges):
+            both = visible[:, self.edges].all(axis=-1)                         # (n, m)
+            bones = pts[:, self.edges][both]                                   # (b, 2, 2)
+            if len(bones):
+                cv2.polylines(image, bones, False, self.bone_color, self.bone_thickness, self.line_type, _SHIFT)
+
+        joints = pts[visible]
+        if len(joints):
+            dots = np.repeat(joints[:, None, :], 2, axis=1)                    # zero-length segments
+            cv2.polylines(image, dots, False, self.joint_color, self.joint_thickness, self.line_type, _SHIFT)
+        return image
+
+    def render(self, frame: np.ndarray, keypoints: Optional[np.ndarray] = None,
+               boxes: Optional[np.ndarray] = None, in_place: bool = False) -> np.ndarray:
+        """
+        Frame with the overlay, or 'frame' itself when nobody is watching.
+        in_place draws on 'frame' (it must be writable and not shared);
+        otherwise the result is a reused buffer, valid until this renderer
+        has been called 'buffers' more times.
+        """
+        if not self.watching:
+            self.skipped += 1
+            return frame
+        self.rendered += 1
+        out = frame if in_place else self._output(frame)
+        return self.draw(out, keypoints, boxes)
@@ -0,0 +1,252 @@
+# pipeline.py
+#
+# Threaded capture -> stage -> ... -> output pipeline for the vision loops.
+#
+# Each stage runs in its own thread and hands frames to the next one through
+# a queue. By default every hand-off is a single "latest wins" slot: when a
+# downstream stage is slower than its producer, the older pending frame is
+# dropped instead of queueing, so latency stays at roughly one frame per
+# stage no matter how far inference falls behind the camera. A stage can ask
+# for a bounded FIFO instead (every frame processed, producer blocks when
+# full) when it must see every frame.
+#
+# Threads rather than processes: OpenCV, torch and ONNX Runtime release the
+# GIL in their heavy calls, and frames are not copied between stages.
+#
+# The last stage's output is read from the caller's thread with get() or by
+# iterating, which keeps cv2.imshow on the main thread. An exception in the
+# source or a stage stops the pipeline and is re-raised there.
+
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+_STOP = object()
+
+
+@dataclass
+class Frame:
+    seq: int
+    captured_at: float                       # time.monotonic()
+    data: Any
+    timings: Dict[str, float] = field(default_factory=dict)   # stage -> seconds
+
+
+class LatestSlot:
+    """Single-item hand-off where put() replaces an unconsumed item."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self.dropped = 0
+
+    def put(self, item) -> None:
+        with self._cond:
+            if self._has_item and item is not _STOP:
+                self.dropped += 1
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._has_item, timeout):
+                raise queue.Empty
+            item, self._item, self._has_item = self._item, None, False
+            return item
+
+
+class FifoSlot:
+    """Bounded FIFO hand-off; put() blocks while the consumer is behind."""
+
+    def __init__(self, maxsize: int):
+        self._q: queue.Queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def put(self, item) -> None:
+        self._q.put(item)
+
+    def get(self, timeout: Optional[float] = None):
+        return self._q.get(timeout=timeout)
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any], Any]                 # stage input data -> output data
+    latest: bool = True                      # input policy: latest wins, or FIFO
+    maxsize: int = 4                         # FIFO depth when latest is False
+
+
+class LatencyStats:
+    def __init__(self, window: int = 1000):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def summary(self) -> str:
+        if not self.samples:
+            return "n/a"
+        ms = np.array(self.samples) * 1e3
+        return "mean {:6.1f} ms  p50 {:6.1f}  p95 {:6.1f}".format(
+            ms.mean(), np.percentile(ms, 50), np.percentile(ms, 95))
+
+
+class Pipeline:
+    def __init__(self, source: Callable[[], Any], stages: Sequence[Stage], window: int = 1000):
+        """
+        source: called repeatedly from the capture thread; returns a frame, or
+        None to end the stream (a source that only fails transiently should
+        retry internally instead).
+        """
+        self.source = source
+        self.stages = list(stages)
+        self._inputs = [LatestSlot() if s.latest else FifoSlot(s.maxsize) for s in self.stages]
+        self._output = LatestSlot()
+
+        self.captured = 0
+        self.delivered = 0
+        self.stage_latency = {s.name: LatencyStats(window) for s in self.stages}
+        self.end_to_end = LatencyStats(window)
+
+        self.error: Optional[BaseException] = None   # first source / stage exception
+        self._running = False
+        self._threads: List[threading.Thread] = []
+        self._started_at = 0.0
+
+    # ---------------- Threads ----------------
+
+    def _fail(self, e: BaseException) -> None:
+        if self.error is None:
+            self.error = e
+        self._running = False
+
+    def _capture(self) -> None:
+        out = self._inputs[0] if self._inputs else self._output
+        while self._running:
+            try:
+                data = self.source()
+            except Exception as e:
+                self._fail(e)
+                break
+            if data is None:
+                break
+            self.captured += 1
+            out.put(Frame(self.captured, time.monotonic(), data))
+        out.put(_STOP)
+
+    def _run_stage(self, i: int) -> None:
+        stage = self.stages[i]
+        inp = self._inputs[i]
+        out = self._inputs[i + 1] if i + 1 < len(self.stages) else self._output
+        latency = self.stage_latency[stage.name]
+        failed = False
+        while True:
+            frame = inp.get()
+            if frame is _STOP:
+                if not failed:
+                    out.put(_STOP)
+                return
+            if failed:
+                continue                     # drain, so upstream FIFOs never block
+            start = time.monotonic()
+            try:
+                frame.data = stage.fn(frame.data)
+            except Exception as e:
+                self._fail(e)
+                failed = True
+                out.put(_STOP)
+                continue
+            elapsed = time.monotonic() - start
+            frame.timings[stage.name] = elapsed
+            latency.add(elapsed)
+            out.put(frame)
+
+    # ---------------- Lifecycle ----------------
+
+    def start(self) -> "Pipeline":
+        self._running = True
+        self._started_at = time.monotonic()
+        self._threads = [threading.Thread(target=self._capture, name="capture", daemon=True)]
+        self._threads += [threading.Thread(target=self._run_stage, args=(i,), name=s.name, daemon=True)
+                          for i, s in enumerate(self.stages)]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        for t in self._threads:
+            t.join(timeout=1.0)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Frame]:
+        """
+        Newest finished frame; None once the source has ended. Raises the
+        source's or a stage's exception once the pipeline stopped on it.
+        """
+        frame = self._output.get(timeout)
+        if frame is _STOP:
+            self._output.put(_STOP)
+            if self.error is not None:
+                raise self.error
+            return None
+        self.delivered += 1
+        self.end_to_end.add(time.monotonic() - frame.captured_at)
+        return frame
+
+    def __iter__(self) -> Iterator[Frame]:
+        while True:
+            frame = self.get()
+            if frame is None:
+                return
+            yield frame
+
+    # ---------------- Reporting ----------------
+
+    def dropped(self) -> Dict[str, int]:
+        return {s.name: slot.dropped for s, slot in zip(self.stages, self._inputs)}
+
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        lines = ["captured {:.1f} fps, delivered {:.1f} fps, dropped {}".format(
+            self.captured / elapsed, self.delivered / elapsed, self.dropped())]
+        for name, stats in self.stage_latency.items():
+            lines.append("  {:>10}: {}".format(name, stats.summary()))
+        lines.append("  {:>10}: {}".format("end-to-end", self.end_to_end.summary()))
+        return "\n".join(lines)
+
+
+class SyntheticSource:
+    """
+    Camera stand-in: returns frames at 'fps' (blocking like cap.read()) with a
+    moving bright square, for running pipelines on a CPU-only box.
+    """
+
+    def __init__(self, fps: float = 30.0, size=(720, 1280), frames: Optional[int] = None):
+        self.period = 1.0 / fps
+        self.size = size
+        self.frames = frames
+        self.count = 0
+        self._next = time.monotonic()
+        self._base = np.zeros(size + (3,), dtype=np.uint8)
+
+    def __call__(self):
+        if self.frames is not None and self.count >= self.frames:
+            return None
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next = max(self._next + self.period, time.monotonic())
+        frame = self._base.copy()
+        h, w = self.size
+        x = int((w - 80) * (0.5 + 0.5 * np.sin(self.count / 20.0)))
+        frame[h // 2 - 40:h // 2 + 40, x:x + 80] = 255
+        self.count += 1
+        return frame
@@ -0,0 +1,142 @@
+# roi.py
+#
+# Tracking-guided ROI inference for the hand-pose detector.
+#
+# Once a hand is found, following frames only run the detector on a padded
+# crop around where the hand is predicted to be (constant-velocity box
+# prediction), at a smaller input size. The full frame is processed again:
+#   - every full_every frames (to pick up new hands / recover drift),
+#   - whenever the crop's best detection is missing or below min_confidence
+#     (same frame, so a lost hand costs one extra inference, not a frame).
+#
+# Detectors are callables detector(image, imgsz) -> Detections, in the
+# coordinates of the image they were given; see ultralytics_detector().
+
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+
+@dataclass
+class Detections:
+    boxes: np.ndarray                       # (n, 4) x1, y1, x2, y2
+    scores: np.ndarray                      # (n,)
+    keypoints: np.ndarray = field(default_factory=lambda: np.zeros((0, 21, 3)))  # (n, k, 3)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def best(self) -> int:
+        return int(np.argmax(self.scores)) if len(self) else -1
+
+    def shifted(self, dx: float, dy: float) -> "Detections":
+        off = np.array([dx, dy, dx, dy], dtype=np.float64)
+        kp = self.keypoints.copy()
+        kp[..., 0] += dx
+        kp[..., 1] += dy
+        return Detections(self.boxes + off, self.scores, kp)
+
+
+EMPTY = Detections(np.zeros((0, 4)), np.zeros(0))
+
+
+def detections_from_ultralytics(r) -> Detections:
+    """One ultralytics Results object -> Detections."""
+    if r.boxes is None or len(r.boxes) == 0:
+        return EMPTY
+    kp = r.keypoints.data.cpu().numpy() if r.keypoints is not None else np.zeros((len(r.boxes), 0, 3))
+    return Detections(r.boxes.xyxy.cpu().numpy(), r.boxes.conf.cpu().numpy(), kp)
+
+
+def ultralytics_detector(model) -> Callable[[np.ndarray, int], Detections]:
+    """Wrap an ultralytics YOLO pose model as a detector(image, imgsz)."""
+    def detect(image, imgsz):
+        return detections_from_ultralytics(model(image, imgsz=imgsz, verbose=False)[0])
+    return detect
+
+
+@dataclass
+class RoiConfig:
+    full_size: int = 640                    # detector input size for full frames
+    roi_size: int = 320                     # detector input size for crops
+    full_every: int = 15                    # forced full-frame re-detection period
+    min_confidence: float = 0.5
+    pad: float = 0.6                        # crop = box grown by this fraction per side
+    min_crop: int = 96                      # pixels, so tiny boxes still get context
+
+
+class RoiInference:
+    def __init__(self, detector: Callable[[np.ndarray, int], Detections], cfg: Optional[RoiConfig] = None):
+        self.detector = detector
+        self.cfg = cfg or RoiConfig()
+        self.box: Optional[np.ndarray] = None
+        self.velocity = np.zeros(4)
+        self.since_full = 0
+
+        self.full_runs = 0
+        self.roi_runs = 0
+        self.fallbacks = 0
+
+    def reset(self) -> None:
+        self.box = None
+        self.velocity = np.zeros(4)
+
+    def _crop_window(self, shape) -> Optional[tuple]:
+        """Crop around the predicted box, or None if it has left the frame."""
+        h, w = shape[:2]
+        box = self.box + self.velocity
+        if not np.all(np.isfinite(box)):
+            return None
+        cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        half = max(box[2] - box[0], box[3] - box[1], 1.0) * (0.5 + self.cfg.pad)
+        half = max(half, self.cfg.min_crop / 2)
+        x1, y1 = int(max(0, cx - half)), int(max(0, cy - half))
+        x2, y2 = int(min(w, cx + half)), int(min(h, cy + half))
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return x1, y1, x2, y2
+
+    def _full(self, frame) -> Detections:
+        self.full_runs += 1
+        self.since_full = 0
+        return self.detector(frame, self.cfg.full_size)
+
+    def _update(self, dets: Detections) -> None:
+        i = dets.best()
+        if i < 0 or dets.scores[i] < self.cfg.min_confidence:
+            self.reset()
+            return
+        box = dets.boxes[i].astype(np.float64)
+        if self.box is not None:
+            self.velocity = 0.5 * self.velocity + 0.5 * (box - self.box)
+        self.box = box
+
+    def __call__(self, frame: np.ndarray) -> Detections:
+        """Detections for 'frame' in full-frame coordinates."""
+        self.since_full += 1
+        if self.box is None or self.since_full >= self.cfg.full_every:
+            dets = self._full(frame)
+            self._update(dets)
+            return dets
+
+        window = self._crop_window(frame.shape)
+        if window is None:
+            self.fallbacks += 1
+            dets = self._full(frame)
+            self._update(dets)
+            return dets
+        x1, y1, x2, y2 = window
+        self.roi_runs += 1
+        dets = self.detector(frame[y1:y2, x1:x2], self.cfg.roi_size)
+        i = dets.best()
+        if i < 0 or dets.scores[i] < self.cfg.min_confidence:
+            self.fallbacks += 1
+            dets = self._full(frame)
+        else:
+            dets = dets.shifted(x1, y1)
+        self._update(dets)
+        return dets
+
+    def report(self) -> str:
+        return "full {}  roi {}  fallbacks {}".format(self.full_runs, self.roi_runs, self.fallbacks)
@@ -0,0 +1,114 @@
+# startup.py
+#
+# Parallel, instrumented startup for the vision applications.
+#
+# Startup is a set of named phases with dependencies. Each phase runs in its
+# own thread as soon as the phases it depends on have finished, so
+# independent work overlaps: the model import, load and warm-up inference
+# run while the camera daemon restarts, the camera opens and autofocus
+# sweeps. Time to first inference becomes the longest dependency chain
+# instead of the sum of all phases.
+#
+# Heavy imports (torch, ultralytics, onnxruntime) belong inside phase
+# functions, not at module level, so they are paid for in parallel with
+# camera bring-up and only when the phase actually runs.
+#
+# Every phase is timed; timeline() prints when each one started and ended
+# relative to the start of run().
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence
+
+
+class StartupError(RuntimeError):
+    def __init__(self, phase: str, error: BaseException):
+        super().__init__("startup phase '{}' failed: {!r}".format(phase, error))
+        self.phase = phase
+        self.error = error
+
+
+@dataclass
+class Phase:
+    name: str
+    fn: Callable[..., Any]                   # called with the results of 'after', in order
+    after: Sequence[str] = ()
+    started: Optional[float] = None          # seconds since Startup.run() began
+    finished: Optional[float] = None
+    result: Any = None
+    error: Optional[BaseException] = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class Startup:
+    def __init__(self):
+        self.phases: Dict[str, Phase] = {}
+        self.total = 0.0
+        self._t0 = 0.0
+
+    def add(self, name: str, fn: Callable[..., Any], after: Sequence[str] = ()) -> "Startup":
+        if name in self.phases:
+            raise ValueError("duplicate startup phase '{}'".format(name))
+        missing = [a for a in after if a not in self.phases]
+        if missing:
+            # Requiring dependencies to be added first also rules out cycles.
+            raise ValueError("phase '{}' depends on unknown phase(s) {}".format(name, missing))
+        self.phases[name] = Phase(name, fn, tuple(after))
+        return self
+
+    def _run_phase(self, phase: Phase) -> None:
+        deps = [self.phases[a] for a in phase.after]
+        for dep in deps:
+            dep.done.wait()
+        failed = next((d for d in deps if d.error is not None), None)
+        if failed is not None:
+            phase.error = failed.error
+            phase.done.set()
+            return
+        phase.started = time.monotonic() - self._t0
+        try:
+            phase.result = phase.fn(*[d.result for d in deps])
+        except BaseException as e:
+            phase.error = e
+        phase.finished = time.monotonic() - self._t0
+        phase.done.set()
+
+    def run(self) -> Dict[str, Any]:
+        """Run every phase; returns {phase name: result}. Raises StartupError on failure."""
+        self._t0 = time.monotonic()
+        threads = [threading.Thread(target=self._run_phase, args=(p,), name="startup-" + p.name, daemon=True)
+                   for p in self.phases.values()]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.total = time.monotonic() - self._t0
+
+        for p in self.phases.values():
+            if p.error is not None and p.started is not None:
+                raise StartupError(p.name, p.error)
+        return {name: p.result for name, p in self.phases.items()}
+
+    def sequential_time(self) -> float:
+        """What the same phases would have taken one after another."""
+        return sum(p.duration for p in self.phases.values())
+
+    def timeline(self, width: int = 50) -> str:
+        scale = width / max(self.total, 1e-9)
+        lines = ["startup {:.2f} s (sequential {:.2f} s)".format(self.total, self.sequential_time())]
+        for p in sorted(self.phases.values(), key=lambda p: (p.started is None, p.started or 0.0)):
+            if p.started is None:
+                lines.append("  {:>10}  skipped".format(p.name))
+                continue
+            start = int(p.started * scale)
+            bar = " " * start + "#" * max(1, int(p.finished * scale) - start)
+            lines.append("  {:>10} {:6.2f} -> {:6.2f} s |{:<{w}}|".format(
+                p.name, p.started, p.finished, bar, w=width))
+        return "\n".join(lines)
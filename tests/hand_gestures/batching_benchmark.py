@@ -0,0 +1,62 @@
+import threading
+import time
+
+import numpy as np
+
+from truck.vision.batching import BatchScheduler
+
+# Throughput vs added latency of micro-batching on CPU. Four 30 fps sources
+# feed one scheduler, each with one frame in flight; the model is simulated with a fixed per-call cost plus
+# a per-frame cost (the shape of CPU pose-model inference: preprocessing and
+# dispatch overhead per call, convolution cost per image).
+
+SOURCES = 4
+FPS = 30.0
+SECONDS = 4.0
+CALL_OVERHEAD = 0.030
+PER_FRAME = 0.006
+
+
+def model(frames):
+    time.sleep(CALL_OVERHEAD + PER_FRAME * len(frames))
+    return [f.mean() for f in frames]
+
+
+def camera(scheduler, source, latencies, stop):
+    # Like a pipeline inference stage: one frame in flight per camera, frames
+    # that arrive meanwhile are dropped (latest wins).
+    frame = np.full((8, 8), source, dtype=np.uint8)
+    period = 1.0 / FPS
+    while not stop.is_set():
+        t0 = time.monotonic()
+        assert scheduler.infer(source, frame) == source
+        latencies.append(time.monotonic() - t0)
+        # Wait for the next camera frame.
+        time.sleep(period - (time.monotonic() % period))
+
+
+def run(max_batch, max_wait_s):
+    scheduler = BatchScheduler(model, max_batch=max_batch, max_wait_s=max_wait_s).start()
+    stop = threading.Event()
+    latencies = []
+    threads = [threading.Thread(target=camera, args=(scheduler, s, latencies, stop), daemon=True)
+               for s in range(SOURCES)]
+    for t in threads:
+        t.start()
+    time.sleep(SECONDS)
+    stop.set()
+    for t in threads:
+        t.join()
+    done = sum(k * v for k, v in scheduler.batch_sizes.items())
+    scheduler.stop()
+    lat = np.array(latencies) * 1e3
+    return done / SECONDS, np.median(lat), np.percentile(lat, 95), scheduler
+
+
+if __name__ == "__main__":
+    print("offered load: {:.0f} frames/s; unbatched capacity {:.1f} frames/s".format(
+        SOURCES * FPS, 1.0 / (CALL_OVERHEAD + PER_FRAME)))
+    for max_batch, wait in ((1, 0.0), (2, 0.010), (4, 0.010), (8, 0.020)):
+        fps, p50, p95, sched = run(max_batch, wait)
+        print("max_batch={} wait={:>2.0f}ms: {:6.1f} frames/s, latency p50 {:7.1f} ms p95 {:7.1f} ms | {}".format(
+            max_batch, wait * 1e3, fps, p50, p95, sched.report()))
@@ -0,0 +1,121 @@
+import argparse
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+from truck.gesture_detection.dataset import build_dataset, hand_samples, load_dataset
+from truck.vision.roi import EMPTY, Detections
+
+# Offline dataset-builder throughput vs worker count, plus a resume check.
+#
+# Synthetic clips (a bright square moving over noise, one directory per
+# label) stand in for recorded gesture videos, and a stand-in detector with a
+# fixed CPU cost per frame (blur + argmax, a few ms like the quantized ONNX
+# model) stands in for the hand-pose backend. The factory is a top-level
+# function so the process pool can pickle it; each worker builds one
+# detector. Speed-up tops out at the number of cores (os.cpu_count()).
+#
+# The resume check interrupts a build after its first shards (the pool is
+# torn down mid-run), reruns build_dataset() on the same directory and
+# verifies only unfinished shards are redone and every frame ends up valid.
+
+
+class BlobDetector:
+    def __init__(self, cost: int = 3):
+        self.cost = cost
+
+    def __call__(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        for _ in range(self.cost):
+            gray = cv2.GaussianBlur(gray, (15, 15), 0)
+        y, x = np.unravel_index(np.argmax(gray), gray.shape)
+        if gray[y, x] < 128:
+            return EMPTY
+        kp = np.zeros((1, 21, 3), dtype=np.float32)
+        kp[0, :, 0] = x + np.arange(21)
+        kp[0, :, 1] = y
+        kp[0, :, 2] = 1.0
+        return Detections(np.array([[x - 20, y - 20, x + 20, y + 20]], dtype=np.float64), np.array([0.9]), kp)
+
+
+def blob_detector():
+    return BlobDetector()
+
+
+def failing_detector():
+    # Processes a few frames, then dies, interrupting the build.
+    inner = BlobDetector()
+    count = [0]
+
+    def detect(image):
+        count[0] += 1
+        if count[0] > 130:
+            raise RuntimeError("simulated crash")
+        return inner(image)
+    return detect
+
+
+def write_clips(root, labels, per_label, frames, size=(640, 360)):
+    rng = np.random.default_rng(0)
+    videos = []
+    for label in labels:
+        os.makedirs(os.path.join(root, label), exist_ok=True)
+        for i in range(per_label):
+            path = os.path.join(root, label, "{:03d}.mp4".format(i))
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30.0, size)
+            base = rng.integers(0, 60, (size[1], size[0], 3), dtype=np.uint8)
+            for f in range(frames):
+                img = base.copy()
+                x = 40 + (f * 7) % (size[0] - 120)
+                cv2.rectangle(img, (x, 150), (x + 60, 210), (255, 255, 255), -1)
+                writer.write(img)
+            writer.release()
+            videos.append(path)
+    return videos
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Parallel landmark-dataset builder benchmark.')
+    parser.add_argument('--frames', type=int, default=240, help='Frames per clip.')
+    parser.add_argument('--clips', type=int, default=2, help='Clips per label.')
+    parser.add_argument('--shard-frames', type=int, default=60)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    root = tempfile.mkdtemp(prefix="landmark_dataset_")
+    try:
+        videos = write_clips(os.path.join(root, "clips"), ["stop", "go"], args.clips, args.frames)
+        print("{} clips x {} frames, {} cores".format(len(videos), args.frames, os.cpu_count()))
+
+        base = None
+        for workers in args.workers:
+            out = os.path.join(root, "ds_{}".format(workers))
+            summary = build_dataset(out, videos, blob_detector, workers=workers,
+                                    shard_frames=args.shard_frames, verbose=False)
+            base = base or summary["fps"]
+            print("  workers={:<2}: {:6.1f} fps  ({:.2f}x)".format(workers, summary["fps"], summary["fps"] / base))
+
+        data = load_dataset(out)
+        keypoints, names = hand_samples(data)
+        print("dataset: {} rows, {} valid, {} hand samples, labels {}".format(
+            len(data["valid"]), int(data["valid"].sum()), len(keypoints), sorted(set(names.tolist()))))
+
+        out = os.path.join(root, "ds_resume")
+        try:
+            build_dataset(out, videos, failing_detector, workers=1, shard_frames=args.shard_frames, verbose=False)
+        except RuntimeError as e:
+            print("interrupted build: {}".format(e))
+        done_before = int(np.load(os.path.join(out, "done.npy")).sum())
+        summary = build_dataset(out, videos, blob_detector, workers=max(args.workers),
+                                shard_frames=args.shard_frames, verbose=False)
+        data = load_dataset(out)
+        print("resume: {} shards done before, {} redone, complete={}, all frames valid={}".format(
+            done_before, summary["shards"], summary["complete"], bool(np.all(data["valid"] == 1))))
+    finally:
+        shutil.rmtree(root)
@@ -0,0 +1,41 @@
+import time
+
+import numpy as np
+
+from truck.gesture_detection.classifier import GestureEngine
+from truck.gesture_detection.landmarks import GESTURE_POSES, synthetic_hands
+
+# Per-frame cost of feature extraction + classification for 1-4 hands, and
+# accuracy on held-out noisy synthetic hands (random rotation, scale, mirror).
+
+FRAMES = 5000
+
+
+def accuracy(engine, dims, rng, n=2000, noise=0.04):
+    names = list(GESTURE_POSES)
+    truth = rng.integers(0, len(names), n)
+    kp = synthetic_hands([GESTURE_POSES[names[i]] for i in truth], rng, noise=noise)
+    if dims == 2:
+        kp[..., 2] = 1.0  # YOLO-style confidence channel, not depth
+    ids, _ = engine.classify(kp)
+    expected = np.array([engine.labels.index(names[i]) for i in truth])
+    return (ids == expected).mean(), (ids == -1).mean()
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(1)
+    for dims in (3, 2):
+        start = time.perf_counter()
+        engine = GestureEngine(dims=dims)
+        fit_ms = (time.perf_counter() - start) * 1e3
+        acc, rejected = accuracy(engine, dims, rng)
+        print("dims={}: fit {:.1f} ms, accuracy {:.1%}, rejected {:.1%}".format(dims, fit_ms, acc, rejected))
+
+        for hands in (1, 2, 4):
+            frames = synthetic_hands([GESTURE_POSES["open"]] * (hands * 64), rng).reshape(64, hands, 21, 3)
+            engine.classify(frames[0])
+            start = time.perf_counter()
+            for i in range(FRAMES):
+                engine.classify(frames[i % 64])
+            per_frame = (time.perf_counter() - start) / FRAMES
+            print("  {} hand(s): {:7.1f} us/frame".format(hands, per_frame * 1e6))
@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+
+from truck.gesture_detection.classifier import GestureEngine
+from truck.gesture_detection.landmarks import GESTURE_POSES, synthetic_hands
+from truck.gesture_detection.tracking import HandTracker
+
+# Four synthetic hands moving for 10 s at 60 fps. Detections come in shuffled
+# order, each hand is missed 5% of the time, keypoints carry pixel noise and
+# 10% of per-frame labels are wrong. Reports tracker cost per frame, track id
+# switches, landmark error raw vs smoothed and gesture changes raw vs debounced.
+
+FPS = 60
+SECONDS = 10
+HANDS = 4
+PIXEL_NOISE = 3.0
+MISS_RATE = 0.05
+FLICKER_RATE = 0.10
+
+
+def main():
+    rng = np.random.default_rng(0)
+    names = list(GESTURE_POSES)
+    engine = GestureEngine()
+    tracker = HandTracker()
+
+    # One template per hand and gesture, then translated along a slow path.
+    templates = {}
+    for h in range(HANDS):
+        for g in names:
+            kp = synthetic_hands([GESTURE_POSES[g]], np.random.default_rng(h), noise=0.0, scale=(80, 80))[0]
+            templates[h, g] = kp - kp[0]
+    centers = rng.uniform(150, 1100, (HANDS, 2))
+    # Each hand holds a gesture for 2 s then switches.
+    schedule = rng.integers(0, len(names), (HANDS, SECONDS // 2 + 1))
+
+    n_frames = FPS * SECONDS
+    track_time = 0.0
+    raw_err, smooth_err = [], []
+    raw_changes = stable_changes = 0
+    last_raw = {}
+    owner = {}
+    id_switches = 0
+
+    for f in range(n_frames):
+        t = f / FPS
+        truth, labels, who = [], [], []
+        for h in range(HANDS):
+            if rng.random() < MISS_RATE:
+                continue
+            g = names[schedule[h, int(t) // 2]]
+            kp = templates[h, g].copy()
+            kp[:, :2] += centers[h] + 60 * np.array([np.sin(t + h), np.cos(0.7 * t + h)])
+            truth.append(kp)
+            who.append(h)
+        truth = np.array(truth).reshape(-1, 21, 3)
+        order = rng.permutation(len(truth))
+        truth, who = truth[order], [who[i] for i in order]
+        noisy = truth + rng.normal(0, PIXEL_NOISE, truth.shape) * np.array([1, 1, 0])
+
+        ids, _ = engine.classify(noisy)
+        flicker = rng.random(len(ids)) < FLICKER_RATE
+        ids[flicker] = rng.integers(0, len(names), flicker.sum())
+
+        start = time.perf_counter()
+        track_ids, events = tracker.update(noisy, ids, t)
+        track_time += time.perf_counter() - start
+        stable_changes += len(events)
+
+        for i, (h, tid) in enumerate(zip(who, track_ids)):
+            if owner.get(h, tid) != tid:
+                id_switches += 1
+            owner[h] = tid
+            if last_raw.get(h) != ids[i]:
+                raw_changes += 1
+            last_raw[h] = ids[i]
+            if f > FPS:
+                slot = np.flatnonzero(tracker.track_ids == tid)[0]
+                raw_err.append(np.abs(noisy[i, :, :2] - truth[i, :, :2]).mean())
+                smooth_err.append(np.abs(tracker.landmarks[slot, :, :2] - truth[i, :, :2]).mean())
+
+    true_changes = HANDS + int((schedule[:, 1:SECONDS // 2] != schedule[:, :SECONDS // 2 - 1]).sum())
+    print("tracker update: {:.1f} us/frame ({} hands, {} fps)".format(track_time / n_frames * 1e6, HANDS, FPS))
+    print("track id switches: {}".format(id_switches))
+    print("mean keypoint error: raw {:.2f}px, smoothed {:.2f}px".format(np.mean(raw_err), np.mean(smooth_err)))
+    print("gesture changes: raw {}, debounced {} (ground truth {})".format(
+        raw_changes, stable_changes, true_changes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from truck.vision.backends import (OnnxBackend, TorchBackend, export_onnx, frames_from_video,
+                                   quantize_int8)
+
+# Torch (CPU) vs ONNX Runtime fp32 vs ONNX Runtime INT8 on a recorded clip:
+# per-frame latency, and agreement with the torch detections (recall of
+# torch's best hand at IoU >= 0.5, mean keypoint error on matched hands in
+# pixels and as a fraction of the box diagonal).
+#
+# The first --calib-frames sampled frames calibrate the INT8 model; the rest
+# of the clip is the evaluation set, so calibration and evaluation frames do
+# not overlap.
+#
+#   python onnx_backend_benchmark.py --weights best.pt --video hands.mp4
+
+
+def box_iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def run(backend, frames, imgsz, warmup=5):
+    for f in frames[:warmup]:
+        backend(f, imgsz)
+    times, dets = [], []
+    for f in frames:
+        start = time.perf_counter()
+        dets.append(backend(f, imgsz))
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1e3, dets
+
+
+def agreement(reference, dets, min_score):
+    hits, kp_err, kp_rel = 0, [], []
+    refs = 0
+    for ref, d in zip(reference, dets):
+        i = ref.best()
+        if i < 0 or ref.scores[i] < min_score:
+            continue
+        refs += 1
+        j = d.best()
+        if j < 0 or d.scores[j] < min_score or box_iou(ref.boxes[i], d.boxes[j]) < 0.5:
+            continue
+        hits += 1
+        if ref.keypoints.shape[1:] == d.keypoints.shape[1:] and ref.keypoints.shape[1]:
+            err = np.linalg.norm(ref.keypoints[i, :, :2] - d.keypoints[j, :, :2], axis=1).mean()
+            diag = np.hypot(*(ref.boxes[i, 2:] - ref.boxes[i, :2]))
+            kp_err.append(err)
+            kp_rel.append(err / max(diag, 1.0))
+    mean = lambda v: float(np.mean(v)) if v else float("nan")
+    return hits / max(refs, 1), mean(kp_err), mean(kp_rel), refs
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Torch vs ONNX Runtime fp32/INT8 hand-pose benchmark.')
+    parser.add_argument('--weights', default='best.pt', help='YOLO pose weights.')
+    parser.add_argument('--video', required=True, help='Recorded clip (file or image directory).')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--frames', type=int, default=300, help='Evaluation frames.')
+    parser.add_argument('--calib-frames', type=int, default=100)
+    parser.add_argument('--calib-method', default='minmax', choices=['minmax', 'entropy', 'percentile'])
+    parser.add_argument('--threads', type=int, default=None, help='ORT intra-op threads.')
+    parser.add_argument('--min-score', type=float, default=0.5)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    sampled = list(frames_from_video(args.video, count=args.calib_frames + args.frames, stride=2))
+    calib, frames = sampled[:args.calib_frames], sampled[args.calib_frames:]
+    if not frames:
+        raise SystemExit("clip too short: {} sampled frames".format(len(sampled)))
+
+    fp32 = os.path.splitext(args.weights)[0] + ".onnx"
+    if not os.path.exists(fp32):
+        fp32 = export_onnx(args.weights, imgsz=args.imgsz)
+    int8 = os.path.splitext(fp32)[0] + "_int8.onnx"
+    if not os.path.exists(int8):
+        start = time.perf_counter()
+        quantize_int8(fp32, int8, calib, imgsz=args.imgsz, method=args.calib_method)
+        print("quantized on {} frames in {:.1f} s".format(len(calib), time.perf_counter() - start))
+
+    backends = [
+        ("torch-cpu", TorchBackend(args.weights, device="cpu", imgsz=args.imgsz)),
+        ("ort-fp32", OnnxBackend(fp32, imgsz=args.imgsz, threads=args.threads)),
+        ("ort-int8", OnnxBackend(int8, imgsz=args.imgsz, threads=args.threads)),
+    ]
+    print("{} frames, {} (fp32 {:.1f} MB, int8 {:.1f} MB)".format(
+        len(frames), frames[0].shape, os.path.getsize(fp32) / 1e6, os.path.getsize(int8) / 1e6))
+
+    reference = None
+    for name, backend in backends:
+        ms, dets = run(backend, frames, args.imgsz)
+        line = "{:>10}: mean {:6.1f} ms  p50 {:6.1f}  p95 {:6.1f}  ({:5.1f} fps)".format(
+            name, ms.mean(), np.percentile(ms, 50), np.percentile(ms, 95), 1e3 / ms.mean())
+        if reference is None:
+            reference = dets
+        else:
+            recall, err, rel, refs = agreement(reference, dets, args.min_score)
+            line += "  recall {:.1%} of {}  kp err {:.2f} px ({:.1%} of box)".format(recall, refs, err, rel)
+        print(line)
@@ -0,0 +1,62 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from truck.gesture_detection.landmarks import GESTURE_POSES, HAND_EDGES, synthetic_hands
+from truck.vision.overlay import OverlayRenderer
+
+# Per-frame overlay cost on a 1280x720 frame:
+#   per-call: frame.copy() + one cv2.line per bone and cv2.circle per joint,
+#             the way results[0].plot() / mp_draw.draw_landmarks draw;
+#   batched:  OverlayRenderer into a reused buffer (one copy, three
+#             cv2.polylines calls);
+#   in place: OverlayRenderer drawing on the frame itself (no copy);
+#   unwatched: OverlayRenderer with no viewers.
+
+
+def per_call_draw(frame, keypoints, boxes):
+    out = frame.copy()
+    for box, kp in zip(boxes, keypoints):
+        cv2.rectangle(out, (int(box[0]), int(box[1])), (int(box[2]), int(box[3])), (255, 128, 0), 2)
+        for a, b in HAND_EDGES:
+            cv2.line(out, (int(kp[a, 0]), int(kp[a, 1])), (int(kp[b, 0]), int(kp[b, 1])), (0, 255, 0), 2)
+        for x, y in kp[:, :2]:
+            cv2.circle(out, (int(x), int(y)), 3, (0, 0, 255), -1)
+    return out
+
+
+def time_per_frame(fn, frames, keypoints, boxes, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(frames[i % len(frames)], keypoints, boxes)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Overlay rendering benchmark.')
+    parser.add_argument('--repeat', type=int, default=2000)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    rng = np.random.default_rng(0)
+    frames = [(rng.random((720, 1280, 3)) * 255).astype(np.uint8) for _ in range(4)]
+    poses = list(GESTURE_POSES.values())
+
+    print("{:>6} {:>12} {:>12} {:>12} {:>12}".format("hands", "per-call us", "batched us", "in place us", "unwatched us"))
+    for n in (1, 2, 4):
+        kp = synthetic_hands([poses[i % len(poses)] for i in range(n)], rng, scale=(80.0, 200.0))
+        kp[..., 2] = 1.0                     # confidence channel, as from YOLO
+        boxes = np.concatenate([kp[..., :2].min(axis=1), kp[..., :2].max(axis=1)], axis=1)
+
+        renderer = OverlayRenderer()
+        unwatched = OverlayRenderer(always=False)
+        per_call = time_per_frame(per_call_draw, frames, kp, boxes, args.repeat)
+        batched = time_per_frame(renderer.render, frames, kp, boxes, args.repeat)
+        in_place = time_per_frame(lambda f, k, b: renderer.render(f, k, b, in_place=True),
+                                  frames, kp, boxes, args.repeat)
+        idle = time_per_frame(unwatched.render, frames, kp, boxes, args.repeat)
+        print("{:>6} {:>12.1f} {:>12.1f} {:>12.1f} {:>12.2f}".format(n, per_call, batched, in_place, idle))
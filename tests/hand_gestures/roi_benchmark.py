@@ -0,0 +1,114 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from truck.vision.roi import Detections, EMPTY, RoiConfig, RoiInference, ultralytics_detector
+
+# Full-frame inference on every frame vs ROI inference with periodic
+# full-frame re-detection: fps and detection recall.
+#
+# With --video and --model, runs the real pose model on a recorded clip and
+# uses its full-frame detections as the reference. Without them, runs a
+# synthetic 1280x720 clip (a hand-sized blob moving around, leaving the frame
+# now and then) through a stand-in detector whose cost scales with input size.
+
+
+def box_iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def blob_detector(image, imgsz):
+    h, w = image.shape[:2]
+    scale = imgsz / max(h, w)
+    small = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))))
+    feat = small
+    for _ in range(6):  # stand-in for conv layers: cost ~ input pixels
+        feat = cv2.GaussianBlur(feat, (7, 7), 0)
+    mask = (feat[..., 1] > 100).astype(np.uint8)
+    n, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+    if n <= 1:
+        return EMPTY
+    i = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    x, y, bw, bh, area = stats[i]
+    if area < 20:
+        return EMPTY
+    box = np.array([[x, y, x + bw, y + bh]], dtype=np.float64) / scale
+    return Detections(box, np.array([min(1.0, area / (bw * bh) + 0.2)]))
+
+
+def synthetic_clip(n=600, size=(720, 1280)):
+    rng = np.random.default_rng(0)
+    background = (rng.random(size + (3,)) * 60).astype(np.uint8)
+    for i in range(n):
+        t = i / 30.0
+        frame = background.copy()
+        visible = (i // 150) % 4 != 3   # gone for 5 s out of every 20
+        truth = None
+        if visible:
+            cx = int(640 + 450 * np.sin(0.9 * t))
+            cy = int(360 + 220 * np.sin(1.3 * t + 1))
+            cv2.ellipse(frame, (cx, cy), (45, 60), 0, 0, 360, (180, 220, 180), -1)
+            truth = np.array([cx - 45, cy - 60, cx + 45, cy + 60], dtype=np.float64)
+        yield frame, truth
+
+
+def video_clip(path):
+    cap = cv2.VideoCapture(path)
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        yield frame, None
+    cap.release()
+
+
+def run(frames, detect):
+    found = []
+    start = time.perf_counter()
+    for frame in frames:
+        dets = detect(frame)
+        i = dets.best()
+        found.append(dets.boxes[i] if i >= 0 and dets.scores[i] >= 0.5 else None)
+    return len(frames) / (time.perf_counter() - start), found
+
+
+def recall(found, truths):
+    hits = [f is not None and box_iou(f, t) >= 0.5 for f, t in zip(found, truths) if t is not None]
+    return float(np.mean(hits)) if hits else float("nan")
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='ROI inference benchmark.')
+    parser.add_argument('--video', default=None, help='Recorded clip to run on.')
+    parser.add_argument('--model', default=None, help='YOLO pose weights (e.g. best.pt).')
+    parser.add_argument('--full-every', type=int, default=15)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    cfg = RoiConfig(full_every=args.full_every)
+    if args.video and args.model:
+        from ultralytics import YOLO
+        detector = ultralytics_detector(YOLO(args.model))
+        clip = list(video_clip(args.video))
+    else:
+        detector = blob_detector
+        clip = list(synthetic_clip())
+    frames = [f for f, _ in clip]
+
+    full_fps, full_found = run(frames, lambda f: detector(f, cfg.full_size))
+    roi = RoiInference(detector, cfg)
+    roi_fps, roi_found = run(frames, roi)
+
+    # A recorded clip has no labels: full-frame detections are the reference.
+    truths = full_found if args.video and args.model else [t for _, t in clip]
+    print("full frame: {:6.1f} fps, recall {:.1%}".format(full_fps, recall(full_found, truths)))
+    print("roi:        {:6.1f} fps, recall {:.1%}  ({})".format(roi_fps, recall(roi_found, truths), roi.report()))
+    print("speed-up x{:.2f}".format(roi_fps / full_fps))
@@ -8,26 +8,73 @@ from io_libraries.camera.JetsonCamera import Camera
 from io_libraries.camera.Focuser import Focuser
 from io_libraries.camera.Autofocus import FocusState, doFocus
 import cv2
-from ultralytics import YOLO
+import numpy as np
 import subprocess
+from truck.vision.overlay import OverlayRenderer
+from truck.vision.pipeline import Pipeline, Stage
+from truck.vision.roi import detections_from_ultralytics
+from truck.vision.startup import Startup
 
-subprocess.run(["sudo", "systemctl", "restart", "nvargus-daemon"], check=True)
+i2c_bus = 2
 
-import torch
 
-device = "cuda" if torch.cuda.is_available() else "cpu"
-print("Using device:", device)
+def restart_camera_daemon():
+    subprocess.run(["sudo", "systemctl", "restart", "nvargus-daemon"], check=True)
 
 
-i2c_bus = 2
-camera = Camera()
-focuser = Focuser(i2c_bus)
-focuser.verbose = False
+def focus(camera, focuser):
+    focusState = FocusState()
+    focusState.verbose = False
+    doFocus(camera, focuser, focusState)
+    while not focusState.isFinish():
+        time.sleep(0.01)
+    return focusState
+
+
+def open_focuser():
+    focuser = Focuser(i2c_bus)
+    focuser.verbose = False
+    return focuser
+
+
+def import_torch():
+    # Heavy imports happen here, alongside camera bring-up.
+    import torch
+    from ultralytics import YOLO
+    return torch, YOLO
+
+
+def load_model(libs):
+    torch, YOLO = libs
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print("Using device:", device)
+    # Load YOLO pose model
+    model = YOLO("best.pt")  # change to a bigger model for more accuracy
+    model.to(device)
+    return model
+
+
+def warm_up(model):
+    # First call pays for CUDA context / kernel selection; do it off the critical path.
+    model(np.zeros((720, 1280, 3), dtype=np.uint8), verbose=False)
+    return model
 
 
-focusState = FocusState()
-focusState.verbose = False
-doFocus(camera, focuser, focusState)
+# The camera chain (daemon restart -> open -> autofocus) and the model chain
+# (imports -> load -> warm-up) are independent and start together.
+startup = Startup()
+startup.add("nvargus", restart_camera_daemon)
+startup.add("camera", lambda _: Camera(), after=["nvargus"])
+startup.add("focuser", open_focuser)
+startup.add("focus", focus, after=["camera", "focuser"])
+startup.add("imports", import_torch)
+startup.add("model", load_model, after=["imports"])
+startup.add("warmup", warm_up, after=["model"])
+ready = startup.run()
+print(startup.timeline())
+
+camera = ready["camera"]
+model = ready["warmup"]
 
 print("Done with the focus setup")
 
@@ -43,34 +90,48 @@ if not cap.isOpened():
 
 print("!!!!!!!!! the open cv side of this is done!!!!!""")
 
-print("before loading model")
-# Load YOLO pose model
-model = YOLO("best.pt")  # change to a bigger model for more accuracy
-model.to(device)
-
 print("📸 Starting live pose stream. Press 'q' to quit.")
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
+
+def grab():
+    while True:
+        ret, frame = cap.read()
+        if ret:
+            return frame
         print("⚠️ Frame grab failed — retrying...")
-        continue
 
+
+def infer(frame):
     # Run pose inference
-    results = model(frame, verbose=False)
+    return frame, model(frame, verbose=False)
+
 
+renderer = OverlayRenderer()
+
+
+def render(item):
     # Annotate frame with keypoints + skeleton
+    frame, results = item
     if len(results) > 0:
-        annotated = results[0].plot()
-    else:
-        annotated = frame
+        dets = detections_from_ultralytics(results[0])
+        return renderer.render(frame, dets.keypoints, dets.boxes)
+    return frame
+
 
+# Capture, inference and rendering overlap in separate threads; a slow stage
+# drops stale frames instead of building up latency.
+pipeline = Pipeline(grab, [Stage("inference", infer), Stage("render", render)]).start()
+
+for item in pipeline:
     # Display live window
-    cv2.imshow("Pose Live", annotated)
+    cv2.imshow("Pose Live", item.data)
 
     # Quit on 'q' key
     if cv2.waitKey(1) & 0xFF == ord("q"):
         break
 
+pipeline.stop()
+print(pipeline.report())
+
 cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+cv2.destroyAllWindows()
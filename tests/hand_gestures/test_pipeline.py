@@ -0,0 +1,56 @@
+import itertools
+
+import pytest
+
+from truck.vision.pipeline import Pipeline, Stage
+
+# A failing source or stage must end the pipeline with its exception instead
+# of leaving get() / iteration blocked forever.
+
+
+def counter(limit=None):
+    it = itertools.count(1)
+    return lambda: next(it) if limit is None else (lambda n: n if n <= limit else None)(next(it))
+
+
+def boom_at(n):
+    def fn(x):
+        if x >= n:                           # latest-wins slots may skip n itself
+            raise ValueError("stage failed on {}".format(x))
+        return x
+    return fn
+
+
+@pytest.mark.parametrize("latest", [True, False])
+def test_stage_exception_is_raised_from_iteration(latest):
+    pipeline = Pipeline(counter(), [Stage("ok", lambda x: x, latest), Stage("boom", boom_at(5), latest),
+                                    Stage("after", lambda x: x, latest)]).start()
+    with pytest.raises(ValueError, match="stage failed"):
+        for frame in pipeline:
+            assert frame.data < 5
+    with pytest.raises(ValueError):
+        pipeline.get(timeout=1.0)
+    pipeline.stop()
+    assert all(not t.is_alive() for t in pipeline._threads)
+
+
+def test_source_exception_is_raised_from_get():
+    def source():
+        raise OSError("camera gone")
+
+    pipeline = Pipeline(source, [Stage("ok", lambda x: x)]).start()
+    with pytest.raises(OSError, match="camera gone"):
+        pipeline.get(timeout=1.0)
+    pipeline.stop()
+
+
+def test_clean_end_returns_none():
+    pipeline = Pipeline(counter(3), [Stage("ok", lambda x: x, latest=False)]).start()
+    seen = [f.data for f in pipeline]        # latest-wins output: any in-order subset
+    assert seen == sorted(set(seen)) and set(seen) <= {1, 2, 3}
+    assert pipeline.error is None
+    pipeline.stop()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
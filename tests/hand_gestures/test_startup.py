@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from truck.vision.startup import Startup, StartupError
+
+# Startup-time regression test with stub components standing in for the
+# test_hand_mapping.py phases. Durations are the real ones scaled down 10x
+# (daemon restart ~2 s, camera open ~1 s, autofocus ~3 s, torch + ultralytics
+# import ~4 s, model load ~1.5 s, warm-up ~1 s).
+#
+#   sequential:      1.25 s
+#   critical path:   max(0.2 + 0.1 + 0.3, 0.4 + 0.15 + 0.1) = 0.65 s
+#
+# The budget leaves room for thread start-up and a loaded CI box but fails
+# if phases are serialized again.
+
+SCALE = 0.1
+DURATIONS = {
+    "nvargus": 2.0, "camera": 1.0, "focuser": 0.05, "focus": 3.0,
+    "imports": 4.0, "model": 1.5, "warmup": 1.0,
+}
+CRITICAL_PATH = SCALE * max(DURATIONS["nvargus"] + DURATIONS["camera"] + DURATIONS["focus"],
+                            DURATIONS["imports"] + DURATIONS["model"] + DURATIONS["warmup"])
+BUDGET = CRITICAL_PATH + 0.25
+
+
+def stub(name, result=None):
+    def phase(*deps):
+        time.sleep(SCALE * DURATIONS[name])
+        return result if result is not None else name
+    return phase
+
+
+def hand_mapping_startup():
+    s = Startup()
+    s.add("nvargus", stub("nvargus"))
+    s.add("camera", stub("camera"), after=["nvargus"])
+    s.add("focuser", stub("focuser"))
+    s.add("focus", stub("focus"), after=["camera", "focuser"])
+    s.add("imports", stub("imports"))
+    s.add("model", stub("model"), after=["imports"])
+    s.add("warmup", stub("warmup"), after=["model"])
+    return s
+
+
+def test_startup_within_budget():
+    s = hand_mapping_startup()
+    results = s.run()
+    print(s.timeline())
+    assert set(results) == set(DURATIONS)
+    assert s.total < BUDGET, s.timeline()
+    assert s.sequential_time() > s.total * 1.5
+
+
+def test_dependencies_respected():
+    s = hand_mapping_startup()
+    s.run()
+    p = s.phases
+    for name, phase in p.items():
+        for dep in phase.after:
+            assert p[dep].finished <= phase.started, (dep, name)
+    # Independent chains overlap.
+    assert p["imports"].started < p["camera"].finished
+
+
+def test_results_passed_to_dependents():
+    s = Startup()
+    s.add("a", lambda: 2)
+    s.add("b", lambda: 3)
+    s.add("c", lambda a, b: a * b, after=["a", "b"])
+    assert s.run()["c"] == 6
+
+
+def test_failure_reports_phase_and_skips_dependents():
+    def boom():
+        raise OSError("no camera")
+
+    s = Startup()
+    s.add("camera", boom)
+    s.add("focus", stub("focus"), after=["camera"])
+    s.add("imports", lambda: "ok")
+    with pytest.raises(StartupError) as info:
+        s.run()
+    assert info.value.phase == "camera"
+    assert s.phases["focus"].started is None
+    assert s.phases["imports"].result == "ok"
+    assert "skipped" in s.timeline()
+
+
+def test_unknown_dependency_rejected():
+    with pytest.raises(ValueError):
+        Startup().add("focus", lambda camera: None, after=["camera"])
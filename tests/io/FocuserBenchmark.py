@@ -0,0 +1,95 @@
+import time
+import argparse
+import cv2
+import numpy as np
+from io_libraries.camera.Focuser import Focuser
+from io_libraries.camera.Autofocus import FocusState, doFocus
+from io_libraries.camera.I2CBus import LinuxI2CBus, ShellI2CBus, FakeI2CBus
+
+# Compares the old i2cset-per-register path with a persistent bus:
+#   - raw focus writes per second
+#   - wall time of a full doFocus() sweep against a synthetic camera
+#
+# Off-device the "old" path still pays for the shell + process spawn (i2cset
+# itself fails to find a bus), which is the cost being measured.
+
+BEST_POSITION = 650
+
+
+class SyntheticCamera(object):
+    """
+    Frames whose blur depends on the focuser's current position, delivered at
+    a fixed frame rate like the real FrameReader.
+    """
+    def __init__(self, focuser, fps=60, size=(360, 640)):
+        self.focuser = focuser
+        self.period = 1.0 / fps
+        # Blocky texture: plenty of hard edges, so sharpness is monotonic in blur.
+        rng = np.random.default_rng(0)
+        blocks = (rng.random((size[0] // 8, size[1] // 8, 3)) * 255).astype(np.uint8)
+        self.texture = cv2.resize(blocks, (size[1], size[0]), interpolation=cv2.INTER_NEAREST)
+        self._cache = {}
+        self._next = time.time()
+
+    def _frame_for(self, position):
+        key = int(position) // 10
+        if key not in self._cache:
+            sigma = 0.5 + abs(position - BEST_POSITION) / 100.0
+            self._cache[key] = cv2.GaussianBlur(self.texture, (0, 0), sigma)
+        return self._cache[key]
+
+    def getFrameWithTimestamp(self, timeout=None):
+        now = time.time()
+        if now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(self._next + self.period, time.time())
+        # Exposed over the last frame period, with the lens where it was then.
+        return self._frame_for(self.focuser.read()), time.time() - self.period
+
+    def getFrame(self, timeout=None):
+        return self.getFrameWithTimestamp(timeout)[0]
+
+
+def bench_writes(i2c, n):
+    focuser = Focuser(0, i2c=i2c)
+    start = time.perf_counter()
+    for i in range(n):
+        focuser.set(Focuser.OPT_FOCUS, (i * 50) % 1000)
+    return n / (time.perf_counter() - start)
+
+
+def bench_autofocus(i2c):
+    focuser = Focuser(0, i2c=i2c)
+    camera = SyntheticCamera(focuser)
+    state = FocusState()
+    start = time.perf_counter()
+    doFocus(camera, focuser, state)
+    while not state.isFinish():
+        time.sleep(0.001)
+    # focusThread writes the final position right after marking finish.
+    time.sleep(0.05)
+    return time.perf_counter() - start - 0.05, focuser.read()
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Focuser I2C backend benchmark.')
+    parser.add_argument('-i', '--i2c-bus', type=int, default=None,
+                        help='Benchmark the real /dev/i2c-N bus instead of the in-memory fake.')
+    parser.add_argument('-n', '--writes', type=int, default=200)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    if args.i2c_bus is None:
+        new_bus = FakeI2CBus()
+        old_bus = ShellI2CBus(0)
+    else:
+        new_bus = LinuxI2CBus(args.i2c_bus)
+        old_bus = ShellI2CBus(args.i2c_bus)
+
+    for name, i2c in (("i2cset", old_bus), (type(new_bus).__name__, new_bus)):
+        wps = bench_writes(i2c, args.writes)
+        duration, position = bench_autofocus(i2c)
+        print("{:>12}: {:10.0f} writes/s   autofocus {:6.3f}s -> position {}".format(
+            name, wps, duration, position))
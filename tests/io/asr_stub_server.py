@@ -0,0 +1,120 @@
+import argparse
+import io
+import json
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Local stand-in for the whisper.cpp server's POST /inference: accepts a WAV
+# upload (multipart form field "file" or a raw body), sleeps for
+# latency + per_audio_s * (seconds of audio) and answers {"text": ...}.
+# latency may also be a function (pcm, rate) -> seconds, and transcript a
+# function (pcm, rate) -> text.
+# Requests are processed `concurrency` at a time (whisper.cpp: one), so
+# queueing behaves like the real server. Keep-alive (HTTP/1.1) is supported
+# and new connections are counted.
+#
+#   python asr_stub_server.py --port 8080 --latency 0.15 --per-audio 0.05
+
+
+def read_wav(body: bytes):
+    start = body.find(b"RIFF")
+    if start < 0:
+        return None, 0
+    with wave.open(io.BytesIO(body[start:])) as w:
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        return pcm, w.getframerate()
+
+
+def describe(pcm: np.ndarray, rate: int) -> str:
+    return "{:.2f} s of audio".format(len(pcm) / rate)
+
+
+class StubAsrServer:
+    def __init__(self, port: int = 0, latency: float = 0.1, per_audio_s: float = 0.0, concurrency: int = 1,
+                 transcript=describe):
+        self.latency = latency
+        self.per_audio_s = per_audio_s
+        self.transcript = transcript
+        self._slots = threading.Semaphore(concurrency)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.audio_s = 0.0
+        self.busy_s = 0.0
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                BaseHTTPRequestHandler.setup(self)
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                pcm, rate = read_wav(body)
+                if pcm is None:
+                    self.send_error(400, "no WAV in request")
+                    return
+                seconds = len(pcm) / rate
+                with stub._slots:
+                    start = time.perf_counter()
+                    latency = stub.latency(pcm, rate) if callable(stub.latency) else stub.latency
+                    time.sleep(latency + stub.per_audio_s * seconds)
+                    text = stub.transcript(pcm, rate)
+                    busy = time.perf_counter() - start
+                with stub._lock:
+                    stub.requests += 1
+                    stub.audio_s += seconds
+                    stub.busy_s += busy
+                out = json.dumps({"text": text}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.url = "http://127.0.0.1:{}/inference".format(self.port)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="asr-stub", daemon=True)
+
+    def start(self) -> "StubAsrServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Stub whisper.cpp /inference server.')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.15, help='Fixed seconds per request.')
+    parser.add_argument('--per-audio', type=float, default=0.05, help='Extra seconds per second of audio.')
+    parser.add_argument('--concurrency', type=int, default=1)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    server = StubAsrServer(args.port, args.latency, args.per_audio, args.concurrency)
+    print("stub ASR server on", server.url)
+    server.httpd.serve_forever()
@@ -0,0 +1,63 @@
+import argparse
+import multiprocessing
+import threading
+import time
+
+from io_libraries.control_loop import ControlLoop, ControlLoopConfig
+from io_libraries.motor_servo_control import Actuation
+from io_libraries.pwm_output import FakePCA9685, PCA9685Output
+
+# Runs the control loop against Actuation on a fake PCA9685 and prints its
+# deadline misses, wake-up jitter and tick execution time, optionally with
+# busy neighbour processes competing for the CPU.
+
+def busy_process():
+    x = 0
+    while True:
+        x += 1
+
+
+def joystick_source(loop, stop, rate_hz=30.0):
+    i = 0
+    while not stop.is_set():
+        loop.submit("joystick", (i % 200) - 100)
+        i += 1
+        time.sleep(1.0 / rate_hz)
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Control loop timing benchmark.')
+    parser.add_argument('--rate', type=float, default=50.0)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--busy', type=int, default=multiprocessing.cpu_count(),
+                        help='Number of busy-looping neighbour processes.')
+    parser.add_argument('--rt-priority', type=int, default=None,
+                        help='Request SCHED_FIFO with this priority (needs CAP_SYS_NICE).')
+    return parser.parse_args()
+
+
+def run(args, busy):
+    procs = [multiprocessing.Process(target=busy_process, daemon=True) for _ in range(busy)]
+    for p in procs:
+        p.start()
+
+    actuation = Actuation(output=PCA9685Output(FakePCA9685()))
+    loop = ControlLoop(actuation, ControlLoopConfig(rate_hz=args.rate, realtime_priority=args.rt_priority))
+    stop = threading.Event()
+    source = threading.Thread(target=joystick_source, args=(loop, stop), daemon=True)
+    source.start()
+
+    stats = loop.run(max_ticks=int(args.seconds * args.rate))
+
+    stop.set()
+    source.join()
+    for p in procs:
+        p.terminate()
+    return stats
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    for busy in sorted({0, args.busy}):
+        print("busy neighbours: {}".format(busy))
+        print(run(args, busy).summary())
@@ -0,0 +1,88 @@
+import argparse
+import threading
+import time
+
+import cv2
+
+from truck.vision.broadcast import BroadcastHub, Owned, encode_jpeg, mjpeg_part
+from truck.vision.pipeline import SyntheticSource
+
+# CPU use and per-viewer frame rate of the MJPEG stream with 1, 4 and 16
+# viewers, per-client generators (the old gen_frames(): every client reads
+# the shared camera, processes and encodes on its own) vs the broadcast hub.
+#
+# The camera is a 30 fps 1280x720 synthetic source; processing is a blur
+# standing in for MediaPipe + overlay. Viewers are threads consuming the
+# multipart bytes as fast as they arrive. The per-client readers split the
+# camera's frames between them, so their CPU stays flat while each viewer's
+# frame rate drops; the hub delivers every frame to every viewer for one
+# processing + encode per frame.
+
+
+def process(frame):
+    return cv2.GaussianBlur(frame, (9, 9), 0)
+
+
+def per_client(source, viewers, duration):
+    lock = threading.Lock()
+    stop = threading.Event()
+    received = [0] * viewers
+
+    def gen_frames():
+        while not stop.is_set():
+            with lock:
+                frame = source()
+            yield mjpeg_part(encode_jpeg(process(frame)))
+
+    def viewer(i):
+        for _ in gen_frames():
+            received[i] += 1
+
+    return run_viewers(viewer, viewers, duration, stop, received)
+
+
+def broadcast(source, viewers, duration):
+    hub = BroadcastHub(source, lambda f: Owned(process(f))).start()   # blur output is a new array
+    stop = threading.Event()
+    received = [0] * viewers
+
+    def viewer(i):
+        for _ in hub.mjpeg():
+            received[i] += 1
+            if stop.is_set():
+                return
+
+    result = run_viewers(viewer, viewers, duration, stop, received)
+    hub.stop()
+    return result
+
+
+def run_viewers(viewer, viewers, duration, stop, received):
+    threads = [threading.Thread(target=viewer, args=(i,), daemon=True) for i in range(viewers)]
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    cpu, wall = time.process_time() - cpu0, time.monotonic() - wall0
+    for t in threads:
+        t.join(timeout=1.0)
+    fps = [r / wall for r in received]
+    return 100.0 * cpu / wall, 1e3 * cpu / max(sum(received), 1), min(fps), sum(fps) / len(fps)
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='MJPEG broadcast hub benchmark.')
+    parser.add_argument('--duration', type=float, default=3.0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    print("{:>8} {:>12} {:>8} {:>16} {:>22}".format(
+        "viewers", "mode", "CPU %", "CPU ms/delivered", "fps per viewer min/avg"))
+    for viewers in (1, 4, 16):
+        for name, fn in (("per-client", per_client), ("hub", broadcast)):
+            cpu, per_frame, lo, avg = fn(SyntheticSource(fps=30.0), viewers, args.duration)
+            print("{:>8} {:>12} {:>8.0f} {:>16.2f} {:>12.1f} / {:.1f}".format(
+                viewers, name, cpu, per_frame, lo, avg))
@@ -1,17 +1,22 @@
 #!/usr/bin/env python3
 
+import os
 import socket
 import struct
 import time
 
 import numpy as np
 import cv2
-from flask import Flask, Response
+from flask import Flask, Response, request
 
 import mediapipe as mp
 
+from io_libraries.netlink import NetLink, NetLinkConfig
+from truck.vision.broadcast import BroadcastHub, Owned, StreamSettings
+from truck.vision.landmark_stream import LEFT, RIGHT, LandmarkPublisher
+from truck.vision.overlay import OverlayRenderer
+
 mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
 
 # Create one global Hands object
 hands = mp_hands.Hands(
@@ -73,71 +78,113 @@ app = Flask(__name__)
 cam = NetworkCamera(host="127.0.0.1", port=6000)
 
 
+# The source frame is read-only, straight from the socket buffer. A watched
+# frame with hands is copied once, drawn on in place and handed to the hub
+# as Owned; any other frame is copied by the hub when it publishes it.
+renderer = OverlayRenderer(min_confidence=None)
+_rgb = None
+
+
+def landmarks_to_array(multi_hand_landmarks, width, height):
+    """MediaPipe landmark lists -> (n, 21, 3) pixel x, y and relative z."""
+    kp = np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in multi_hand_landmarks],
+                  dtype=np.float32)
+    kp[..., 0] *= width
+    kp[..., 1] *= height
+    return kp
+
+
+# Landmarks for every frame go back to the host over UDP (LandmarkSubscriber
+# on LANDMARK_PORT); the annotated MJPEG stream is an optional debug view
+# (STREAM_VIDEO=0 disables it).
+LANDMARK_PEER = (os.environ.get("LANDMARK_HOST", "127.0.0.1"), int(os.environ.get("LANDMARK_PORT", "5007")))
+STREAM_VIDEO = os.environ.get("STREAM_VIDEO", "1") != "0"
+
+publisher = LandmarkPublisher(NetLink(NetLinkConfig(udp_bind=("0.0.0.0", 0), udp_peer=LANDMARK_PEER)))
+
+
+def handedness_to_array(multi_handedness):
+    labels = [h.classification[0] for h in multi_handedness]
+    side = np.array([LEFT if c.label == "Left" else RIGHT for c in labels], dtype=np.uint8)
+    return side, np.array([c.score for c in labels], dtype=np.float32)
+
+
 def process_frame(frame):
     """
-    Run MediaPipe Hands on the frame and draw landmarks.
+    Run MediaPipe Hands on the frame, publish the landmarks and, while
+    somebody watches the stream, draw them.
     """
-    # Make sure the frame is writable (copy detaches from read-only buffer)
-    frame = frame.copy()
-
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    res = hands.process(rgb)
-
+    global _rgb
+    if _rgb is None or _rgb.shape != frame.shape:
+        _rgb = np.empty_like(frame)
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=_rgb)
+    res = hands.process(_rgb)
+
+    h, w = frame.shape[:2]
+    kp = np.zeros((0, 21, 3), dtype=np.float32)
+    side, score = None, None
     if res.multi_hand_landmarks:
-        for hand_lms in res.multi_hand_landmarks:
-            mp_draw.draw_landmarks(
-                frame,
-                hand_lms,
-                mp_hands.HAND_CONNECTIONS,
-            )
+        kp = landmarks_to_array(res.multi_hand_landmarks, w, h)
+        side, score = handedness_to_array(res.multi_handedness)
+    publisher.publish(source.frames_read, source.read_at, kp, side, score)
 
+    if len(kp) and hub.viewers:
+        return Owned(renderer.render(frame.copy(), kp, in_place=True))
     return frame
 
 
-def gen_frames():
+class FrameSource:
     """
-    Generator that pulls frames from NetworkCamera,
-    runs processing, and yields MJPEG chunks for HTTP.
+    Blocking reads from the network camera for the broadcast hub, with the
+    once-a-second FPS print.
     """
-    last_time = time.time()
-    frames = 0
 
-    while True:
-        ret, frame = cam.read()
+    def __init__(self, cam):
+        self.cam = cam
+        self.last_time = time.time()
+        self.frames = 0
+        self.frames_read = 0
+        self.read_at = 0.0
+
+    def __call__(self):
+        ret, frame = self.cam.read()
+        self.read_at = time.time()
         if not ret or frame is None:
-            # If host stopped or connection dropped, break
-            print("[docker] No frame received, stopping generator.")
-            break
+            # If host stopped or connection dropped, end the stream
+            print("[docker] No frame received, stopping stream.")
+            return None
 
-        frames += 1
+        self.frames += 1
+        self.frames_read += 1
         now = time.time()
-        if now - last_time >= 1.0:
-            print(f"[docker] FPS ~ {frames}")
-            frames = 0
-            last_time = now
-
-        # Process the frame (draw landmarks, etc.)
-        frame = process_frame(frame)
+        if now - self.last_time >= 1.0:
+            print(f"[docker] FPS ~ {self.frames}")
+            self.frames = 0
+            self.last_time = now
+        return frame
 
-        # Encode to JPEG for MJPEG stream
-        ok, jpeg = cv2.imencode(".jpg", frame)
-        if not ok:
-            continue
 
-        yield (
-            b"--frame\r\n"
-            b"Content-Type: image/jpeg\r\n\r\n" + jpeg.tobytes() + b"\r\n"
-        )
+# One capture + MediaPipe thread for all viewers, JPEG encoding on a pool;
+# each /stream client gets the newest frame and skips any it was too slow for.
+# Frames are processed with or without viewers, for the landmark stream.
+source = FrameSource(cam)
+hub = BroadcastHub(source, process_frame, idle_when_unwatched=False)
 
 
 @app.route("/stream")
 def stream():
+    # /stream?w=640&q=60&fps=10: output width, JPEG quality, frame-rate cap.
     return Response(
-        gen_frames(),
+        hub.mjpeg(StreamSettings.from_query(request.args)),
         mimetype="multipart/x-mixed-replace; boundary=frame",
     )
 
 
+@app.route("/stats")
+def stats():
+    return Response(hub.report(), mimetype="text/plain")
+
+
 @app.route("/")
 def index():
     # Simple HTML page showing the stream
@@ -152,4 +199,12 @@ def index():
 if __name__ == "__main__":
     # Run HTTP server on port 5001
     # Accessible as http://JETSON_IP:5001/ or http://localhost:5001/ when on the Jetson
-    app.run(host="0.0.0.0", port=5001, debug=False, threaded=True)
\ No newline at end of file
+    if STREAM_VIDEO:
+        hub.start()
+        app.run(host="0.0.0.0", port=5001, debug=False, threaded=True)
+    else:
+        while True:
+            frame = source()
+            if frame is None:
+                break
+            process_frame(frame)
\ No newline at end of file
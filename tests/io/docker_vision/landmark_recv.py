@@ -0,0 +1,25 @@
+import time
+
+from io_libraries.netlink import NetLink, NetLinkConfig
+from truck.vision.landmark_stream import LandmarkSubscriber
+
+# Host side of the container's landmark stream (docker_http_stream.py
+# publishes to 127.0.0.1:5007 by default).
+
+sub = LandmarkSubscriber(NetLink(NetLinkConfig(udp_bind=("0.0.0.0", 5007))))
+
+last_print = time.time()
+frames = 0
+
+while True:
+    frame = sub.poll()
+    if frame is None:
+        continue
+
+    frames += 1
+    now = time.time()
+    if now - last_print >= 1.0:
+        age_ms = (now - frame.captured_at) * 1e3
+        print(f"frames/sec ~ {frames}  hands {len(frame)}  age {age_ms:.1f} ms  lost {sub.lost}")
+        frames = 0
+        last_print = now
@@ -0,0 +1,82 @@
+import argparse
+import threading
+import time
+
+import cv2
+
+from truck.vision.broadcast import BroadcastHub, Owned, StreamSettings, encode_jpeg
+from truck.vision.pipeline import SyntheticSource
+
+# Encode time and bandwidth per stream setting, with viewers asking for
+# different ?w=&q=&fps= combinations from one broadcast hub (30 fps
+# 1280x720 synthetic camera, blur standing in for MediaPipe + overlay).
+# Viewers sharing a setting share its encodes, so "encodes" stays at about
+# one per published frame (or per capped frame) for each setting no matter
+# how many viewers use it.
+#
+# Also reports how long the producer thread spends per frame when encoding
+# inline (the old gen_frames) vs handing encoding to the pool.
+
+VIEWERS = [
+    ("", 2),
+    ("w=640&q=70", 4),
+    ("w=320&q=50&fps=10", 4),
+    ("w=640&q=70&fps=15", 2),
+]
+
+
+def process(frame):
+    return cv2.GaussianBlur(frame, (9, 9), 0)
+
+
+def parse_query(query):
+    return StreamSettings.from_query(dict(kv.split("=") for kv in query.split("&") if kv))
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Per-setting JPEG encode / bandwidth benchmark.')
+    parser.add_argument('--duration', type=float, default=4.0)
+    parser.add_argument('--workers', type=int, default=2)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+
+    source = SyntheticSource(fps=30.0)
+    frame = process(source())
+    start = time.perf_counter()
+    for _ in range(30):
+        encode_jpeg(process(frame))
+    inline_ms = (time.perf_counter() - start) / 30 * 1e3
+    start = time.perf_counter()
+    for _ in range(30):
+        process(frame)
+    pooled_ms = (time.perf_counter() - start) / 30 * 1e3
+    print("producer per frame: {:.1f} ms encoding inline, {:.1f} ms with the encode pool".format(
+        inline_ms, pooled_ms))
+
+    hub = BroadcastHub(source, lambda f: Owned(process(f)), encode_workers=args.workers).start()
+    stop = threading.Event()
+    received = {}
+
+    def viewer(query, i):
+        for _ in hub.mjpeg(parse_query(query)):
+            received[query, i] = received.get((query, i), 0) + 1
+            if stop.is_set():
+                return
+
+    threads = [threading.Thread(target=viewer, args=(q, i), daemon=True) for q, n in VIEWERS for i in range(n)]
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join(timeout=1.0)
+    hub.stop()
+
+    print(hub.report())
+    for query, n in VIEWERS:
+        fps = [received.get((query, i), 0) / args.duration for i in range(n)]
+        print("  {:>20} x{:<2}: {:5.1f} fps per viewer".format("?" + query if query else "(defaults)", n,
+                                                             sum(fps) / n))
@@ -1,16 +1,14 @@
 import cv2
 import time
 
-gst = (
-    "udpsrc port=5000 caps=application/x-rtp,media=video,encoding-name=H264,payload=96 ! "
-    "rtph264depay ! avdec_h264 ! videoconvert ! appsink"
-)
+from io_libraries.camera.RtpStream import RtpReceiver
 
-cap = cv2.VideoCapture(gst, cv2.CAP_GSTREAMER)
+# Low-latency receiver: small jitter buffer, appsink drop=true max-buffers=1
+# sync=false, newest frame kept by a reader thread.
+cap = RtpReceiver(port=5000, latency_ms=20)
+cap.start()
 
-print("isOpened:", cap.isOpened())
-if not cap.isOpened():
-    raise RuntimeError("Failed to open GStreamer pipeline from UDP. Check that the host sender is running.")
+print("receiving:", cap.pipeline)
 
 last_print = time.time()
 frames = 0
@@ -22,11 +20,10 @@ while True:
         time.sleep(0.1)
         continue
 
-    
-
     frames += 1
     now = time.time()
     if now - last_print >= 1.0:
-        print(f"frames/sec ~ {frames}")
+        pts_ms = cap.getFrameWithTimestamp()[2]
+        print(f"frames/sec ~ {frames}  pts {pts_ms:.0f} ms")
         frames = 0
         last_print = now
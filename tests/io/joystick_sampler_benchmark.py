@@ -0,0 +1,83 @@
+import statistics
+import time
+
+from io_libraries.joystick import FakeADC, JoySticks, SamplerConfig, STICK_CENTER
+
+# Off-device benchmark of the joystick sampler using FakeADC channels:
+#   - achieved sample rate vs configured rate
+#   - noise at rest, raw vs filtered
+#   - step response latency (time to reach 90% of a full deflection)
+#   - cost of a get_left_joystick() call, direct SPI vs sampler snapshot
+
+SPI_READ_TIME = 30e-6   # roughly one MCP3008 conversion over hardware SPI
+STEP_TO = 0.95
+
+
+def make_sticks(signal=lambda t: STICK_CENTER):
+    return JoySticks([FakeADC(signal, read_time=SPI_READ_TIME, seed=i) for i in range(4)])
+
+
+def bench_rate(cfg, seconds=2.0):
+    sticks = make_sticks()
+    sampler = sticks.start_sampler(cfg)
+    time.sleep(seconds)
+    samples = sampler.samples
+    sticks.stop_sampler()
+    return samples / seconds, sampler.overruns
+
+
+def bench_noise(cfg, seconds=1.0):
+    sticks = make_sticks()
+    raw = [sticks.left_x.value for _ in range(500)]
+    sticks.start_sampler(cfg)
+    time.sleep(0.2)
+    filtered = []
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        filtered.append(sticks.get_left_joystick()[0])
+        time.sleep(0.002)
+    sticks.stop_sampler()
+    return statistics.pstdev(raw), statistics.pstdev(filtered)
+
+
+def bench_step(cfg):
+    step_at = [float("inf")]
+    sticks = make_sticks(lambda t: STEP_TO if t >= step_at[0] else STICK_CENTER)
+    sticks.start_sampler(cfg)
+    time.sleep(0.3)
+    step_at[0] = time.monotonic()
+    target = STICK_CENTER + 0.9 * (STEP_TO - STICK_CENTER)
+    while sticks.get_left_joystick()[0] < target:
+        time.sleep(0.0002)
+    latency = time.monotonic() - step_at[0]
+    sticks.stop_sampler()
+    return latency
+
+
+def bench_reader(n=2000):
+    sticks = make_sticks()
+    start = time.perf_counter()
+    for _ in range(n):
+        sticks.get_left_joystick()
+    direct = (time.perf_counter() - start) / n
+    sticks.start_sampler()
+    start = time.perf_counter()
+    for _ in range(n):
+        sticks.get_left_joystick()
+    sampled = (time.perf_counter() - start) / n
+    sticks.stop_sampler()
+    return direct, sampled
+
+
+if __name__ == "__main__":
+    for rate in (200.0, 500.0, 1000.0):
+        cfg = SamplerConfig(rate_hz=rate)
+        achieved, overruns = bench_rate(cfg)
+        print("rate {:6.0f} Hz -> {:6.0f} Hz achieved, {} overruns, step latency {:5.1f} ms".format(
+            rate, achieved, overruns, bench_step(cfg) * 1e3))
+
+    raw_sd, filt_sd = bench_noise(SamplerConfig())
+    print("noise at rest: raw sd {:.4f}, filtered sd {:.4f}".format(raw_sd, filt_sd))
+
+    direct, sampled = bench_reader()
+    print("get_left_joystick(): direct {:.1f} us, sampler {:.2f} us".format(direct * 1e6, sampled * 1e6))
@@ -0,0 +1,221 @@
+import argparse
+import time
+
+import numpy as np
+from scipy.io import wavfile
+from scipy.signal import butter, lfilter
+
+from io_libraries.keyword_spotter import KeywordSpotter, KwsConfig
+
+# Keyword spotter latency / accuracy / false-trigger benchmark.
+#
+# Synthetic mode (default): a crude formant synthesizer speaks the keywords
+# and some distractor words with per-utterance variation (pitch, formant
+# scale, tempo, level). A few utterances per keyword are enrolled, then a
+# long stream of keywords and distractors over fan-like noise is fed in
+# 0.1 s blocks, as the live script does. Reported:
+#   - hits, misses and confusions per keyword
+#   - latency from the end of the keyword to the hit (stream time) plus the
+#     CPU time to process the block that produced it
+#   - false triggers per minute on distractor words and noise
+#   - CPU per second of audio
+# A second synthetic stream has the background step up (level 150 -> 600,
+# a fan switching on) at --step-at seconds, which the spotter's adaptive
+# noise floor has to follow.
+#
+# Recorded mode: --templates DIR (DIR/<keyword>/*.wav) and --recording WAV
+# with --labels, an Audacity label file (start<TAB>end<TAB>word per line;
+# words that are not enrolled keywords count as distractors).
+
+SR = 16000
+BLOCK = SR // 10
+
+# Phones: ("v", F1, F2, F3, ms) voiced, ("f", lo Hz, hi Hz, ms) frication,
+# ("c", ms) closure / silence. Diphthongs are runs of voiced phones.
+WORDS = {
+    "stop": [("f", 4000, 7500, 110), ("c", 40), ("v", 700, 1100, 2450, 180), ("c", 60), ("f", 1500, 4000, 25)],
+    "go": [("f", 1200, 2500, 20), ("v", 550, 900, 2400, 110), ("v", 450, 850, 2350, 90),
+           ("v", 350, 800, 2300, 90)],
+    "left": [("v", 360, 1000, 2600, 70), ("v", 580, 1800, 2550, 150), ("f", 1000, 6000, 90), ("c", 40),
+             ("f", 3000, 6000, 25)],
+    "right": [("v", 420, 1300, 1650, 90), ("v", 750, 1250, 2500, 120), ("v", 500, 1900, 2600, 80),
+              ("v", 380, 2200, 2800, 60), ("c", 50), ("f", 3000, 6000, 25)],
+}
+DISTRACTORS = {
+    "hello": [("f", 500, 3000, 60), ("v", 550, 1800, 2500, 100), ("v", 360, 1000, 2600, 70),
+              ("v", 450, 850, 2350, 160)],
+    "start": [("f", 4000, 7500, 100), ("c", 40), ("v", 750, 1150, 1700, 170), ("c", 50),
+              ("f", 3000, 6000, 25)],
+    "light": [("v", 360, 1000, 2600, 70), ("v", 750, 1250, 2500, 110), ("v", 380, 2200, 2800, 70),
+              ("c", 50), ("f", 3000, 6000, 25)],
+    "yes": [("v", 280, 2250, 2900, 60), ("v", 580, 1800, 2550, 130), ("f", 4000, 7500, 140)],
+    "car": [("c", 40), ("f", 1500, 3000, 30), ("v", 700, 1100, 1600, 220)],
+}
+
+
+def resonator(x, f, bw):
+    r = np.exp(-np.pi * bw / SR)
+    a = [1.0, -2 * r * np.cos(2 * np.pi * f / SR), r * r]
+    return lfilter([1.0 - r], a, x)
+
+
+def synth(phones, rng):
+    f0 = rng.uniform(95, 210)
+    scale = rng.uniform(0.92, 1.08)
+    tempo = rng.uniform(0.8, 1.25)
+    out = []
+    for p in phones:
+        n = int(p[-1] * tempo * SR / 1000)
+        if p[0] == "c":
+            out.append(np.zeros(n))
+        elif p[0] == "f":
+            b, a = butter(2, [p[1] / (SR / 2), min(p[2], 7900) / (SR / 2)], "band")
+            out.append(0.25 * lfilter(b, a, rng.normal(0, 1, n)))
+        else:
+            t = np.arange(n) / SR
+            pitch = f0 * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+            src = (np.cumsum(pitch / SR) % 1.0) - 0.5
+            x = src
+            for formant, bw in zip(p[1:4], (80, 100, 140)):
+                x = resonator(x, formant * scale, bw)
+            out.append(0.35 * x / (np.sqrt(np.mean(x ** 2)) + 1e-9))
+    y = np.concatenate(out)
+    ramp = min(len(y) // 4, 80)
+    y[:ramp] *= np.linspace(0, 1, ramp)
+    y[-ramp:] *= np.linspace(1, 0, ramp)
+    return y * rng.uniform(3000, 9000)
+
+
+def background(n, rng, level=150.0):
+    t = np.arange(n) / SR
+    brown = np.cumsum(rng.normal(0, 1, n))
+    brown -= np.convolve(brown, np.ones(400) / 400, mode="same")
+    return level * (0.05 * brown + rng.normal(0, 1, n)) + 100 * np.sin(2 * np.pi * 50 * t)
+
+
+def synthetic_stream(seconds, rng, keyword_share=0.5, step_at=None):
+    n = int(seconds * SR)
+    audio = background(n, rng)
+    if step_at is not None:
+        i = int(step_at * SR)
+        audio[i:] = background(n - i, rng, level=600.0)
+    labels = []
+    pos = rng.uniform(0.5, 1.0)
+    while pos < seconds - 1.5:
+        if rng.random() < keyword_share:
+            word = rng.choice(sorted(WORDS))
+            y = synth(WORDS[word], rng)
+        else:
+            word = rng.choice(sorted(DISTRACTORS))
+            y = synth(DISTRACTORS[word], rng)
+        i = int(pos * SR)
+        audio[i:i + len(y)] += y
+        labels.append((pos, pos + len(y) / SR, word))
+        pos += len(y) / SR + rng.uniform(0.7, 2.5)
+    return np.clip(audio, -32768, 32767).astype(np.int16), labels
+
+
+def enroll_synthetic(spotter, rng, per_word):
+    for word, phones in WORDS.items():
+        for _ in range(per_word):
+            y = synth(phones, rng)
+            pad = background(int(0.2 * SR), rng)
+            clip = np.concatenate([pad, y + background(len(y), rng), pad])
+            spotter.add_template(word, np.clip(clip, -32768, 32767).astype(np.int16))
+
+
+def read_labels(path):
+    labels = []
+    with open(path) as f:
+        for line in f:
+            parts = line.strip().split("\t")
+            if len(parts) >= 3:
+                labels.append((float(parts[0]), float(parts[1]), parts[2].strip().lower()))
+    return labels
+
+
+def run(spotter, audio):
+    hits, cpu = [], 0.0
+    for i in range(0, len(audio), BLOCK):
+        start = time.perf_counter()
+        found = spotter.feed(audio[i:i + BLOCK])
+        elapsed = time.perf_counter() - start
+        cpu += elapsed
+        hits += [(h, elapsed) for h in found]
+    return hits, cpu
+
+
+def score(hits, labels, keywords, seconds):
+    used = set()
+    per_word = {k: [0, 0, 0] for k in keywords}          # hit, miss, confused
+    latencies, false_hits = [], 0
+    for h, block_cpu in hits:
+        # The utterance the hit overlaps (allowing it to fire a little late).
+        match = [j for j, (s, e, _) in enumerate(labels) if s - 0.1 <= h.time <= e + 0.4 and j not in used]
+        if not match:
+            false_hits += 1
+            continue
+        j = match[0]
+        used.add(j)
+        s, e, word = labels[j]
+        if word not in keywords:
+            false_hits += 1
+        elif word == h.keyword:
+            per_word[word][0] += 1
+            latencies.append(h.time - e + block_cpu)
+        else:
+            per_word[word][2] += 1
+    for j, (_, _, word) in enumerate(labels):
+        if word in keywords and j not in used:
+            per_word[word][1] += 1
+    distractors = sum(1 for _, _, w in labels if w not in keywords)
+    return per_word, latencies, false_hits, distractors
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Keyword spotter latency and false-trigger benchmark.')
+    parser.add_argument('--seconds', type=float, default=180.0, help='Synthetic stream length.')
+    parser.add_argument('--enroll', type=int, default=4, help='Synthetic templates per keyword.')
+    parser.add_argument('--templates', help='Directory of <keyword>/*.wav templates (recorded mode).')
+    parser.add_argument('--recording', help='16 kHz mono WAV to scan (recorded mode).')
+    parser.add_argument('--labels', help='Audacity label file for --recording.')
+    parser.add_argument('--threshold-scale', type=float, default=KwsConfig.threshold_scale)
+    parser.add_argument('--step-at', type=float, default=5.0, help='Noise step time in the second synthetic stream.')
+    return parser.parse_args()
+
+
+def report(name, spotter, audio, labels):
+    spotter.reset()
+    keywords = set(spotter.keywords)
+    seconds = len(audio) / SR
+    hits, cpu = run(spotter, audio)
+    per_word, latencies, false_hits, distractors = score(hits, labels, keywords, seconds)
+    print("{}: {:.0f} s of audio, {} keywords, {} distractor words: {:.2f} ms CPU per audio s".format(
+        name, seconds, sum(1 for _, _, w in labels if w in keywords), distractors, cpu / seconds * 1e3))
+    for word, (ok, miss, confused) in sorted(per_word.items()):
+        print("  {:>6}: {:3d} hit, {:3d} missed, {:3d} confused".format(word, ok, miss, confused))
+    if latencies:
+        lat = np.array(latencies) * 1e3
+        print("latency word end -> hit: median {:.0f} ms, p90 {:.0f} ms, max {:.0f} ms".format(
+            np.median(lat), np.percentile(lat, 90), lat.max()))
+    print("false triggers: {} ({:.1f} per minute)".format(false_hits, false_hits / seconds * 60))
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    rng = np.random.default_rng(1)
+    spotter = KeywordSpotter(KwsConfig(threshold_scale=args.threshold_scale))
+    if args.templates:
+        spotter.add_template_dir(args.templates)
+        rate, audio = wavfile.read(args.recording)
+        audio = audio if audio.ndim == 1 else audio[:, 0]
+        streams = [("recording", audio, read_labels(args.labels) if args.labels else [])]
+    else:
+        enroll_synthetic(spotter, rng, args.enroll)
+        streams = [("synthetic",) + synthetic_stream(args.seconds, rng),
+                   ("noise step",) + synthetic_stream(args.seconds, rng, step_at=args.step_at)]
+    thresholds = spotter.calibrate()
+    print("{} templates, thresholds {}".format(
+        len(spotter.templates), ", ".join("{} {:.2f}".format(k, v) for k, v in sorted(thresholds.items()))))
+    for name, audio, labels in streams:
+        report(name, spotter, audio, labels)
@@ -0,0 +1,68 @@
+import argparse
+import time
+
+import numpy as np
+
+from io_libraries.netlink import NetLink, NetLinkConfig
+from truck.gesture_detection.landmarks import GESTURE_POSES, synthetic_hands
+from truck.vision.landmark_stream import (RIGHT, LandmarkFrame, LandmarkPublisher, LandmarkSubscriber,
+                                          decode_landmarks, encode_landmarks)
+
+# Landmark packet size, encode/decode cost and float16 precision for 0-4
+# hands (pixel coordinates in a 1280x720 frame), then a loopback run through
+# NetLink: publisher -> UDP -> subscriber, delivery rate and latency.
+
+
+def per_call_us(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Landmark stream benchmark.')
+    parser.add_argument('--repeat', type=int, default=20000)
+    parser.add_argument('--frames', type=int, default=2000)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    rng = np.random.default_rng(0)
+    poses = list(GESTURE_POSES.values())
+
+    print("{:>5} {:>6} {:>7} {:>11} {:>11} {:>14}".format(
+        "hands", "dtype", "bytes", "encode us", "decode us", "max error px"))
+    for n in (0, 1, 2, 4):
+        kp = np.zeros((0, 21, 3))
+        if n:
+            kp = synthetic_hands([poses[i % len(poses)] for i in range(n)], rng, scale=(80.0, 200.0))
+            kp[..., 0] *= 1280 / 700.0
+        frame = LandmarkFrame(1, time.time(), kp.astype(np.float32),
+                              np.full(n, RIGHT, dtype=np.uint8), np.full(n, 0.9, dtype=np.float32))
+        for half in (True, False):
+            payload = encode_landmarks(frame, half)
+            decoded = decode_landmarks(payload)
+            err = np.abs(decoded.landmarks[..., :2] - frame.landmarks[..., :2]).max() if n else 0.0
+            enc = per_call_us(lambda: encode_landmarks(frame, half), args.repeat)
+            dec = per_call_us(lambda: decode_landmarks(payload), args.repeat)
+            print("{:>5} {:>6} {:>7} {:>11.2f} {:>11.2f} {:>14.3f}".format(
+                n, "f16" if half else "f32", len(payload), enc, dec, err))
+
+    # Loopback through NetLink (CRC included).
+    rx = NetLink(NetLinkConfig(udp_bind=("127.0.0.1", 0), udp_timeout_s=0.2))
+    tx = NetLink(NetLinkConfig(udp_bind=("127.0.0.1", 0), udp_peer=rx.udp_sock.getsockname()))
+    pub, sub = LandmarkPublisher(tx), LandmarkSubscriber(rx)
+    kp = synthetic_hands([poses[0], poses[1]], rng).astype(np.float32)
+    latency = []
+    for seq in range(1, args.frames + 1):
+        pub.publish(seq, time.time(), kp)
+        got = sub.poll()
+        if got is not None:
+            latency.append(time.time() - got.captured_at)
+    rx.close()
+    tx.close()
+    us = np.array(latency) * 1e6
+    print("loopback: {}/{} delivered, {} B/packet, latency mean {:.0f} us p99 {:.0f} us".format(
+        sub.delivered, args.frames, pub.bytes_sent // max(pub.sent, 1), us.mean(), np.percentile(us, 99)))
@@ -0,0 +1,62 @@
+import math
+import time
+
+from io_libraries.motor_servo_control import Actuation, MOTOR_CHANNEL, SERVO_CHANNEL
+from io_libraries.pwm_output import FakePCA9685, PCA9685Output, duty_cycle_to_count
+
+# I2C transactions per second for a 50 Hz control loop driving motor and
+# steering from a joystick-like trace (long holds, occasional ramps):
+#   before: one Adafruit duty_cycle write per channel per tick
+#   after:  Actuation.set_drive() through PCA9685Output (burst + suppression)
+
+RATE_HZ = 50
+SECONDS = 60
+
+
+def trace(n):
+    for i in range(n):
+        t = i / RATE_HZ
+        # Hold for 2 s, ramp for 1 s, repeat; steering sweeps slowly.
+        phase = t % 3.0
+        speed = 0 if phase < 2.0 else round(60 * math.sin(math.pi * (phase - 2.0)))
+        steering = round(40 * math.sin(t / 4.0)) if int(t) % 5 < 2 else 0
+        yield speed, steering
+
+
+class AdafruitStyleOutput:
+    """One transaction per channel assignment, like pca.channels[n].duty_cycle = x."""
+    def __init__(self, bus):
+        self.bus = bus
+
+    def write(self, channel, duty_cycle):
+        count = duty_cycle_to_count(duty_cycle)
+        self.bus.write_block(0x40, 0x06 + 4 * channel, [0, 0, count & 0xFF, count >> 8])
+
+
+if __name__ == "__main__":
+    n = RATE_HZ * SECONDS
+
+    old_bus = FakePCA9685()
+    old = AdafruitStyleOutput(old_bus)
+    act = Actuation(output=PCA9685Output(FakePCA9685()))
+    start = time.perf_counter()
+    for speed, steering in trace(n):
+        old.write(MOTOR_CHANNEL, act.calc_pwm_value(speed))
+        old.write(SERVO_CHANNEL, act.calc_pwm_value(steering))
+    old_time = time.perf_counter() - start
+
+    new_bus = FakePCA9685()
+    act = Actuation(output=PCA9685Output(new_bus))
+    new_bus.transactions = 0
+    start = time.perf_counter()
+    for speed, steering in trace(n):
+        act.set_drive(speed, steering)
+    new_time = time.perf_counter() - start
+
+    for ch in (MOTOR_CHANNEL, SERVO_CHANNEL):
+        assert new_bus.off_count(ch) == old_bus.off_count(ch)
+
+    print("before: {:6.1f} transactions/s  ({:.1f} us/tick)".format(
+        old_bus.transactions / SECONDS, old_time / n * 1e6))
+    print("after:  {:6.1f} transactions/s  ({:.1f} us/tick)".format(
+        new_bus.transactions / SECONDS, new_time / n * 1e6))
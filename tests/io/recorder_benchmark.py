@@ -0,0 +1,110 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from io_libraries.recorder import ReplayCamera, ReplayNetLink, SessionReader, SessionRecorder
+from io_libraries.teleop import TeleopCommand, encode_packet
+
+# Session recorder / replay benchmark on a synthetic session: 30 fps camera
+# frames, 100 Hz teleop packets and 30 Hz lens / gesture telemetry, produced
+# at --speed times real time (speed 0: as fast as possible, which mostly
+# measures how many records the bounded queue drops).
+#   - hot-path cost of record_*() calls and records dropped by the bounded queue
+#   - writer throughput
+#   - seek cost vs session length (binary search over the mmapped index)
+#   - as-fast-as-possible replay rate through ReplayCamera / ReplayNetLink,
+#     and timing error of real-time replay
+
+
+def record_session(path, seconds, size, codec, queue_size, speed):
+    rng = np.random.default_rng(0)
+    frames = [(rng.random(size + (3,)) * 255).astype(np.uint8) for _ in range(4)]
+    rec = SessionRecorder(path, chunk_bytes=64 << 20, queue_size=queue_size, frame_codec=codec).start()
+    t0 = 1.7e9
+    calls, hot = 0, 0.0
+    wall = time.perf_counter()
+    for tick in range(int(seconds * 300)):            # 300 Hz base tick
+        t = t0 + tick / 300.0
+        if speed:
+            delay = wall + tick / 300.0 / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        start = time.perf_counter()
+        if tick % 10 == 0:
+            rec.record_frame("camera", frames[tick % 4], t)
+            rec.record_json("lens", {"position": 400 + tick % 50, "settled": True}, t)
+            rec.record_json("gestures", {"tracks": [[0, 1]]}, t)
+            calls += 3
+        if tick % 3 == 0:
+            cmd = TeleopCommand(tick, t, 10.0, -5.0)
+            rec.record("udp", encode_packet(tick, [cmd], t), t)
+            calls += 1
+        hot += time.perf_counter() - start
+    produced = time.perf_counter() - wall
+    rec.stop()
+    total = time.perf_counter() - wall
+    return rec, calls, hot, produced, total
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Session recorder benchmark.')
+    parser.add_argument('--seconds', type=float, default=20.0, help='Recorded session length.')
+    parser.add_argument('--codec', default='raw', choices=['raw', 'jpeg'])
+    parser.add_argument('--queue', type=int, default=256)
+    parser.add_argument('--speed', type=float, default=10.0, help='Production speed vs real time (0: asap).')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=360)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    path = tempfile.mkdtemp(prefix="session_")
+    try:
+        rec, calls, hot, produced, total = record_session(path, args.seconds, (args.height, args.width),
+                                                          args.codec, args.queue, args.speed)
+        print("record: {} calls, {:.1f} us/call on the hot path, {}".format(calls, hot / calls * 1e6, rec.report()))
+        print("writer: {:.0f} MB/s ({:.2f} s producing, {:.2f} s until flushed)".format(
+            rec.bytes_written / 1e6 / total, produced, total))
+
+        session = SessionReader(path)
+        lo, hi = session.time_range
+        ts = np.random.default_rng(1).uniform(lo, hi, 10000)
+        start = time.perf_counter()
+        for t in ts:
+            session.seek(t)
+        print("seek: {} records, {:.2f} us/seek".format(len(session), (time.perf_counter() - start) / len(ts) * 1e6))
+
+        cam = ReplayCamera(session, speed=None)
+        start = time.perf_counter()
+        n = 0
+        while True:
+            ok, frame = cam.read()
+            if not ok:
+                break
+            n += 1
+        elapsed = time.perf_counter() - start
+        print("replay camera (asap): {} frames, {:.0f} fps".format(n, n / elapsed))
+
+        link = ReplayNetLink(session, speed=None)
+        start = time.perf_counter()
+        n = 0
+        while link.recv_udp() is not None:
+            n += 1
+        print("replay netlink (asap): {} packets, {:.0f} packets/s".format(n, n / (time.perf_counter() - start)))
+
+        # Real-time replay of the first second: how late is each frame?
+        cam = ReplayCamera(session, speed=1.0, start=lo)
+        clock_start, late = time.monotonic(), []
+        for _ in range(30):
+            _, ts = cam.getFrameWithTimestamp()
+            late.append((time.monotonic() - clock_start) - (ts - lo))
+        print("replay camera (1x): timing error mean {:.2f} ms max {:.2f} ms".format(
+            np.mean(late) * 1e3, np.max(late) * 1e3))
+        session.close()
+    finally:
+        shutil.rmtree(path)
@@ -0,0 +1,139 @@
+import argparse
+import io
+import queue
+import time
+import wave
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from io_libraries.asr_client import wav_bytes
+from io_libraries.audio_frontend import AudioFrontEnd, StreamingResampler
+
+# 44.1 kHz capture -> 16 kHz ASR input, old path vs AudioFrontEnd.
+#
+#   old:  q.put(indata.copy()) per callback, np.concatenate([carry, block])
+#         per callback, resample_poly per chunk, WAV via an in-memory file
+#         (soundfile there; the stdlib wave module stands in here).
+#   new:  AudioRing write per callback, fixed-size reads, StreamingResampler
+#         with carried filter history, PCM16 + packed WAV header.
+#
+# Reports CPU per second of audio for each stage and the error against
+# resampling the whole recording in one piece, near chunk boundaries (first
+# and last 2 ms of every chunk) and elsewhere. Input: a 300-3400 Hz chirp
+# plus noise, at about -12 dBFS.
+
+CAPTURE_SR, ASR_SR = 44100, 16000
+
+
+def test_signal(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * CAPTURE_SR)) / CAPTURE_SR
+    f = 300 + (3400 - 300) * (t % 2.0) / 2.0
+    x = 7000 * np.sin(2 * np.pi * np.cumsum(f) / CAPTURE_SR) + rng.normal(0, 1500, len(t))
+    return np.clip(x, -32768, 32767).astype(np.int16)
+
+
+def callbacks(audio, block=512):
+    # sounddevice hands out (frames, channels) blocks.
+    for i in range(0, len(audio) - block + 1, block):
+        yield audio[i:i + block, None]
+
+
+def soundfile_like_wav(pcm):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(ASR_SR)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def old_path(audio, chunk):
+    chunks, q = [], queue.Queue()
+    t_cb = t_rs = t_wav = 0.0
+    carry = np.zeros((0, 1), dtype=np.int16)
+    for block in callbacks(audio):
+        start = time.perf_counter()
+        q.put(block.copy())
+        t_cb += time.perf_counter() - start
+
+        start = time.perf_counter()
+        data = np.concatenate([carry, q.get()], axis=0)
+        while data.shape[0] >= chunk:
+            c, data = data[:chunk], data[chunk:]
+            y = resample_poly(c, ASR_SR, CAPTURE_SR).astype(np.int16)
+            chunks.append(y[:, 0])
+        carry = data
+        t_rs += time.perf_counter() - start
+    start = time.perf_counter()
+    for y in chunks:
+        soundfile_like_wav(y)
+    t_wav = time.perf_counter() - start
+    return chunks, t_cb, t_rs, t_wav
+
+
+def new_path(audio, chunk):
+    fe = AudioFrontEnd(CAPTURE_SR, ASR_SR, block_s=chunk / CAPTURE_SR)
+    chunks = []
+    t_cb = t_rs = 0.0
+    for block in callbacks(audio):
+        start = time.perf_counter()
+        fe.callback(block, len(block), None, None)
+        t_cb += time.perf_counter() - start
+
+        start = time.perf_counter()
+        while fe.ring.available >= chunk:
+            chunks.append(fe.read(timeout=0))
+        t_rs += time.perf_counter() - start
+    start = time.perf_counter()
+    for y in chunks:
+        wav_bytes(y, ASR_SR)
+    t_wav = time.perf_counter() - start
+    return chunks, t_cb, t_rs, t_wav
+
+
+def boundary_error(chunks, reference, edge):
+    # chunks: consecutive output blocks; error in dB relative to reference RMS.
+    y = np.concatenate(chunks).astype(np.float64)
+    ref = reference[:len(y)]
+    err = np.abs(y - ref)
+    near = np.zeros(len(y), dtype=bool)
+    pos = 0
+    for c in chunks:
+        near[pos:pos + edge] = True
+        near[max(pos + len(c) - edge, 0):pos + len(c)] = True
+        pos += len(c)
+    rms = np.sqrt(np.mean(ref ** 2))
+    db = lambda e: 20 * np.log10(np.sqrt(np.mean(e ** 2)) / rms + 1e-12)
+    return db(err[near]), db(err[~near]), np.max(err[near])
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Audio front end: CPU and block-boundary error.')
+    parser.add_argument('--seconds', type=float, default=20.0)
+    parser.add_argument('--chunks', type=float, nargs='+', default=[0.1, 1.0], help='Chunk lengths in seconds.')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    audio = test_signal(args.seconds)
+    reference = resample_poly(audio.astype(np.float64), ASR_SR, CAPTURE_SR)
+    edge = int(0.002 * ASR_SR)
+
+    start = time.perf_counter()
+    StreamingResampler(CAPTURE_SR, ASR_SR)
+    print("resampler setup {:.1f} ms (filter design, once)".format((time.perf_counter() - start) * 1e3))
+
+    for chunk_s in args.chunks:
+        chunk = int(round(chunk_s * CAPTURE_SR))
+        print("{:.2f} s chunks ({} s of audio):".format(chunk_s, args.seconds))
+        for name, path in (("old", old_path), ("new", new_path)):
+            chunks, t_cb, t_rs, t_wav = path(audio, chunk)
+            per_s = lambda t: t / args.seconds * 1e3
+            near, away, peak = boundary_error(chunks, reference, edge)
+            print("  {}: callback {:.3f} ms, resample {:.2f} ms, wav {:.3f} ms per audio s | "
+                  "error {:6.1f} dB at boundaries (peak {:5.0f}), {:6.1f} dB elsewhere".format(
+                      name, per_s(t_cb), per_s(t_rs), per_s(t_wav), near, peak, away))
@@ -0,0 +1,91 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from io_libraries.camera.RtpStream import H264Sender, RtpReceiver
+
+# Glass-to-glass latency of the H.264 RTP path on loopback: synthetic frames
+# carry their frame number as a row of black/white blocks; the receiver reads
+# the number back from each decoded frame and compares its arrival time with
+# the time that frame was handed to the encoder.
+#
+# Needs OpenCV built with GStreamer plus x264enc / avdec_h264
+# (gstreamer1.0-plugins-ugly, gstreamer1.0-libav); --hardware uses the
+# Jetson encoder/decoder instead.
+
+BITS = 16
+BLOCK = 40
+
+
+def stamp(frame, n):
+    for b in range(BITS):
+        frame[:BLOCK, b * BLOCK:(b + 1) * BLOCK] = 255 if (n >> b) & 1 else 0
+
+
+def read_stamp(frame):
+    cells = frame[BLOCK // 4:3 * BLOCK // 4, :BITS * BLOCK].reshape(BLOCK // 2, BITS, BLOCK, -1)
+    bits = cells[:, :, BLOCK // 4:3 * BLOCK // 4].mean(axis=(0, 2, 3)) > 127
+    return int(np.sum(bits.astype(np.int64) << np.arange(BITS)))
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='RTP/H.264 loopback glass-to-glass latency.')
+    parser.add_argument('--port', type=int, default=5600)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--jitter-ms', type=int, default=20)
+    parser.add_argument('--hardware', action='store_true')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    size = (1280, 720)
+    receiver = RtpReceiver(args.port, latency_ms=args.jitter_ms, hardware=args.hardware)
+    receiver.start()
+    sender = H264Sender("127.0.0.1", args.port, size, fps=args.fps, hardware=args.hardware)
+    print("encoder:", "hardware" if sender.hardware else "x264enc zerolatency")
+
+    sent_at = {}
+    rng = np.random.default_rng(0)
+    background = (rng.random((size[1], size[0], 3)) * 80 + 60).astype(np.uint8)
+
+    def produce():
+        period = 1.0 / args.fps
+        next_t = time.monotonic()
+        n = 0
+        while time.monotonic() < start + args.seconds:
+            n += 1
+            frame = background.copy()
+            stamp(frame, n)
+            sent_at[n] = time.time()
+            sender.write(frame)
+            next_t += period
+            time.sleep(max(0.0, next_t - time.monotonic()))
+
+    start = time.monotonic()
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    latency, seq = [], 0
+    seen = set()
+    while producer.is_alive() or time.monotonic() < start + args.seconds + 0.5:
+        try:
+            frame, received_at, _, seq = receiver.getFrameWithTimestamp(0.5, seq)
+        except TimeoutError:
+            continue
+        n = read_stamp(frame)
+        if n in sent_at and n not in seen:
+            seen.add(n)
+            latency.append(received_at - sent_at[n])
+    sender.close()
+    receiver.stop()
+
+    if not latency:
+        raise SystemExit("no frames received")
+    ms = np.array(latency) * 1e3
+    print("{} sent, {} received ({:.0%})".format(len(sent_at), len(seen), len(seen) / len(sent_at)))
+    print("glass-to-glass: mean {:.1f} ms  p50 {:.1f}  p95 {:.1f}  max {:.1f}".format(
+        ms.mean(), np.percentile(ms, 50), np.percentile(ms, 95), ms.max()))
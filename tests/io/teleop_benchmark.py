@@ -0,0 +1,78 @@
+import math
+import random
+import statistics
+import threading
+import time
+
+from io_libraries.joystick import FakeADC, JoySticks, STICK_CENTER
+from io_libraries.netlink import NetLink, NetLinkConfig
+from io_libraries.teleop import TeleopConfig, TeleopReceiver, TeleopSender
+
+# Teleop over a local lossy loopback: the sender's datagrams are dropped with
+# probability p before reaching the socket. Reports, per loss rate and
+# redundancy K, the command latency (sample -> delivered) and the fraction of
+# commands the receiver never saw.
+
+SECONDS = 3.0
+PORT = 5105
+
+
+class LossyLink:
+    def __init__(self, link, loss, seed=0):
+        self.link = link
+        self.loss = loss
+        self.dropped = 0
+        self._rng = random.Random(seed)
+
+    def send_udp(self, payload, peer=None):
+        if self._rng.random() < self.loss:
+            self.dropped += 1
+            return
+        self.link.send_udp(payload, peer)
+
+
+def moving_stick(t):
+    return STICK_CENTER + 0.4 * math.sin(2 * math.pi * 0.7 * t)
+
+
+def run(loss, redundancy):
+    rx_link = NetLink(NetLinkConfig(udp_bind=("127.0.0.1", PORT), udp_timeout_s=0.05))
+    tx_link = NetLink(NetLinkConfig(udp_bind=("127.0.0.1", 0), udp_peer=("127.0.0.1", PORT)))
+
+    latencies = []
+    receiver = TeleopReceiver(rx_link, on_command=lambda c: latencies.append(time.time() - c.sampled_at))
+    stop = threading.Event()
+
+    def rx():
+        while not stop.is_set():
+            receiver.poll()
+
+    rx_thread = threading.Thread(target=rx, daemon=True)
+    rx_thread.start()
+
+    sticks = JoySticks([FakeADC(moving_stick, noise=0.0) for _ in range(4)])
+    sticks.start_sampler()
+    sender = TeleopSender(LossyLink(tx_link, loss), sticks, TeleopConfig(rate_hz=100, redundancy=redundancy))
+    sender.start()
+    time.sleep(SECONDS)
+    sender.stop()
+    sticks.stop_sampler()
+    time.sleep(0.1)
+    stop.set()
+    rx_thread.join()
+    rx_link.close()
+    tx_link.close()
+
+    missing = sender.cmd_seq - receiver.delivered
+    return sender, receiver, missing, latencies
+
+
+if __name__ == "__main__":
+    print("{:>5} {:>3} {:>8} {:>8} {:>9} {:>9} {:>10}".format(
+        "loss", "K", "cmds", "packets", "recovered", "missing", "p50 lat"))
+    for loss in (0.0, 0.1, 0.3):
+        for k in (1, 4):
+            sender, receiver, missing, lat = run(loss, k)
+            print("{:>5.0%} {:>3} {:>8} {:>8} {:>9} {:>8.2%} {:>8.2f}ms".format(
+                loss, k, sender.cmd_seq, sender.packets_sent, receiver.recovered,
+                missing / max(sender.cmd_seq, 1), statistics.median(lat) * 1e3 if lat else float("nan")))
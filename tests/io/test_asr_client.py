@@ -0,0 +1,131 @@
+import time
+
+import numpy as np
+import pytest
+
+from asr_stub_server import StubAsrServer
+from io_libraries.asr_client import AsrClient
+
+# AsrClient against the local stub server (asr_stub_server.py). Every
+# segment carries its id in its first sample; the stub answers with that id
+# and can make some ids slower than others, so replies finish out of order.
+
+SR = 16000
+
+
+def segment(i, seconds=0.2):
+    pcm = np.zeros(int(SR * seconds), dtype=np.int16)
+    pcm[0] = i
+    return pcm
+
+
+def echo_id(pcm, rate):
+    return "segment {}".format(int(pcm[0]))
+
+
+def collect(client, n, timeout=5.0):
+    out = []
+    deadline = time.monotonic() + timeout
+    while len(out) < n and time.monotonic() < deadline:
+        r = client.get(timeout=0.1)
+        if r is not None:
+            out.append(r)
+    return out
+
+
+def test_results_in_submission_order():
+    # Even ids take 5x longer than odd ones.
+    latency = lambda pcm, rate: 0.15 if pcm[0] % 2 == 0 else 0.03
+    with StubAsrServer(latency=latency, concurrency=4, transcript=echo_id) as server:
+        with AsrClient(server.url, workers=4, latency_budget_s=None) as client:
+            for i in range(12):
+                client.submit(segment(i))
+            results = collect(client, 12)
+    assert [r.seq for r in results] == list(range(12))
+    assert [r.text for r in results] == ["segment {}".format(i) for i in range(12)]
+    assert all(r.error is None and not r.dropped for r in results)
+
+
+def test_requests_are_pipelined():
+    n, latency, workers = 8, 0.1, 4
+    with StubAsrServer(latency=latency, concurrency=workers) as server:
+        with AsrClient(server.url, workers=workers, latency_budget_s=None) as client:
+            start = time.monotonic()
+            for i in range(n):
+                client.submit(segment(i))
+            results = collect(client, n)
+            elapsed = time.monotonic() - start
+    assert len(results) == n
+    # Sequential posting would take n * latency = 0.8 s.
+    assert elapsed < n * latency / 2
+
+
+def test_connections_are_kept_alive():
+    with StubAsrServer(latency=0.01, concurrency=2) as server:
+        with AsrClient(server.url, workers=2, latency_budget_s=None) as client:
+            for i in range(20):
+                client.submit(segment(i))
+            results = collect(client, 20)
+        assert len(results) == 20
+        assert server.requests == 20
+        assert server.connections <= 2
+        assert client.connections <= 2
+
+
+def test_stale_segments_dropped_in_order():
+    # One request at a time, 0.2 s each: a burst of 8 segments builds a
+    # 1.6 s backlog, and those older than the 0.5 s budget are skipped.
+    with StubAsrServer(latency=0.2, concurrency=1, transcript=echo_id) as server:
+        with AsrClient(server.url, workers=1, latency_budget_s=0.5) as client:
+            for i in range(8):
+                client.submit(segment(i))
+            results = collect(client, 8)
+    assert [r.seq for r in results] == list(range(8))
+    sent = [r for r in results if not r.dropped]
+    dropped = [r for r in results if r.dropped]
+    assert 1 <= len(sent) <= 4
+    assert len(dropped) == 8 - len(sent)
+    assert results[0].text == "segment 0" and not results[0].dropped
+    assert all(r.text == "" for r in dropped)
+    assert server.requests == len(sent)
+
+
+def test_server_error_reported_not_raised():
+    with AsrClient("http://127.0.0.1:9/inference", workers=1, timeout=1.0, latency_budget_s=None) as client:
+        client.submit(segment(0))
+        (result,) = collect(client, 1)
+    assert result.error is not None
+    assert client.errors == 1
+
+
+def test_on_result_callback_ordered():
+    seen = []
+    latency = lambda pcm, rate: 0.1 if pcm[0] == 0 else 0.01
+    with StubAsrServer(latency=latency, concurrency=3, transcript=echo_id) as server:
+        with AsrClient(server.url, workers=3, latency_budget_s=None, on_result=seen.append) as client:
+            for i in range(6):
+                client.submit(segment(i))
+        # close() waits for the pool, so everything has been delivered.
+    assert [r.seq for r in seen] == list(range(6))
+    assert client.poll() == []
+
+
+def test_on_result_may_use_client_and_raise():
+    seen = []
+
+    def on_result(r):
+        seen.append((r.seq, client.in_flight))   # takes the client's lock
+        if r.seq == 1:
+            raise ValueError("bad consumer")
+
+    with StubAsrServer(latency=0.01, concurrency=2) as server:
+        with AsrClient(server.url, workers=2, latency_budget_s=None, on_result=on_result) as client:
+            for i in range(4):
+                client.submit(segment(i))
+    assert [seq for seq, _ in seen] == list(range(4))
+    assert client.callback_errors == 1
+    assert "bad consumer" in client.last_callback_error
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,60 @@
+import pytest
+
+from io_libraries.control_loop import CommandMailbox, ControlLoopConfig
+from io_libraries.joystick import STICK_CENTER, JoystickSnapshot
+from io_libraries.teleop import NETWORK_SOURCE, TeleopReceiver, TeleopSender
+
+# TeleopSender -> TeleopReceiver -> CommandMailbox with a fake link and
+# clock: packets are handed straight from the sender to the receiver.
+
+
+class FakeLink:
+    def __init__(self):
+        self.sent = []
+
+    def send_udp(self, payload, peer=None):
+        self.sent.append(payload)
+
+
+class HeldSticks:
+    def get_snapshot(self):
+        return JoystickSnapshot(0, 0.0, STICK_CENTER, STICK_CENTER + 0.25, STICK_CENTER, STICK_CENTER)
+
+
+def test_held_stick_keeps_mailbox_fresh():
+    now = [0.0]
+    mailbox = CommandMailbox(clock=lambda: now[0])
+    link = FakeLink()
+    sender = TeleopSender(link, HeldSticks())
+    receiver = TeleopReceiver(None, on_command=lambda c: mailbox.submit(NETWORK_SOURCE, c.speed, c.steering))
+    deadline = ControlLoopConfig().command_deadline_s
+
+    for i in range(100):
+        now[0] = i * 0.01
+        sender.step(now[0])
+        for payload in link.sent:
+            receiver.handle(payload)
+        link.sent.clear()
+        cmd = mailbox.freshest(now[0], deadline)
+        assert cmd is not None and cmd.speed == pytest.approx(50.0)
+
+    assert receiver.delivered == 1
+    assert receiver.refreshed == sender.keepalives > 0
+
+
+def test_reordered_keepalive_does_not_refresh():
+    link = FakeLink()
+    sender = TeleopSender(link, HeldSticks())
+    seen = []
+    receiver = TeleopReceiver(None, on_command=seen.append)
+    for i in range(3):
+        sender.step(i * 0.2)
+    first, second, third = link.sent
+    receiver.handle(first)
+    receiver.handle(third)
+    receiver.handle(second)                  # late: older than the newest packet
+    assert len(seen) == 2 and receiver.refreshed == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,188 @@
+import argparse
+import io
+import time
+import urllib.request
+import wave
+
+import numpy as np
+from scipy.io import wavfile
+from scipy.signal import resample_poly
+
+from asr_stub_server import StubAsrServer
+from io_libraries.vad import StreamingVAD, VadConfig
+
+# Fixed 1 s chunks (the old live_transcription_test loop) vs streaming VAD
+# segments, sent to a local stub ASR server (asr_stub_server.py).
+#
+# Audio is streamed in 0.1 s blocks as in the live script. Each request is
+# ready when its chunk / segment closes (in stream time) and, like the
+# script's single consumer loop, waits for the previous request to finish;
+# round trips are real HTTP posts to the stub. Reported per mode:
+#   - ASR calls and seconds of audio uploaded
+#   - command latency: end of a spoken command -> last reply covering it
+#   - commands split across requests (words cut at chunk boundaries) or
+#     clipped (part of the command never sent)
+#
+# Without WAV arguments a synthetic recording is used: voiced "commands" of
+# 1-3 syllables (harmonic stacks with a syllable envelope) between 1.5-4 s
+# gaps of fan-like noise and mains hum, with known spans. Recorded WAVs
+# (any rate, first channel) report calls, upload and latency per segment
+# only, since there is no ground truth. A second synthetic case has the noise
+# step up mid-stream (fan switching on: 5 s at about -60 dBFS, then 40 s at
+# about -35 dBFS), which an adaptive floor has to follow without mistaking
+# the louder noise for one endless utterance.
+
+SR = 16000
+BLOCK = SR // 10
+
+
+def fan_noise(n, rng):
+    t = np.arange(n) / SR
+    noise = np.cumsum(rng.normal(0, 1, n))
+    noise = np.diff(noise, prepend=0) * 0.5 + rng.normal(0, 1, n)
+    return 120.0 * noise + 150.0 * np.sin(2 * np.pi * 50 * t)
+
+
+def noise_onset(quiet_s, loud_s, rng, quiet_db=-60.0, loud_db=-35.0):
+    # Fan noise scaled to roughly these RMS levels (dB re full scale).
+    out = []
+    for seconds, db in ((quiet_s, quiet_db), (loud_s, loud_db)):
+        x = fan_noise(int(seconds * SR), rng)
+        out.append(x * (32768.0 * 10 ** (db / 20) / np.sqrt(np.mean(x ** 2))))
+    return np.concatenate(out)
+
+
+def synthetic_recording(seconds, seed=0, background=None):
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SR)
+    audio = fan_noise(n, rng) if background is None else background(n, rng)
+    spans = []
+    pos = rng.uniform(1.0, 2.0)
+    while pos < seconds - 2.0:
+        start = pos
+        for _ in range(rng.integers(1, 4)):
+            dur = rng.uniform(0.2, 0.45)
+            i0, i1 = int(pos * SR), int((pos + dur) * SR)
+            tt = np.arange(i1 - i0) / SR
+            f0 = rng.uniform(100, 220)
+            voiced = sum(np.sin(2 * np.pi * f0 * h * tt) / h for h in range(1, 12))
+            env = np.sin(np.pi * tt / dur) ** 0.7
+            audio[i0:i1] += rng.uniform(2500, 6000) * voiced * env
+            pos += dur + rng.uniform(0.05, 0.15)
+        spans.append((start, pos))
+        pos += rng.uniform(1.5, 4.0)
+    return np.clip(audio, -32768, 32767).astype(np.int16), spans
+
+
+def load_wav(path):
+    rate, audio = wavfile.read(path)
+    if audio.ndim > 1:
+        audio = audio[:, 0]
+    if audio.dtype != np.int16:
+        audio = (audio / np.max(np.abs(audio)) * 32767).astype(np.int16)
+    if rate != SR:
+        audio = resample_poly(audio.astype(np.float32), SR, rate).astype(np.int16)
+    return audio
+
+
+def wav_bytes(pcm):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SR)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def post(url, pcm):
+    req = urllib.request.Request(url, data=wav_bytes(pcm), headers={"Content-Type": "audio/wav"})
+    with urllib.request.urlopen(req, timeout=30) as r:
+        r.read()
+
+
+def fixed_requests(audio):
+    # (ready at stream time s, start s, end s, samples)
+    out = []
+    for i in range(0, len(audio) - SR + 1, SR):
+        out.append(((i + SR) / SR, i / SR, (i + SR) / SR, audio[i:i + SR]))
+    return out
+
+
+def vad_requests(audio, config):
+    vad = StreamingVAD(config)
+    out, forced = [], 0
+    start = time.perf_counter()
+    for i in range(0, len(audio), BLOCK):
+        for seg in vad.feed(audio[i:i + BLOCK]):
+            out.append((min(i + BLOCK, len(audio)) / SR, seg.start / SR, seg.end / SR, seg.audio))
+            forced += seg.forced
+    seg = vad.flush()
+    if seg is not None:
+        out.append((len(audio) / SR, seg.start / SR, seg.end / SR, seg.audio))
+    cpu = time.perf_counter() - start
+    return out, cpu, forced
+
+
+def run(url, requests):
+    # Sequential consumer: returns [(start, end, done)] in stream time.
+    done_at, out = 0.0, []
+    for ready, start, end, pcm in requests:
+        t0 = time.perf_counter()
+        post(url, pcm)
+        rtt = time.perf_counter() - t0
+        done_at = max(ready, done_at) + rtt
+        out.append((start, end, done_at))
+    return out
+
+
+def report(name, requests, replies, spans, seconds, forced=None):
+    sent = sum(len(r[3]) for r in requests) / SR
+    print("{:>6}: {:4d} calls, {:6.1f} s uploaded ({:.0f}% of {:.0f} s){}".format(
+        name, len(requests), sent, 100.0 * sent / seconds, seconds,
+        "" if forced is None else ", {} cut at max length".format(forced)))
+    if not spans:
+        lat = [done - end for _, end, done in replies]
+        if lat:
+            print("        reply after segment end: median {:.0f} ms".format(np.median(lat) * 1e3))
+        return
+    lat, split, clipped, missed = [], 0, 0, 0
+    for s, e in spans:
+        cover = [(a, b, d) for a, b, d in replies if a < e and b > s]
+        if not cover:
+            missed += 1
+            continue
+        lat.append(max(d for _, _, d in cover) - e)
+        split += len(cover) > 1
+        clipped += min(a for a, _, _ in cover) > s or max(b for _, b, _ in cover) < e
+    print("        {} commands: latency median {:.0f} ms / max {:.0f} ms, {} split, {} clipped, {} missed".format(
+        len(spans), np.median(lat) * 1e3 if lat else 0, max(lat) * 1e3 if lat else 0, split, clipped, missed))
+
+
+def parse_cmdline():
+    parser = argparse.ArgumentParser(description='Fixed-chunk vs VAD segmentation for live ASR.')
+    parser.add_argument('wavs', nargs='*', help='Recorded WAVs (default: synthetic recording).')
+    parser.add_argument('--seconds', type=float, default=60.0, help='Length of the synthetic recording.')
+    parser.add_argument('--latency', type=float, default=0.1, help='Stub seconds per request.')
+    parser.add_argument('--per-audio', type=float, default=0.05, help='Stub seconds per second of audio.')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_cmdline()
+    if args.wavs:
+        inputs = [(path, load_wav(path), []) for path in args.wavs]
+    else:
+        inputs = [("synthetic",) + synthetic_recording(args.seconds),
+                  ("noise onset",) + synthetic_recording(45.0, 1, lambda n, rng: noise_onset(5.0, n / SR - 5.0, rng))]
+
+    with StubAsrServer(latency=args.latency, per_audio_s=args.per_audio) as server:
+        for name, audio, spans in inputs:
+            seconds = len(audio) / SR
+            print("{}: {:.0f} s, {} commands; stub {:.0f} ms + {:.0f} ms per audio s".format(
+                name, seconds, len(spans) or "?", args.latency * 1e3, args.per_audio * 1e3))
+            fixed = fixed_requests(audio)
+            report("fixed", fixed, run(server.url, fixed), spans, seconds)
+            segments, cpu, forced = vad_requests(audio, VadConfig(sample_rate=SR))
+            report("vad", segments, run(server.url, segments), spans, seconds, forced)
+            print("        VAD cost {:.2f} ms CPU per second of audio".format(cpu / seconds * 1e3))